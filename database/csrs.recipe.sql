@@ -14,10 +14,14 @@ CREATE TABLE scenario_assumptions (
 	assumption_kind VARCHAR NOT NULL, 
 	assumption_id INTEGER NOT NULL, 
 	PRIMARY KEY (id), 
-	FOREIGN KEY(scenario_id) REFERENCES scenarios (id), 
+	FOREIGN KEY(scenario_id) REFERENCES scenarios (id) ON DELETE CASCADE, 
 	FOREIGN KEY(assumption_id) REFERENCES assumptions (id)
 );
 
+CREATE INDEX ix_scenario_assumptions_assumption_id ON scenario_assumptions (assumption_id);
+
+CREATE INDEX ix_scenario_assumptions_scenario_id ON scenario_assumptions (scenario_id);
+
 CREATE TABLE scenarios (
 	id INTEGER NOT NULL, 
 	name VARCHAR NOT NULL, 
@@ -35,19 +39,25 @@ CREATE TABLE runs (
 	code_version VARCHAR NOT NULL, 
 	detail VARCHAR NOT NULL, 
 	PRIMARY KEY (id), 
-	FOREIGN KEY(scenario_id) REFERENCES scenarios (id), 
-	FOREIGN KEY(parent_id) REFERENCES runs (id)
+	FOREIGN KEY(scenario_id) REFERENCES scenarios (id) ON DELETE CASCADE, 
+	FOREIGN KEY(parent_id) REFERENCES runs (id) ON DELETE SET NULL
 );
 
+CREATE INDEX ix_runs_parent_id ON runs (parent_id);
+
+CREATE INDEX ix_runs_scenario_id ON runs (scenario_id);
+
 CREATE TABLE preferred_versions (
 	scenario_id INTEGER NOT NULL, 
 	run_id INTEGER NOT NULL, 
 	PRIMARY KEY (scenario_id), 
 	CONSTRAINT unique_preference UNIQUE (scenario_id, run_id), 
-	FOREIGN KEY(scenario_id) REFERENCES scenarios (id), 
-	FOREIGN KEY(run_id) REFERENCES runs (id)
+	FOREIGN KEY(scenario_id) REFERENCES scenarios (id) ON DELETE CASCADE, 
+	FOREIGN KEY(run_id) REFERENCES runs (id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_preferred_versions_run_id ON preferred_versions (run_id);
+
 CREATE TABLE run_history (
 	id INTEGER NOT NULL, 
 	run_id INTEGER NOT NULL, 
@@ -56,19 +66,25 @@ CREATE TABLE run_history (
 	PRIMARY KEY (id), 
 	CONSTRAINT unique_run UNIQUE (scenario_id, run_id), 
 	CONSTRAINT unique_version UNIQUE (scenario_id, version), 
-	FOREIGN KEY(run_id) REFERENCES runs (id), 
-	FOREIGN KEY(scenario_id) REFERENCES scenarios (id)
+	FOREIGN KEY(run_id) REFERENCES runs (id) ON DELETE CASCADE, 
+	FOREIGN KEY(scenario_id) REFERENCES scenarios (id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_run_history_run_id ON run_history (run_id);
+
 CREATE TABLE common_catalog (
 	id INTEGER NOT NULL, 
 	run_id INTEGER NOT NULL, 
 	path_id INTEGER NOT NULL, 
 	PRIMARY KEY (id), 
-	FOREIGN KEY(run_id) REFERENCES runs (id), 
+	FOREIGN KEY(run_id) REFERENCES runs (id) ON DELETE CASCADE, 
 	FOREIGN KEY(path_id) REFERENCES named_paths (id)
 );
 
+CREATE INDEX ix_common_catalog_path_id ON common_catalog (path_id);
+
+CREATE INDEX ix_common_catalog_run_path ON common_catalog (run_id, path_id);
+
 CREATE TABLE named_paths (
 	id INTEGER NOT NULL, 
 	name VARCHAR NOT NULL, 
@@ -82,6 +98,10 @@ CREATE TABLE named_paths (
 	CONSTRAINT unique_purpose UNIQUE (name, category)
 );
 
+CREATE INDEX ix_named_paths_id ON named_paths (id);
+
+CREATE INDEX ix_named_paths_path ON named_paths (path);
+
 CREATE TABLE timeseries_ledger (
 	id INTEGER NOT NULL, 
 	run_id INTEGER NOT NULL, 
@@ -90,10 +110,41 @@ CREATE TABLE timeseries_ledger (
 	value FLOAT NOT NULL, 
 	PRIMARY KEY (id), 
 	CONSTRAINT unique_datapoint UNIQUE (run_id, path_id, datetime), 
-	FOREIGN KEY(run_id) REFERENCES runs (id), 
+	FOREIGN KEY(run_id) REFERENCES runs (id) ON DELETE CASCADE, 
 	FOREIGN KEY(path_id) REFERENCES named_paths (id)
 );
 
+CREATE INDEX ix_timeseries_ledger_path_id ON timeseries_ledger (path_id);
+
+CREATE TABLE timeseries_blobs (
+	id INTEGER NOT NULL, 
+	run_id INTEGER NOT NULL, 
+	path_id INTEGER NOT NULL, 
+	start FLOAT NOT NULL, 
+	interval VARCHAR NOT NULL, 
+	length INTEGER NOT NULL, 
+	datetimes BLOB, 
+	"values" BLOB NOT NULL, 
+	PRIMARY KEY (id), 
+	CONSTRAINT unique_series UNIQUE (run_id, path_id), 
+	FOREIGN KEY(run_id) REFERENCES runs (id) ON DELETE CASCADE, 
+	FOREIGN KEY(path_id) REFERENCES named_paths (id)
+);
+
+CREATE INDEX ix_timeseries_blobs_path_id ON timeseries_blobs (path_id);
+
+CREATE TABLE run_revisions (
+	run_id INTEGER NOT NULL, 
+	revision INTEGER NOT NULL, 
+	PRIMARY KEY (run_id)
+);
+
+CREATE TABLE path_revisions (
+	id INTEGER NOT NULL, 
+	revision INTEGER NOT NULL, 
+	PRIMARY KEY (id)
+);
+
 CREATE TABLE metrics (
 	id INTEGER NOT NULL, 
 	name VARCHAR NOT NULL, 
@@ -103,6 +154,8 @@ CREATE TABLE metrics (
 	UNIQUE (name)
 );
 
+CREATE INDEX ix_metrics_id ON metrics (id);
+
 CREATE TABLE metric_values (
 	path_id INTEGER NOT NULL, 
 	run_id INTEGER NOT NULL, 
@@ -112,7 +165,9 @@ CREATE TABLE metric_values (
 	value FLOAT NOT NULL, 
 	PRIMARY KEY (path_id, run_id, metric_id), 
 	FOREIGN KEY(path_id) REFERENCES named_paths (id), 
-	FOREIGN KEY(run_id) REFERENCES runs (id), 
+	FOREIGN KEY(run_id) REFERENCES runs (id) ON DELETE CASCADE, 
 	FOREIGN KEY(metric_id) REFERENCES metrics (id)
 );
 
+CREATE INDEX ix_metric_values_run_id ON metric_values (run_id);
+
@@ -0,0 +1,36 @@
+import logging
+import sys
+from pathlib import Path
+
+import click
+
+sys.path.append("../src")
+import csrs
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.argument("dst", nargs=1, type=click.Path(exists=True))
+@click.option(
+    "--run-id",
+    type=int,
+    default=None,
+    help="Only repack the timeseries of this run.",
+)
+def cli(dst: Path, run_id: int | None) -> int:
+    """Move the timeseries in DST from the long ledger into packed blobs."""
+    dst = Path(dst).resolve()
+    logger.info(f"Repacking timeseries in {dst}")
+    client = csrs.LocalClient(dst, storage="blob")
+    try:
+        n_repacked = csrs.crud.timeseries.repack(client.session, run_id=run_id)
+    finally:
+        client.close()
+    logger.info(f"{n_repacked:,} timeseries repacked")
+    return n_repacked
+
+
+if __name__ == "__main__":
+    logger.setLevel(logging.INFO)
+    cli()
@@ -0,0 +1,29 @@
+import logging
+import sys
+from pathlib import Path
+
+import click
+from sqlalchemy import create_engine
+
+sys.path.append("../src")
+import csrs.migrations
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.argument("dst", nargs=1, type=click.Path(exists=True))
+def cli(dst: Path):
+    """Add the tables and indexes missing from DST, and drop the unused indexes."""
+    dst = Path(dst).resolve()
+    logger.info(f"Upgrading {dst}")
+    engine = create_engine("sqlite:///" + str(dst))
+    try:
+        csrs.migrations.upgrade(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    cli()
@@ -5,5 +5,5 @@ try:
 except PackageNotFoundError:
     # csrs not installed, likely developer mode
     __version__ = None
-from .clients import LocalClient, RemoteClient
+from .clients import AsyncRemoteClient, LocalClient, RemoteClient
 from .schemas import Assumption, NamedPath, Run, Scenario, Timeseries
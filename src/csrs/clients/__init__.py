@@ -1,3 +1,5 @@
+from ._cache import DiskResponseCache, ResponseCache
+from .async_remote import AsyncRemoteClient
 from .base import Client
 from .local import LocalClient
 from .remote import RemoteClient
@@ -0,0 +1,272 @@
+"""Caches of server responses, revalidated with conditional requests.
+
+Responses with an `ETag` or `Last-Modified` header are kept, and the next request for
+the same URL sends them back in `If-None-Match` and `If-Modified-Since`. When the
+server answers `304 Not Modified`, the cached response is used instead of
+downloading it again.
+
+`ResponseCache` keeps the responses in memory, `DiskResponseCache` keeps them in a
+SQLite file so they survive between processes. Both store the content compressed, so
+JSON bodies are kept compact as well as Arrow ones.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import httpx
+
+logger = logging.getLogger(__name__)
+MAX_BYTES = 256 * 1024**2
+# The content is stored decoded, so the headers about the encoding no longer apply
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    status_code: int
+    headers: tuple[tuple[str, str], ...]
+    content: bytes
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "CachedResponse":
+        headers = tuple(
+            (k, v) for k, v in response.headers.items() if k not in DROPPED_HEADERS
+        )
+        return cls(
+            status_code=response.status_code,
+            headers=headers,
+            content=response.content,
+        )
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """The conditional request headers that revalidate this response."""
+        headers = {k.lower(): v for k, v in self.headers}
+        found = dict()
+        if "etag" in headers:
+            found["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            found["If-Modified-Since"] = headers["last-modified"]
+        return found
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=list(self.headers),
+            content=self.content,
+            request=request,
+        )
+
+
+def request_key(request: httpx.Request) -> str:
+    """Responses are cached per URL, and per negotiated format."""
+    return f"{request.method} {request.url} {request.headers.get('accept', '')}"
+
+
+class ResponseCache:
+    """An in-memory least recently used cache of responses, bounded in bytes.
+
+    The content is kept compressed, and the size limit applies to the compressed
+    bytes.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.n_bytes = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self.lock:
+            found = self.entries.get(key)
+            if found is None:
+                return None
+            self.entries.move_to_end(key)
+        return replace(found, content=zlib.decompress(found.content))
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        response = replace(response, content=zlib.compress(response.content))
+        if len(response.content) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.n_bytes -= len(previous.content)
+            self.entries[key] = response
+            self.n_bytes += len(response.content)
+            while self.n_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.n_bytes -= len(evicted.content)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.n_bytes = 0
+
+
+class DiskResponseCache:
+    """A least recently used cache of responses in a SQLite file, bounded in bytes.
+
+    The content is stored compressed, and the size limit applies to the compressed
+    bytes. The file can be shared by several processes.
+    """
+
+    def __init__(self, path: Path | str, max_bytes: int = 4 * 1024**3):
+        self.path = Path(path).expanduser().resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,  # autocommit, transactions are explicit
+        )
+        self.connection.execute("PRAGMA journal_mode=wal")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            + "key TEXT PRIMARY KEY, "
+            + "status_code INTEGER NOT NULL, "
+            + "headers TEXT NOT NULL, "
+            + "content BLOB NOT NULL, "
+            + "size INTEGER NOT NULL, "
+            + "used REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_used ON responses (used)"
+        )
+
+    def __len__(self) -> int:
+        with self.lock:
+            query = "SELECT count(*) FROM responses"
+            return self.connection.execute(query).fetchone()[0]
+
+    @property
+    def n_bytes(self) -> int:
+        with self.lock:
+            query = "SELECT coalesce(sum(size), 0) FROM responses"
+            return self.connection.execute(query).fetchone()[0]
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT status_code, headers, content FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE responses SET used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        status_code, headers, content = row
+        return CachedResponse(
+            status_code=status_code,
+            headers=tuple(tuple(h) for h in json.loads(headers)),
+            content=zlib.decompress(content),
+        )
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        content = zlib.compress(response.content)
+        if len(content) > self.max_bytes:
+            return
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        response.status_code,
+                        json.dumps(response.headers),
+                        content,
+                        len(content),
+                        time.time(),
+                    ),
+                )
+                self._evict()
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        (total,) = self.connection.execute(
+            "SELECT coalesce(sum(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self.connection.execute("SELECT key, size FROM responses ORDER BY used")
+        evicted = list()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug(f"evicted {len(evicted)} responses from {self.path}")
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def send(
+    actor: httpx.Client,
+    cache: ResponseCache | DiskResponseCache | None,
+    request: httpx.Request,
+) -> httpx.Response:
+    """Send the request, revalidating a cached response if there is one."""
+    if (cache is None) or (request.method != "GET"):
+        return actor.send(request)
+    key = request_key(request)
+    cached = cache.get(key)
+    if cached is not None:
+        request.headers.update(cached.validators)
+    response = actor.send(request)
+    if (response.status_code == 304) and (cached is not None):
+        logger.debug(f"not modified, using cached response for {request.url}")
+        return cached.to_response(request)
+    if response.is_success:
+        new = CachedResponse.from_response(response)
+        if new.validators:
+            cache.put(key, new)
+    return response
+
+
+async def asend(
+    actor: httpx.AsyncClient,
+    cache: ResponseCache | DiskResponseCache | None,
+    request: httpx.Request,
+) -> httpx.Response:
+    """Like `send`, for an `httpx.AsyncClient`. The cache is used from a worker
+    thread, a `DiskResponseCache` would block the event loop on its file."""
+    if (cache is None) or (request.method != "GET"):
+        return await actor.send(request)
+    key = request_key(request)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        request.headers.update(cached.validators)
+    response = await actor.send(request)
+    if (response.status_code == 304) and (cached is not None):
+        logger.debug(f"not modified, using cached response for {request.url}")
+        return cached.to_response(request)
+    if response.is_success:
+        new = CachedResponse.from_response(response)
+        if new.validators:
+            await asyncio.to_thread(cache.put, key, new)
+    return response
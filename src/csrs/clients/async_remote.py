@@ -0,0 +1,723 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+import httpx
+import pandss as pdss
+from pandas import DataFrame
+
+from .. import enums, ingest, schemas
+from ._cache import DiskResponseCache, ResponseCache, asend
+from .base import PAGE_SIZE, _next_after
+from .remote import (
+    RETRY_ERRORS,
+    _accept,
+    _accept_arrays,
+    _batch_params,
+    _chunks,
+    _failed_chunk,
+    _has_h2,
+    _merge_batches,
+    _params,
+    _read_all_timeseries,
+    _read_arrays,
+    _read_model,
+    _read_models,
+    _read_timeseries,
+    _retry_delay,
+    _run_url,
+    _should_retry,
+)
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+async def _get(
+    actor: httpx.AsyncClient,
+    cache: ResponseCache | DiskResponseCache | None,
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+) -> httpx.Response:
+    request = actor.build_request("GET", url, params=params, headers=headers)
+    return await asend(actor, cache, request)
+
+
+async def _put_with_retries(
+    actor: httpx.AsyncClient,
+    url: str,
+    json: Any,
+    retries: int,
+    backoff: float,
+) -> httpx.Response:
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = await actor.put(url, json=json)
+        except RETRY_ERRORS as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"{type(e).__name__} on {url}, retrying")
+        else:
+            if (not _should_retry(response)) or (attempt == retries):
+                response.raise_for_status()
+                return response
+            logger.warning(f"{response.status_code} on {url}, retrying")
+        await asyncio.sleep(_retry_delay(response, attempt, backoff))
+
+
+async def _pages(
+    get: Callable[..., Awaitable[list[T]]],
+    page_size: int,
+    **filters,
+) -> AsyncIterator[T]:
+    """Like `base._pages`, for the coroutines of `AsyncRemoteClient`."""
+    after = None
+    while True:
+        page = await get(limit=page_size, after=after, **filters)
+        for obj in page:
+            yield obj
+        after = _next_after(page, page_size, after)
+        if after is None:
+            return
+
+
+async def _iter_timeseries_from_dss(
+    dss: Path,
+    scenario: str,
+    version: str,
+    paths: list[schemas.NamedPath],
+    max_workers: int,
+) -> AsyncIterator[list[schemas.Timeseries]]:
+    # reading the file blocks, keep it off of the event loop
+    chunks = ingest.iter_timeseries_from_dss(
+        dss, scenario, version, paths, max_workers=max_workers
+    )
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        yield chunk
+
+
+async def _bounded_gather(limit: int, awaitables: Iterable[Awaitable[T]]) -> list[T]:
+    """`asyncio.gather`, with at most `limit` of the awaitables running at once."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(run(a) for a in awaitables)))
+
+
+class AsyncRemoteClient:
+    """Client used to interact with a remote Results Server from async code.
+
+    It has every method of `RemoteClient`, as coroutines, and the `gather_*` methods
+    to fetch many series at once.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        batch_size: int = 50,
+        response_cache: ResponseCache | DiskResponseCache | None = None,
+        max_concurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        **kwargs,
+    ):
+        """Initialize a client, and target a remote URL.
+
+        Parameters
+        ----------
+        base_url : str
+            The URL of the results server.
+        batch_size : int, optional
+            The number of `Timeseries` sent per request by `put_many_timeseries`, by
+            default 50
+        response_cache : ResponseCache | DiskResponseCache | None, optional
+            Keep responses, and only download them again when they've changed on
+            the server, by default None
+        max_concurrency : int, optional
+            The number of requests sent at the same time by `put_many_timeseries`
+            and the `gather_*` methods, by default 4
+        retries : int, optional
+            The number of times an upload is retried after a connection error, or a
+            response saying the server is busy, by default 3
+        backoff : float, optional
+            The delay in seconds before the first retry, doubled for each retry, by
+            default 0.5
+        kwargs
+            All other keyword arguments are passed to httpx.AsyncClient(). HTTP/2 is
+            used by default when the `h2` package is installed
+
+        Example
+        -------
+        ```python-repl
+        >>> import asyncio
+        >>> import csrs
+        >>> url = "calsim-scenario-results-server.azurewebsites.net"
+        >>> async def main():
+        ...     async with csrs.AsyncRemoteClient(url) as client:
+        ...         return await client.get_scenario()
+        >>> scenarios = asyncio.run(main())
+        ```
+        """
+        kwargs.setdefault("http2", _has_h2())
+        self.actor = httpx.AsyncClient(base_url=base_url, **kwargs)
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = response_cache
+        self.logger = logging.getLogger(__name__)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(url={self.actor.base_url})"
+
+    async def __aenter__(self) -> "AsyncRemoteClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.actor.aclose()
+
+    # UTILITES
+    async def dump(self, dst: IO, **kwargs) -> None:
+        database = {
+            "assumptions": [
+                a.model_dump(exclude="id") async for a in self.iter_assumptions()
+            ],
+            "scenarios": [
+                s.model_dump(exclude=("id", "preferred_run"))
+                async for s in self.iter_scenarios()
+            ],
+            "paths": [p.model_dump(exclude="id") async for p in self.iter_paths()],
+            "runs": list(),
+            "timeseries": list(),
+            "metrics": list(),
+            "metric_values": list(),
+        }
+        runs = [r async for r in self.iter_runs()]
+        database["runs"] = [r.model_dump(exclude="id") for r in runs]
+        for tss in await _bounded_gather(
+            self.max_concurrency,
+            (
+                self.get_all_timeseries_for_run(scenario=r.scenario, version=r.version)
+                for r in runs
+            ),
+        ):
+            database["timeseries"].extend(ts.model_dump(exclude="id") for ts in tss)
+        json.dump(database, dst, **kwargs)
+
+    async def load(self, src: IO) -> None:
+        database: dict[str, list[dict]] = json.load(src)
+        for a in database.get("assumptions", ()):
+            await self.put_assumption(**a)
+        for s in database.get("scenarios", ()):
+            await self.put_scenario(**s)
+        for p in database.get("paths", ()):
+            await self.put_path(**p)
+        for r in database.get("runs", ()):
+            await self.put_run(**r)
+        await _bounded_gather(
+            self.max_concurrency,
+            (self.put_timeseries(**ts) for ts in database.get("timeseries", ())),
+        )
+
+    # GATHER
+    async def gather_timeseries(
+        self,
+        keys: Iterable[tuple[str, str, str]],
+        format: str = "json",
+    ) -> list[schemas.Timeseries]:
+        """Get many `Timeseries` concurrently.
+
+        Parameters
+        ----------
+        keys : Iterable[tuple[str, str, str]]
+            The `(scenario, version, path)` of each `Timeseries`
+        format : str, optional
+            The format to download the data in, "json" or "arrow", by default "json"
+
+        Returns
+        -------
+        list[schemas.Timeseries]
+            The `Timeseries`, in the same order as the `keys`
+        """
+        return await _bounded_gather(
+            self.max_concurrency,
+            (
+                self.get_timeseries(scenario=s, version=v, path=p, format=format)
+                for s, v, p in keys
+            ),
+        )
+
+    async def gather_array_timeseries(
+        self,
+        keys: Iterable[tuple[str, str, str]],
+    ) -> list[schemas.ArrayTimeseries]:
+        """Like `gather_timeseries`, returning `ArrayTimeseries` objects."""
+        return await _bounded_gather(
+            self.max_concurrency,
+            (
+                self.get_array_timeseries(scenario=s, version=v, path=p)
+                for s, v, p in keys
+            ),
+        )
+
+    async def gather_runs(
+        self,
+        runs: Iterable[tuple[str, str]],
+    ) -> list[list[schemas.ArrayTimeseries]]:
+        """Get all the data of many runs concurrently.
+
+        Parameters
+        ----------
+        runs : Iterable[tuple[str, str]]
+            The `(scenario, version)` of each run
+
+        Returns
+        -------
+        list[list[schemas.ArrayTimeseries]]
+            The `ArrayTimeseries` of each run, in the same order as the `runs`
+        """
+        return await _bounded_gather(
+            self.max_concurrency,
+            (
+                self.get_all_array_timeseries_for_run(scenario=s, version=v)
+                for s, v in runs
+            ),
+        )
+
+    # GET
+    async def get_assumption_names(self) -> tuple[str]:
+        url = "/assumptions/names"
+        response = await _get(self.actor, self.cache, url)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_assumption(
+        self,
+        *,
+        kind: str = None,
+        name: str = None,
+        id: int = None,
+        limit: int = None,
+        after: int = None,
+    ) -> list[schemas.Assumption]:
+        url = "/assumptions"
+        params = _params(kind=kind, name=name, id=id, limit=limit, after=after)
+        response = await _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.Assumption)
+
+    async def get_scenario(
+        self,
+        *,
+        name: str = None,
+        id: int = None,
+        limit: int = None,
+        after: int = None,
+    ) -> list[schemas.Scenario]:
+        url = "/scenarios"
+        params = _params(name=name, id=id, limit=limit, after=after)
+        response = await _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.Scenario)
+
+    async def get_run(
+        self,
+        *,
+        scenario: str = None,
+        version: str = None,
+        code_version: str = None,
+        contact: str = None,
+        id: int = None,
+        limit: int = None,
+        after: int = None,
+    ) -> list[schemas.Run]:
+        url = "/runs"
+        params = _params(
+            scenario=scenario,
+            version=version,
+            code_version=code_version,
+            contact=contact,
+            id=id,
+            limit=limit,
+            after=after,
+        )
+        response = await _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.Run)
+
+    async def get_path(
+        self,
+        *,
+        name: str = None,
+        path: str = None,
+        category: str = None,
+        id: str = None,
+        limit: int = None,
+        after: int = None,
+    ) -> list[schemas.NamedPath]:
+        url = "/paths"
+        params = _params(
+            name=name,
+            path=path,
+            category=category,
+            id=id,
+            limit=limit,
+            after=after,
+        )
+        response = await _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.NamedPath)
+
+    async def get_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        path: str,
+        format: str = "json",
+    ) -> schemas.Timeseries:
+        url = "/timeseries"
+        params = _params(
+            scenario=scenario,
+            version=version,
+            path=path,
+        )
+        response = await _get(
+            self.actor, self.cache, url, params=params, headers=_accept(format)
+        )
+        return _read_timeseries(response)
+
+    async def get_timeseries_from_dss(
+        self,
+        dss: Path,
+        scenario: str,
+        version: str,
+        paths: list[schemas.NamedPath] | None = None,
+        max_workers: int = 1,
+    ) -> list[schemas.Timeseries]:
+        if paths is None:
+            paths = await self.get_path()
+        tss = list()
+        chunks = _iter_timeseries_from_dss(dss, scenario, version, paths, max_workers)
+        async for chunk in chunks:
+            tss.extend(chunk)
+        return tss
+
+    async def put_timeseries_from_dss(
+        self,
+        dss: Path,
+        scenario: str,
+        version: str,
+        paths: list[schemas.NamedPath] | None = None,
+        max_workers: int = 1,
+    ) -> schemas.TimeseriesBatch:
+        if paths is None:
+            paths = await self.get_path()
+        batches = list()
+        chunks = _iter_timeseries_from_dss(dss, scenario, version, paths, max_workers)
+        async for chunk in chunks:
+            batches.append(await self.put_timeseries_batch(chunk))
+        return _merge_batches(batches)
+
+    async def get_all_timeseries_for_run(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        format: str = "json",
+    ) -> list[schemas.Timeseries]:
+        url = "/timeseries/all"
+        params = _params(
+            scenario=scenario,
+            version=version,
+        )
+        response = await _get(
+            self.actor, self.cache, url, params=params, headers=_accept(format)
+        )
+        return _read_all_timeseries(response)
+
+    async def get_array_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        path: str,
+    ) -> schemas.ArrayTimeseries:
+        url = "/timeseries"
+        params = _params(scenario=scenario, version=version, path=path)
+        response = await _get(
+            self.actor, self.cache, url, params=params, headers=_accept_arrays()
+        )
+        (ts,) = _read_arrays(response)
+        return ts
+
+    async def get_all_array_timeseries_for_run(
+        self,
+        *,
+        scenario: str,
+        version: str,
+    ) -> list[schemas.ArrayTimeseries]:
+        url = "/timeseries/all"
+        params = _params(scenario=scenario, version=version)
+        response = await _get(
+            self.actor, self.cache, url, params=params, headers=_accept_arrays()
+        )
+        return _read_arrays(response)
+
+    async def get_timeseries_many(
+        self,
+        *,
+        scenarios: list[str],
+        paths: list[str],
+        versions: list[str | None] | None = None,
+        as_frame: bool = False,
+    ) -> list[schemas.ArrayTimeseries] | DataFrame:
+        url = "/timeseries/batch"
+        params = _batch_params(scenarios, paths, versions)
+        response = await _get(
+            self.actor, self.cache, url, params=params, headers=_accept_arrays()
+        )
+        series = _read_arrays(response)
+        if as_frame:
+            return schemas.concat_frames(series)
+        return series
+
+    # ITERATE
+    async def iter_assumptions(
+        self,
+        *,
+        kind: str = None,
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[schemas.Assumption]:
+        async for obj in _pages(self.get_assumption, page_size, kind=kind):
+            yield obj
+
+    async def iter_scenarios(
+        self,
+        *,
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[schemas.Scenario]:
+        async for obj in _pages(self.get_scenario, page_size):
+            yield obj
+
+    async def iter_runs(
+        self,
+        *,
+        scenario: str = None,
+        code_version: str = None,
+        contact: str = None,
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[schemas.Run]:
+        pages = _pages(
+            self.get_run,
+            page_size,
+            scenario=scenario,
+            code_version=code_version,
+            contact=contact,
+        )
+        async for obj in pages:
+            yield obj
+
+    async def iter_paths(
+        self,
+        *,
+        category: str = None,
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[schemas.NamedPath]:
+        async for obj in _pages(self.get_path, page_size, category=category):
+            yield obj
+
+    # PUT
+
+    async def put_assumption(
+        self,
+        *,
+        name: str,
+        kind: str,
+        detail: str,
+    ) -> schemas.Assumption:
+        url = "/assumptions"
+        obj = schemas.Assumption(name=name, kind=kind, detail=detail)
+        response = await self.actor.put(url, json=obj.model_dump(mode="json"))
+        return _read_model(response, schemas.Assumption)
+
+    async def put_scenario(
+        self,
+        *,
+        name: str,
+        assumptions: dict[str, str],
+    ) -> schemas.Scenario:
+        url = "/scenarios"
+        obj = schemas.Scenario(name=name, assumptions=assumptions)
+        response = await self.actor.put(url, json=obj.model_dump(mode="json"))
+        return _read_model(response, schemas.Scenario)
+
+    async def put_run(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        contact: str,
+        code_version: str,
+        detail: str,
+        # optional
+        parent: str | None = None,
+        children: tuple[str, ...] = tuple(),
+        confidential: bool = True,
+        published: bool = False,
+        prefer_this_version: bool = True,
+    ) -> schemas.Run:
+        obj = schemas.Run(
+            scenario=scenario,
+            version=version,
+            contact=contact,
+            code_version=code_version,
+            detail=detail,
+            parent=parent,
+            children=children,
+            confidential=confidential,
+            published=published,
+        )
+        url = _run_url(prefer_this_version)
+        response = await self.actor.put(url, json=obj.model_dump(mode="json"))
+        return _read_model(response, schemas.Run)
+
+    async def put_path(
+        self,
+        *,
+        name: str,
+        path: str,
+        category: str,
+        period_type: str,
+        interval: str,
+        units: str,
+        detail: str,
+    ) -> schemas.NamedPath:
+        obj = schemas.NamedPath(
+            name=name,
+            path=path,
+            category=category,
+            period_type=period_type,
+            interval=interval,
+            units=units,
+            detail=detail,
+        )
+        url = "/paths"
+        response = await self.actor.put(
+            url, json=obj.model_dump(mode="json", exclude=("id"))
+        )
+        return _read_model(response, schemas.NamedPath)
+
+    async def put_standard_paths(self) -> list[schemas.NamedPath]:
+        url = "/paths"
+        added = list()
+        for p in enums.StandardPathsEnum:
+            try:
+                response = await self.actor.put(
+                    url,
+                    json=p.value.model_dump(
+                        mode="json",
+                        exclude=("id"),
+                    ),
+                )
+                added.append(_read_model(response, schemas.NamedPath))
+            except Exception as e:
+                path = p.value
+                self.logger.error(
+                    f"{type(e).__name__} occurred during path creation, skipping {path}"
+                )
+        return added
+
+    async def put_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        # shadow pandss RegularTimeseries attributes
+        path: str | pdss.DatasetPath,
+        values: tuple[float, ...],
+        dates: tuple[str, ...],
+        period_type: str,
+        units: str,
+        interval: str,
+    ) -> schemas.Timeseries:
+        obj = schemas.Timeseries(
+            scenario=scenario,
+            version=version,
+            path=path,
+            values=values,
+            dates=dates,
+            period_type=period_type,
+            units=units,
+            interval=interval,
+        )
+        url = "/timeseries"
+        response = await self.actor.put(url, json=obj.model_dump(mode="json"))
+        return _read_model(response, schemas.Timeseries)
+
+    async def patch_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        # shadow pandss RegularTimeseries attributes
+        path: str | pdss.DatasetPath,
+        values: tuple[float, ...],
+        dates: tuple[str, ...],
+        period_type: str,
+        units: str,
+        interval: str,
+    ) -> schemas.TimeseriesUpdate:
+        obj = schemas.Timeseries(
+            scenario=scenario,
+            version=version,
+            path=path,
+            values=values,
+            dates=dates,
+            period_type=period_type,
+            units=units,
+            interval=interval,
+        )
+        url = "/timeseries"
+        response = await self.actor.patch(url, json=obj.model_dump(mode="json"))
+        return _read_model(response, schemas.TimeseriesUpdate)
+
+    async def put_many_timeseries(
+        self,
+        timeseries: list[schemas.Timeseries],
+    ) -> list[schemas.Timeseries]:
+        batch = await self.put_timeseries_batch(timeseries)
+        for failure in batch.failed:
+            self.logger.error(f"couldn't add {failure}, {failure.error}")
+        return batch.added
+
+    async def put_timeseries_batch(
+        self,
+        timeseries: list[schemas.Timeseries],
+    ) -> schemas.TimeseriesBatch:
+        url = "/timeseries/many"
+
+        async def put_chunk(
+            chunk: list[schemas.Timeseries],
+        ) -> schemas.TimeseriesBatch:
+            try:
+                response = await _put_with_retries(
+                    self.actor,
+                    url,
+                    json=[ts.model_dump(mode="json") for ts in chunk],
+                    retries=self.retries,
+                    backoff=self.backoff,
+                )
+            except Exception as e:
+                return _failed_chunk(chunk, e)
+            return schemas.TimeseriesBatch.model_validate(response.json())
+
+        chunks = _chunks(timeseries, self.batch_size)
+        batches = await _bounded_gather(self.max_concurrency, map(put_chunk, chunks))
+        return _merge_batches(batches)
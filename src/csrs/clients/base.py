@@ -1,10 +1,52 @@
 import json
 from pathlib import Path
-from typing import IO
+from typing import IO, Callable, Iterator, TypeVar
 
 import pandss as pdss
-
-from .. import schemas
+from pandas import DataFrame
+
+from .. import ingest, schemas
+
+ModelT = TypeVar("ModelT")
+# The objects requested at a time by the iterators, at most `max_page_size` in the
+# database configuration of a server
+PAGE_SIZE = 500
+
+
+def _pages(
+    get: Callable[..., list[ModelT]],
+    page_size: int,
+    **filters,
+) -> Iterator[ModelT]:
+    """Call `get` for one page after the other, until a page isn't full."""
+    after = None
+    while True:
+        page = get(limit=page_size, after=after, **filters)
+        yield from page
+        after = _next_after(page, page_size, after)
+        if after is None:
+            return
+
+
+def _next_after(page: list[ModelT], page_size: int, after: int | None) -> int | None:
+    """The cursor of the page after this one, or None if this was the last page.
+
+    A server that ignores `limit` or `after` would make the pages go on forever, so
+    a page that is too long, or doesn't move past `after`, raises a `ValueError`.
+    """
+    if len(page) > page_size:
+        raise ValueError(
+            f"{len(page)} objects returned for a page of {page_size}, the server"
+            + " doesn't support paging"
+        )
+    if len(page) < page_size:
+        return None
+    last = page[-1].id
+    if (after is not None) and (last <= after):
+        raise ValueError(
+            f"the page after {after} ends at {last}, the server doesn't support paging"
+        )
+    return last
 
 
 class Client:
@@ -23,13 +65,13 @@ class Client:
             "metric_values": list(),
         }
 
-        for a in self.get_assumption():
+        for a in self.iter_assumptions():
             database["assumptions"].append(a.model_dump(exclude="id"))
-        for s in self.get_scenario():
+        for s in self.iter_scenarios():
             database["scenarios"].append(s.model_dump(exclude=("id", "preferred_run")))
-        for p in self.get_path():
+        for p in self.iter_paths():
             database["paths"].append(p.model_dump(exclude="id"))
-        for r in self.get_run():
+        for r in self.iter_runs():
             database["runs"].append(r.model_dump(exclude="id"))
             for ts in self.get_all_timeseries_for_run(
                 scenario=r.scenario,
@@ -79,6 +121,8 @@ class Client:
         kind: str = None,
         name: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Assumption]:
         """Get the `Assumption` objects that match the information provided.
 
@@ -96,6 +140,11 @@ class Client:
         id : int, optional
             Matches against `Assumption.id`. If provided, this method will return at
             most one `Assumption` object, by default None
+        limit : int, optional
+            Return at most this many objects, ordered by `id`, by default all of them
+        after : int, optional
+            Return the objects after this `id`, the last one of the previous page, by
+            default None
 
         Returns
         -------
@@ -116,6 +165,8 @@ class Client:
         *,
         name: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Scenario]:
         """Get the `Scenario` objects that match the information provided.
 
@@ -127,6 +178,11 @@ class Client:
         id : int, optional
             Matches against `Scenario.id`. If provided, this method will return at most
             one `Scenario` object, by default None
+        limit : int, optional
+            Return at most this many objects, ordered by `id`, by default all of them
+        after : int, optional
+            Return the objects after this `id`, the last one of the previous page, by
+            default None
 
         Returns
         -------
@@ -141,7 +197,10 @@ class Client:
         scenario: str = None,
         version: str = None,
         code_version: str = None,
+        contact: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Run]:
         """Get the `Run` objects that match the information provided.
 
@@ -154,9 +213,16 @@ class Client:
             one `Run` object, by default None
         code_version : str, optional
             Matches against `Run.code_version`, by default None
+        contact : str, optional
+            Matches against `Run.contact`, by default None
         id : int, optional
             Matches against `Run.id`. If provided, this method will return at most one
             `Run` object, by default None
+        limit : int, optional
+            Return at most this many objects, ordered by `id`, by default all of them
+        after : int, optional
+            Return the objects after this `id`, the last one of the previous page, by
+            default None
 
         Returns
         -------
@@ -172,6 +238,8 @@ class Client:
         path: str = None,
         category: str = None,
         id: str = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.NamedPath]:
         """Get the `NamedPath` objects that match the information provided.
 
@@ -188,6 +256,11 @@ class Client:
         id : str, optional
             Matches against `NamedPath.id`. If provided this method will return at most
             one `NamedPath` object, by default None
+        limit : int, optional
+            Return at most this many objects, ordered by `id`, by default all of them
+        after : int, optional
+            Return the objects after this `id`, the last one of the previous page, by
+            default None
 
         Returns
         -------
@@ -202,6 +275,7 @@ class Client:
         scenario: str,
         version: str,
         path: str,
+        format: str = "json",
     ) -> schemas.Timeseries:
         """Get the `Timeseries` object that matches the information provided.
 
@@ -216,6 +290,9 @@ class Client:
         path : str
             Matches against `Timeseries.path`. If provided this method will return at
             most one `Timeseries` object
+        format : str, optional
+            The format the data is transferred in, either "json" or "arrow", by
+            default "json". See `get_all_timeseries_for_run`
 
         Returns
         -------
@@ -231,14 +308,92 @@ class Client:
         scenario: str,
         version: str,
         paths: list[schemas.NamedPath] | None = None,
+        max_workers: int = 1,
     ) -> list[schemas.Timeseries]:
-        raise NotImplementedError()
+        """Read the data of the `NamedPath` objects from a DSS file.
+
+        The catalog of the file is read once, and the data is read in chunks. Paths
+        that match no dataset, or more than one, are logged and skipped.
+
+        Parameters
+        ----------
+        dss : Path
+            The DSS file to read
+        scenario : str
+            The name of the `Scenario` to assign the data to
+        version : str
+            The version of the `Run` to assign the data to
+        paths : list[schemas.NamedPath] | None, optional
+            The paths to read, by default all the paths on the results server
+        max_workers : int, optional
+            The number of processes reading the file, by default 1, which reads the
+            file in this process
+
+        Returns
+        -------
+        list[schemas.Timeseries]
+            The `Timeseries` objects found in the file
+        """
+        if paths is None:
+            paths = self.get_path()
+        tss = list()
+        chunks = ingest.iter_timeseries_from_dss(
+            dss, scenario, version, paths, max_workers=max_workers
+        )
+        for chunk in chunks:
+            tss.extend(chunk)
+        return tss
+
+    def put_timeseries_from_dss(
+        self,
+        dss: Path,
+        scenario: str,
+        version: str,
+        paths: list[schemas.NamedPath] | None = None,
+        max_workers: int = 1,
+    ) -> schemas.TimeseriesBatch:
+        """Read the data of the `NamedPath` objects from a DSS file, and add it to
+        the results server.
+
+        Each chunk of data is added while the next ones are read from the file.
+
+        Parameters
+        ----------
+        dss : Path
+            The DSS file to read
+        scenario : str
+            The name of the `Scenario` to assign the data to
+        version : str
+            The version of the `Run` to assign the data to
+        paths : list[schemas.NamedPath] | None, optional
+            The paths to read, by default all the paths on the results server
+        max_workers : int, optional
+            The number of processes reading the file, by default 1, which reads the
+            file in this process
+
+        Returns
+        -------
+        schemas.TimeseriesBatch
+            The `Timeseries` objects that were created, and the ones that failed
+        """
+        if paths is None:
+            paths = self.get_path()
+        result = schemas.TimeseriesBatch()
+        chunks = ingest.iter_timeseries_from_dss(
+            dss, scenario, version, paths, max_workers=max_workers
+        )
+        for chunk in chunks:
+            batch = self.put_timeseries_batch(chunk)
+            result.added.extend(batch.added)
+            result.failed.extend(batch.failed)
+        return result
 
     def get_all_timeseries_for_run(
         self,
         *,
         scenario: str,
         version: str,
+        format: str = "json",
     ) -> list[schemas.Timeseries]:
         """Get all of the `Timeseries` objects for th run provided.
 
@@ -250,6 +405,10 @@ class Client:
         version : str
             Matches against `Run.version`. If provided this method will return at most
             one `Timeseries` object
+        format : str, optional
+            The format the data is transferred in, either "json" or "arrow", by
+            default "json". The "arrow" format requires `pyarrow`, and is ignored by
+            clients that read the database directly
 
         Returns
         -------
@@ -258,6 +417,184 @@ class Client:
         """
         raise NotImplementedError()
 
+    def get_array_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        path: str,
+    ) -> schemas.ArrayTimeseries:
+        """Get the `ArrayTimeseries` object that matches the information provided.
+
+        The data is kept in numpy arrays, which is much smaller and faster than the
+        `Timeseries` returned by `get_timeseries`.
+
+        Parameters
+        ----------
+        scenario : str
+            Matches against `Run.scenario`
+        version : str
+            Matches against `Run.version`
+        path : str
+            Matches against `Timeseries.path`
+
+        Returns
+        -------
+        schemas.ArrayTimeseries
+            The `ArrayTimeseries` object matched
+        """
+        raise NotImplementedError()
+
+    def get_all_array_timeseries_for_run(
+        self,
+        *,
+        scenario: str,
+        version: str,
+    ) -> list[schemas.ArrayTimeseries]:
+        """Get all of the `ArrayTimeseries` objects for the run provided.
+
+        Parameters
+        ----------
+        scenario : str
+            Matches against `Run.scenario`
+        version : str
+            Matches against `Run.version`
+
+        Returns
+        -------
+        list[schemas.ArrayTimeseries]
+            The `ArrayTimeseries` objects in the run
+        """
+        raise NotImplementedError()
+
+    def get_timeseries_many(
+        self,
+        *,
+        scenarios: list[str],
+        paths: list[str],
+        versions: list[str | None] | None = None,
+        as_frame: bool = False,
+    ) -> list[schemas.ArrayTimeseries] | DataFrame:
+        """Get many paths from many runs at once, with a single request.
+
+        Parameters
+        ----------
+        scenarios : list[str]
+            The names of the scenarios
+        paths : list[str]
+            The paths to get from each run
+        versions : list[str | None] | None, optional
+            The version of the run for each scenario, by default None. A missing
+            version gets the preferred run of the scenario
+        as_frame : bool, optional
+            Whether to join the series into one wide `DataFrame`, by default False
+
+        Returns
+        -------
+        list[schemas.ArrayTimeseries] | DataFrame
+            The series found, ordered by run and then path. Runs or paths that can't
+            be found are skipped
+        """
+        raise NotImplementedError()
+
+    # ITERATE
+    def iter_assumptions(
+        self,
+        *,
+        kind: str = None,
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[schemas.Assumption]:
+        """Iterate over the `Assumption` objects, requesting them a page at a time.
+
+        Parameters
+        ----------
+        kind : str, optional
+            Matches against `Assumption.kind`, by default None
+        page_size : int, optional
+            The number of objects in each page, by default 500
+
+        Yields
+        ------
+        schemas.Assumption
+            The `Assumption` objects, ordered by `id`
+        """
+        yield from _pages(self.get_assumption, page_size, kind=kind)
+
+    def iter_scenarios(
+        self,
+        *,
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[schemas.Scenario]:
+        """Iterate over the `Scenario` objects, requesting them a page at a time.
+
+        Parameters
+        ----------
+        page_size : int, optional
+            The number of objects in each page, by default 500
+
+        Yields
+        ------
+        schemas.Scenario
+            The `Scenario` objects, ordered by `id`
+        """
+        yield from _pages(self.get_scenario, page_size)
+
+    def iter_runs(
+        self,
+        *,
+        scenario: str = None,
+        code_version: str = None,
+        contact: str = None,
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[schemas.Run]:
+        """Iterate over the `Run` objects, requesting them a page at a time.
+
+        Parameters
+        ----------
+        scenario : str, optional
+            Matches against `Run.scenario`, by default None
+        code_version : str, optional
+            Matches against `Run.code_version`, by default None
+        contact : str, optional
+            Matches against `Run.contact`, by default None
+        page_size : int, optional
+            The number of objects in each page, by default 500
+
+        Yields
+        ------
+        schemas.Run
+            The `Run` objects, ordered by `id`
+        """
+        yield from _pages(
+            self.get_run,
+            page_size,
+            scenario=scenario,
+            code_version=code_version,
+            contact=contact,
+        )
+
+    def iter_paths(
+        self,
+        *,
+        category: str = None,
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[schemas.NamedPath]:
+        """Iterate over the `NamedPath` objects, requesting them a page at a time.
+
+        Parameters
+        ----------
+        category : str, optional
+            Matches against `NamedPath.category`, by default None
+        page_size : int, optional
+            The number of objects in each page, by default 500
+
+        Yields
+        ------
+        schemas.NamedPath
+            The `NamedPath` objects, ordered by `id`
+        """
+        yield from _pages(self.get_path, page_size, category=category)
+
     # PUT
 
     def put_assumption(
@@ -440,8 +777,89 @@ class Client:
         """
         raise NotImplementedError()
 
+    def patch_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        # shadow pandss RegularTimeseries attributes
+        path: str | pdss.DatasetPath,
+        values: tuple[float, ...],
+        dates: tuple[str, ...],
+        period_type: str,
+        units: str,
+        interval: str,
+    ) -> schemas.TimeseriesUpdate:
+        """Add new values to a `Timeseries` on the results server, and correct the
+        values that changed.
+
+        Only the dates that are new, or have a different value than the stored one,
+        are written. Stored dates that aren't given are kept, and a `Timeseries`
+        that doesn't exist yet is created.
+
+        Parameters
+        ----------
+        scenario : str
+            The name of the `Scenario` that this data is assigned to
+        version : str
+            The verson of the `Run` that this data is assigned to
+        path : str | pdss.DatasetPath
+            The path of the `NamedPath` that this data is assigned to
+        values : tuple[float, ...]
+            The new or corrected values for the timeseries
+        dates : tuple[str, ...]
+            The ISO formatted dates of the values
+        period_type : str
+            The `period_type` of the DSS data for the timeseries
+        units : str
+            The `units` of the DSS data for the timeseries
+        interval : str
+            The `interval` of the DSS data for the timeseries
+
+        Returns
+        -------
+        schemas.TimeseriesUpdate
+            The number of values inserted, updated and left unchanged
+        """
+        raise NotImplementedError()
+
     def put_many_timeseries(
         self,
         timeseries: list[schemas.Timeseries],
     ) -> list[schemas.Timeseries]:
+        """Create many new `Timeseries` on the results server at once.
+
+        `Timeseries` that can't be added (unknown run or path, data that already
+        exists) are logged and skipped, they don't prevent the others from being added.
+
+        Parameters
+        ----------
+        timeseries : list[schemas.Timeseries]
+            The `Timeseries` objects to add
+
+        Returns
+        -------
+        list[schemas.Timeseries]
+            The `Timeseries` objects that were created
+        """
+        raise NotImplementedError()
+
+    def put_timeseries_batch(
+        self,
+        timeseries: list[schemas.Timeseries],
+    ) -> schemas.TimeseriesBatch:
+        """Create many new `Timeseries` on the results server at once, and report
+        which couldn't be added.
+
+        Parameters
+        ----------
+        timeseries : list[schemas.Timeseries]
+            The `Timeseries` objects to add
+
+        Returns
+        -------
+        schemas.TimeseriesBatch
+            The `Timeseries` objects that were created, and the failures with the
+            error that prevented each one from being added
+        """
         raise NotImplementedError()
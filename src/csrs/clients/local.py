@@ -2,12 +2,14 @@ import logging
 from pathlib import Path
 
 import pandss as pdss
+from pandas import DataFrame
 from sqlalchemy import create_engine
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import SingletonThreadPool
 
-from .. import crud, enums, errors, models, schemas
+from .. import crud, enums, errors, models, pragmas, schemas
+from ..config import DatabaseConfig
 from .base import Client
 
 
@@ -19,7 +21,31 @@ class LocalClient(Client):
         autocommit: bool = False,
         autoflush: bool = True,
         check_same_thread: bool = True,
+        storage: str = enums.StorageEnum.ledger,
+        sqlite_pragmas: dict[str, str | int] | None = None,
     ):
+        """Initialize a client that reads and writes a local database file.
+
+        Parameters
+        ----------
+        db_path : Path
+            The SQLite database, created if it doesn't exist
+        echo : bool, optional
+            Log the SQL that is run, by default False
+        autocommit : bool, optional
+            Passed to the session, by default False
+        autoflush : bool, optional
+            Passed to the session, by default True
+        check_same_thread : bool, optional
+            Passed to sqlite3, by default True
+        storage : str, optional
+            The storage engine used for new timeseries, by default "ledger"
+        sqlite_pragmas : dict[str, str | int] | None, optional
+            The pragmas run on each connection, by default the SQLite performance
+            profile of `DatabaseConfig`
+        """
+        if sqlite_pragmas is None:
+            sqlite_pragmas = DatabaseConfig().pragmas
         self.db_path = Path(db_path).resolve()
         self.engine = create_engine(
             "sqlite:///" + str(self.db_path),
@@ -29,12 +55,15 @@ class LocalClient(Client):
             poolclass=SingletonThreadPool,
             echo=echo,
         )
+        pragmas.apply_pragmas(self.engine, sqlite_pragmas)
         self.session = sessionmaker(
             autocommit=autocommit,
             autoflush=autoflush,
             bind=self.engine,
+            info={"storage": enums.StorageEnum(storage)},
         )()
         self.logger = logging.getLogger(__name__)
+        # Only missing tables are created, see scripts/upgrade_database.py for indexes
         models.Base.metadata.create_all(bind=self.engine)
 
     def __str__(self) -> str:
@@ -42,6 +71,8 @@ class LocalClient(Client):
 
     def close(self):
         self.session.close()
+        # Leave the database in one file, an immutable reader ignores the WAL journal
+        pragmas.checkpoint(self.engine)
         self.engine.dispose()
 
     # annotations and type hints are in pyi file
@@ -55,9 +86,18 @@ class LocalClient(Client):
         kind: str = None,
         name: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Assumption]:
         try:
-            return crud.assumptions.read(db=self.session, kind=kind, name=name, id=id)
+            return crud.assumptions.read(
+                db=self.session,
+                kind=kind,
+                name=name,
+                id=id,
+                limit=limit,
+                after=after,
+            )
         except errors.EmptyLookupError:
             return []
 
@@ -66,9 +106,17 @@ class LocalClient(Client):
         *,
         name: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Scenario]:
         try:
-            return crud.scenarios.read(db=self.session, name=name, id=id)
+            return crud.scenarios.read(
+                db=self.session,
+                name=name,
+                id=id,
+                limit=limit,
+                after=after,
+            )
         except errors.EmptyLookupError:
             return []
 
@@ -78,7 +126,10 @@ class LocalClient(Client):
         scenario: str = None,
         version: str = None,
         code_version: str = None,
+        contact: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Run]:
         try:
             return crud.runs.read(
@@ -86,7 +137,10 @@ class LocalClient(Client):
                 scenario=scenario,
                 version=version,
                 code_version=code_version,
+                contact=contact,
                 id=id,
+                limit=limit,
+                after=after,
             )
         except errors.EmptyLookupError:
             return []
@@ -98,6 +152,8 @@ class LocalClient(Client):
         path: str = None,
         category: str = None,
         id: str = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.NamedPath]:
         try:
             return crud.paths.read(
@@ -106,6 +162,8 @@ class LocalClient(Client):
                 path=path,
                 category=category,
                 id=id,
+                limit=limit,
+                after=after,
             )
         except errors.EmptyLookupError:
             return []
@@ -116,6 +174,7 @@ class LocalClient(Client):
         scenario: str,
         version: str,
         path: str,
+        format: str = "json",
     ) -> schemas.Timeseries:
         return crud.timeseries.read(
             db=self.session,
@@ -124,61 +183,69 @@ class LocalClient(Client):
             path=path,
         )
 
-    def get_timeseries_from_dss(
+    def get_all_timeseries_for_run(
         self,
-        dss: Path,
+        *,
         scenario: str,
         version: str,
-        paths: list[schemas.NamedPath] | None = None,
+        format: str = "json",
     ) -> list[schemas.Timeseries]:
-        if paths is None:
-            paths = self.get_path()
-        tss = list()
-        with pdss.DSS(dss) as dss_obj:
-            for p in paths:
-                try:
-                    rtss = list(dss_obj.read_multiple_rts(p.path))
-                except Exception as e:
-                    self.logger.error(
-                        f"{type(e)} when reading {p.path} in {dss}, skipping"
-                    )
-                    continue
-                if len(rtss) == 0:
-                    self.logger.warning(f"no datasets match {p.path} in {dss}")
-                    continue
-                elif len(rtss) > 1:
-                    self.logger.warning(
-                        f"multiple datasets match {p.path} in {dss}, "
-                        + "skipping both to avoid conflicts"
-                    )
-                    continue
-                rts = rtss[0]
-                ts = schemas.Timeseries.from_pandss(
-                    scenario=scenario,
-                    version=version,
-                    rts=rts,
-                )
-                ts.path = p.path  # Use the path from the database, not in the dss
-                tss.append(ts)
-        self.logger.info(
-            f"{len(tss)} Timeseries found from {len(paths)} paths in {dss}"
+        try:
+            return crud.timeseries.read_all_for_run(
+                self.session,
+                scenario=scenario,
+                version=version,
+            )
+        except errors.EmptyLookupError:
+            return []
+
+    def get_array_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        path: str,
+    ) -> schemas.ArrayTimeseries:
+        return crud.timeseries.read_arrays(
+            db=self.session,
+            scenario=scenario,
+            version=version,
+            path=path,
         )
-        return tss
 
-    def get_all_timeseries_for_run(
+    def get_all_array_timeseries_for_run(
         self,
         *,
         scenario: str,
         version: str,
-    ) -> list[schemas.Timeseries]:
+    ) -> list[schemas.ArrayTimeseries]:
         try:
-            return crud.timeseries.read_all_for_run(
+            series = crud.timeseries.read_arrays_for_run(
                 self.session,
                 scenario=scenario,
                 version=version,
             )
         except errors.EmptyLookupError:
             return []
+        return list(series)
+
+    def get_timeseries_many(
+        self,
+        *,
+        scenarios: list[str],
+        paths: list[str],
+        versions: list[str | None] | None = None,
+        as_frame: bool = False,
+    ) -> list[schemas.ArrayTimeseries] | DataFrame:
+        series = crud.timeseries.read_many_arrays(
+            self.session,
+            scenarios=scenarios,
+            paths=paths,
+            versions=versions,
+        )
+        if as_frame:
+            return schemas.concat_frames(series)
+        return series
 
     # PUT
     def put_assumption(
@@ -305,19 +372,42 @@ class LocalClient(Client):
         )
         return crud.timeseries.create(db=self.session, **obj.model_dump())
 
+    def patch_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        # shadow pandss RegularTimeseries attributes
+        path: str | pdss.DatasetPath,
+        values: tuple[float, ...],
+        dates: tuple[str, ...],
+        period_type: str,
+        units: str,
+        interval: str,
+    ) -> schemas.TimeseriesUpdate:
+        obj = schemas.Timeseries(
+            scenario=scenario,
+            version=version,
+            path=path,
+            values=values,
+            dates=dates,
+            period_type=period_type,
+            units=units,
+            interval=interval,
+        )
+        return crud.timeseries.update(db=self.session, **obj.model_dump())
+
     def put_many_timeseries(
         self,
         timeseries: list[schemas.Timeseries],
     ) -> list[schemas.Timeseries]:
-        added = list()
-        for ts in timeseries:
-            try:
-                ts_db = crud.timeseries.create(
-                    db=self.session,
-                    **ts.model_dump(exclude="id"),
-                )
-                added.append(ts_db)
-            except Exception as e:
-                self.logger.error(f"{type(e)} when adding {ts}, continuing")
+        batch = self.put_timeseries_batch(timeseries)
+        for failure in batch.failed:
+            self.logger.error(f"couldn't add {failure}, {failure.error}")
+        return batch.added
 
-        return added
+    def put_timeseries_batch(
+        self,
+        timeseries: list[schemas.Timeseries],
+    ) -> schemas.TimeseriesBatch:
+        return crud.timeseries.create_many(db=self.session, timeseries=timeseries)
@@ -1,26 +1,233 @@
+import importlib.util
 import logging
-from pathlib import Path
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, TypeVar
 
 import httpx
 import pandss as pdss
+from pandas import DataFrame
 from sqlalchemy.exc import IntegrityError
 
-from .. import enums, schemas
+from .. import crud, enums, formats, schemas
+from ._cache import DiskResponseCache, ResponseCache, send
 from .base import Client
 
+logger = logging.getLogger(__name__)
+# Uploads aren't idempotent, so they're only retried when the server can't have
+# handled the request: it refused it for now, or it was never sent. A 502 or 504 may
+# come from a proxy after the data was added, and a retry would fail as a duplicate.
+RETRY_STATUS_CODES = (429, 503)
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+ModelT = TypeVar("ModelT", bound=schemas.CSRS_Model)
+
+
+def _get(
+    actor: httpx.Client,
+    cache: ResponseCache | DiskResponseCache | None,
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+) -> httpx.Response:
+    request = actor.build_request("GET", url, params=params, headers=headers)
+    return send(actor, cache, request)
+
+
+def _params(**filters) -> dict:
+    """The query parameters, without the filters that weren't given."""
+    return {k: v for k, v in filters.items() if v}
+
+
+def _accept(format: str) -> dict[str, str]:
+    if format == "json":
+        return dict()
+    elif format == "arrow":
+        formats.import_pyarrow()  # fail before the request if it's missing
+        return {"Accept": f"{formats.ARROW_MEDIA_TYPE}, application/json;q=0.9"}
+    raise ValueError(f"{format=}, expected one of: json, arrow")
+
+
+def _accept_arrays() -> dict[str, str]:
+    return _accept("arrow" if formats.has_pyarrow() else "json")
+
+
+def _is_arrow(response: httpx.Response) -> bool:
+    content_type = response.headers.get("content-type", "")
+    return content_type.startswith(formats.ARROW_MEDIA_TYPE)
+
+
+def _read_model(response: httpx.Response, model: type[ModelT]) -> ModelT:
+    response.raise_for_status()
+    return model.model_validate(response.json())
+
+
+def _read_models(response: httpx.Response, model: type[ModelT]) -> list[ModelT]:
+    response.raise_for_status()
+    return [model.model_validate(obj) for obj in response.json()]
+
+
+def _read_timeseries(response: httpx.Response) -> schemas.Timeseries:
+    response.raise_for_status()
+    if _is_arrow(response):
+        (ts,) = formats.read_ipc_stream(response.content)
+        return ts.to_timeseries()
+    return schemas.Timeseries.model_validate(response.json())
+
+
+def _read_all_timeseries(response: httpx.Response) -> list[schemas.Timeseries]:
+    response.raise_for_status()
+    if _is_arrow(response):
+        series = formats.read_ipc_stream(response.content)
+        return list(crud.timeseries.arrays_to_timeseries(series))
+    return [schemas.Timeseries.model_validate(ts) for ts in response.json()]
+
+
+def _read_arrays(response: httpx.Response) -> list[schemas.ArrayTimeseries]:
+    response.raise_for_status()
+    if _is_arrow(response):
+        return formats.read_ipc_stream(response.content)
+    content = response.json()
+    if isinstance(content, dict):
+        content = [content]
+    return [schemas.ArrayTimeseries.model_validate(ts) for ts in content]
+
+
+def _batch_params(
+    scenarios: list[str],
+    paths: list[str],
+    versions: list[str | None] | None,
+) -> dict:
+    params = dict(scenario=scenarios, path=paths)
+    if versions is not None:
+        params["version"] = [v or "" for v in versions]
+    return params
+
+
+def _run_url(prefer_this_version: bool) -> str:
+    return "/runs" if prefer_this_version else "/runs/legacy"
+
+
+def _has_h2() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    return response.status_code in RETRY_STATUS_CODES
+
+
+def _retry_delay(
+    response: httpx.Response | None, attempt: int, backoff: float
+) -> float:
+    retry_after = response.headers.get("retry-after", "") if response else ""
+    if retry_after.isdigit():
+        return float(retry_after)
+    # exponential, with jitter so concurrent uploads don't retry in lockstep
+    return backoff * (2**attempt) * random.uniform(0.5, 1.0)
+
+
+def _put_with_retries(
+    actor: httpx.Client,
+    url: str,
+    json: Any,
+    retries: int,
+    backoff: float,
+) -> httpx.Response:
+    """PUT the data, retrying when the connection couldn't be made, and on responses
+    that say the server didn't handle the request."""
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = actor.put(url, json=json)
+        except RETRY_ERRORS as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"{type(e).__name__} on {url}, retrying")
+        else:
+            if (not _should_retry(response)) or (attempt == retries):
+                response.raise_for_status()
+                return response
+            logger.warning(f"{response.status_code} on {url}, retrying")
+        time.sleep(_retry_delay(response, attempt, backoff))
+
+
+def _chunks(
+    timeseries: list[schemas.Timeseries],
+    size: int,
+) -> list[list[schemas.Timeseries]]:
+    chunks = list()
+    for start in range(0, len(timeseries), size):
+        stop = start + size
+        chunks.append(timeseries[start:stop])
+    return chunks
+
+
+def _failed_chunk(
+    chunk: list[schemas.Timeseries],
+    error: Exception,
+) -> schemas.TimeseriesBatch:
+    logger.error(f"{type(error)} when adding {len(chunk)} timeseries")
+    message = f"{type(error).__name__}: {error}"
+    failed = [
+        schemas.TimeseriesFailure(
+            scenario=ts.scenario,
+            version=ts.version,
+            path=ts.path,
+            error=message,
+        )
+        for ts in chunk
+    ]
+    return schemas.TimeseriesBatch(failed=failed)
+
+
+def _merge_batches(
+    batches: Iterable[schemas.TimeseriesBatch],
+) -> schemas.TimeseriesBatch:
+    result = schemas.TimeseriesBatch()
+    for batch in batches:
+        result.added.extend(batch.added)
+        result.failed.extend(batch.failed)
+    return result
+
 
 class RemoteClient(Client):
     """Client used to interact with a remote Results Server."""
 
-    def __init__(self, base_url: str, **kwargs):
+    def __init__(
+        self,
+        base_url: str,
+        batch_size: int = 50,
+        response_cache: ResponseCache | DiskResponseCache | None = None,
+        max_concurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        **kwargs,
+    ):
         """Initialize a client, and target a remote URL.
 
         Parameters
         ----------
         base_url : str
             The URL of the results server.
+        batch_size : int, optional
+            The number of `Timeseries` sent per request by `put_many_timeseries`, by
+            default 50
+        response_cache : ResponseCache | DiskResponseCache | None, optional
+            Keep responses, and only download them again when they've changed on
+            the server, by default None. Use a `DiskResponseCache` to keep them
+            between processes
+        max_concurrency : int, optional
+            The number of requests `put_many_timeseries` sends at the same time, by
+            default 4
+        retries : int, optional
+            The number of times an upload is retried after a connection error, or a
+            response saying the server is busy, by default 3
+        backoff : float, optional
+            The delay in seconds before the first retry, doubled for each retry, by
+            default 0.5
         kwargs
-            All other keyword arguments are passed to httpx.Client()
+            All other keyword arguments are passed to httpx.Client(). HTTP/2 is
+            used by default when the `h2` package is installed
 
         Example
         -------
@@ -30,7 +237,13 @@ class RemoteClient(Client):
         >>> client = csrs.RemoteClient(url)
         ```
         """
+        kwargs.setdefault("http2", _has_h2())
         self.actor = httpx.Client(base_url=base_url, **kwargs)
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = response_cache
         self.logger = logging.getLogger(__name__)
 
     def __str__(self) -> str:
@@ -39,7 +252,7 @@ class RemoteClient(Client):
     # GET
     def get_assumption_names(self) -> tuple[str]:
         url = "/assumptions/names"
-        response = self.actor.get(url)
+        response = _get(self.actor, self.cache, url)
         response.raise_for_status()
         return response.json()
 
@@ -49,26 +262,26 @@ class RemoteClient(Client):
         kind: str = None,
         name: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Assumption]:
         url = "/assumptions"
-        params = dict(kind=kind, name=name, id=id)
-        params = {k: v for k, v in params.items() if v}
-        response = self.actor.get(url, params=params)
-        response.raise_for_status()
-        return [schemas.Assumption.model_validate(a) for a in response.json()]
+        params = _params(kind=kind, name=name, id=id, limit=limit, after=after)
+        response = _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.Assumption)
 
     def get_scenario(
         self,
         *,
         name: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Scenario]:
         url = "/scenarios"
-        params = dict(name=name, id=id)
-        params = {k: v for k, v in params.items() if v}
-        response = self.actor.get(url, params=params)
-        response.raise_for_status()
-        return [schemas.Scenario.model_validate(a) for a in response.json()]
+        params = _params(name=name, id=id, limit=limit, after=after)
+        response = _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.Scenario)
 
     def get_run(
         self,
@@ -76,19 +289,23 @@ class RemoteClient(Client):
         scenario: str = None,
         version: str = None,
         code_version: str = None,
+        contact: str = None,
         id: int = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.Run]:
         url = "/runs"
-        params = dict(
+        params = _params(
             scenario=scenario,
             version=version,
             code_version=code_version,
+            contact=contact,
             id=id,
+            limit=limit,
+            after=after,
         )
-        params = {k: v for k, v in params.items() if v}
-        response = self.actor.get(url, params=params)
-        response.raise_for_status()
-        return [schemas.Run.model_validate(a) for a in response.json()]
+        response = _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.Run)
 
     def get_path(
         self,
@@ -97,18 +314,20 @@ class RemoteClient(Client):
         path: str = None,
         category: str = None,
         id: str = None,
+        limit: int = None,
+        after: int = None,
     ) -> list[schemas.NamedPath]:
         url = "/paths"
-        params = dict(
+        params = _params(
             name=name,
             path=path,
             category=category,
             id=id,
+            limit=limit,
+            after=after,
         )
-        params = {k: v for k, v in params.items() if v}
-        response = self.actor.get(url, params=params)
-        response.raise_for_status()
-        return [schemas.NamedPath.model_validate(a) for a in response.json()]
+        response = _get(self.actor, self.cache, url, params=params)
+        return _read_models(response, schemas.NamedPath)
 
     def get_timeseries(
         self,
@@ -116,74 +335,81 @@ class RemoteClient(Client):
         scenario: str,
         version: str,
         path: str,
+        format: str = "json",
     ) -> schemas.Timeseries:
         url = "/timeseries"
-        params = dict(
+        params = _params(
             scenario=scenario,
             version=version,
             path=path,
         )
-        params = {k: v for k, v in params.items() if v}
-        response = self.actor.get(url, params=params)
-        response.raise_for_status()
-        return schemas.Timeseries.model_validate(response.json())
+        response = _get(
+            self.actor, self.cache, url, params=params, headers=_accept(format)
+        )
+        return _read_timeseries(response)
 
-    def get_timeseries_from_dss(
+    def get_all_timeseries_for_run(
         self,
-        dss: Path,
+        *,
         scenario: str,
         version: str,
-        paths: list[schemas.NamedPath] | None = None,
+        format: str = "json",
     ) -> list[schemas.Timeseries]:
-        if paths is None:
-            paths = self.get_path()
-        tss = list()
-        with pdss.DSS(dss) as dss_obj:
-            for p in paths:
-                try:
-                    rtss = list(dss_obj.read_multiple_rts(p.path))
-                except Exception as e:
-                    self.logger.error(
-                        f"{type(e)} when reading {p.path} in {dss}, skipping"
-                    )
-                    continue
-                if len(rtss) == 0:
-                    self.logger.warning(f"no datasets match {p.path} in {dss}")
-                    continue
-                elif len(rtss) > 1:
-                    self.logger.warning(
-                        f"multiple datasets match {p.path} in {dss}, "
-                        + "skipping both to avoid conflicts"
-                    )
-                    continue
-                rts = rtss[0]
-                ts = schemas.Timeseries.from_pandss(
-                    scenario=scenario,
-                    version=version,
-                    rts=rts,
-                )
-                ts.path = p.path  # Use the path from the database, not in the dss
-                tss.append(ts)
-        self.logger.info(
-            f"{len(tss)} Timeseries found from {len(paths)} paths in {dss}"
+        url = "/timeseries/all"
+        params = _params(
+            scenario=scenario,
+            version=version,
+        )
+        response = _get(
+            self.actor, self.cache, url, params=params, headers=_accept(format)
         )
-        return tss
+        return _read_all_timeseries(response)
 
-    def get_all_timeseries_for_run(
+    def get_array_timeseries(
         self,
         *,
         scenario: str,
         version: str,
-    ) -> list[schemas.Timeseries]:
+        path: str,
+    ) -> schemas.ArrayTimeseries:
+        url = "/timeseries"
+        params = _params(scenario=scenario, version=version, path=path)
+        response = _get(
+            self.actor, self.cache, url, params=params, headers=_accept_arrays()
+        )
+        (ts,) = _read_arrays(response)
+        return ts
+
+    def get_all_array_timeseries_for_run(
+        self,
+        *,
+        scenario: str,
+        version: str,
+    ) -> list[schemas.ArrayTimeseries]:
         url = "/timeseries/all"
-        params = dict(
-            scenario=scenario,
-            version=version,
+        params = _params(scenario=scenario, version=version)
+        response = _get(
+            self.actor, self.cache, url, params=params, headers=_accept_arrays()
         )
-        params = {k: v for k, v in params.items() if v}
-        response = self.actor.get(url, params=params)
-        response.raise_for_status()
-        return [schemas.Timeseries.model_validate(ts) for ts in response.json()]
+        return _read_arrays(response)
+
+    def get_timeseries_many(
+        self,
+        *,
+        scenarios: list[str],
+        paths: list[str],
+        versions: list[str | None] | None = None,
+        as_frame: bool = False,
+    ) -> list[schemas.ArrayTimeseries] | DataFrame:
+        url = "/timeseries/batch"
+        params = _batch_params(scenarios, paths, versions)
+        response = _get(
+            self.actor, self.cache, url, params=params, headers=_accept_arrays()
+        )
+        series = _read_arrays(response)
+        if as_frame:
+            return schemas.concat_frames(series)
+        return series
 
     # PUT
 
@@ -197,8 +423,7 @@ class RemoteClient(Client):
         url = "/assumptions"
         obj = schemas.Assumption(name=name, kind=kind, detail=detail)
         response = self.actor.put(url, json=obj.model_dump(mode="json"))
-        response.raise_for_status()
-        return schemas.Assumption.model_validate(response.json())
+        return _read_model(response, schemas.Assumption)
 
     def put_scenario(
         self,
@@ -209,8 +434,7 @@ class RemoteClient(Client):
         url = "/scenarios"
         obj = schemas.Scenario(name=name, assumptions=assumptions)
         response = self.actor.put(url, json=obj.model_dump(mode="json"))
-        response.raise_for_status()
-        return schemas.Scenario.model_validate(response.json())
+        return _read_model(response, schemas.Scenario)
 
     def put_run(
         self,
@@ -238,12 +462,9 @@ class RemoteClient(Client):
             confidential=confidential,
             published=published,
         )
-        url = "/runs"
-        if not prefer_this_version:
-            url = url + "/legacy"
+        url = _run_url(prefer_this_version)
         response = self.actor.put(url, json=obj.model_dump(mode="json"))
-        response.raise_for_status()
-        return schemas.Run.model_validate(response.json())
+        return _read_model(response, schemas.Run)
 
     def put_path(
         self,
@@ -267,8 +488,7 @@ class RemoteClient(Client):
         )
         url = "/paths"
         response = self.actor.put(url, json=obj.model_dump(mode="json", exclude=("id")))
-        response.raise_for_status()
-        return schemas.NamedPath.model_validate(response.json())
+        return _read_model(response, schemas.NamedPath)
 
     def put_standard_paths(self) -> list[schemas.NamedPath]:
         url = "/paths"
@@ -282,9 +502,7 @@ class RemoteClient(Client):
                         exclude=("id"),
                     ),
                 )
-                response.raise_for_status()
-                named = schemas.NamedPath.model_validate(response.json())
-                added.append(named)
+                added.append(_read_model(response, schemas.NamedPath))
             except IntegrityError as e:
                 self.logger.warning(
                     f"{type(e).__name__} occurred, likely due to one of the standard "
@@ -322,21 +540,63 @@ class RemoteClient(Client):
         )
         url = "/timeseries"
         response = self.actor.put(url, json=obj.model_dump(mode="json"))
-        response.raise_for_status()
-        return schemas.Timeseries.model_validate(response.json())
+        return _read_model(response, schemas.Timeseries)
+
+    def patch_timeseries(
+        self,
+        *,
+        scenario: str,
+        version: str,
+        # shadow pandss RegularTimeseries attributes
+        path: str | pdss.DatasetPath,
+        values: tuple[float, ...],
+        dates: tuple[str, ...],
+        period_type: str,
+        units: str,
+        interval: str,
+    ) -> schemas.TimeseriesUpdate:
+        obj = schemas.Timeseries(
+            scenario=scenario,
+            version=version,
+            path=path,
+            values=values,
+            dates=dates,
+            period_type=period_type,
+            units=units,
+            interval=interval,
+        )
+        url = "/timeseries"
+        response = self.actor.patch(url, json=obj.model_dump(mode="json"))
+        return _read_model(response, schemas.TimeseriesUpdate)
 
     def put_many_timeseries(
         self,
         timeseries: list[schemas.Timeseries],
     ) -> list[schemas.Timeseries]:
-        url = "/timeseries"
-        added = list()
-        for ts in timeseries:
+        batch = self.put_timeseries_batch(timeseries)
+        for failure in batch.failed:
+            self.logger.error(f"couldn't add {failure}, {failure.error}")
+        return batch.added
+
+    def put_timeseries_batch(
+        self,
+        timeseries: list[schemas.Timeseries],
+    ) -> schemas.TimeseriesBatch:
+        url = "/timeseries/many"
+
+        def put_chunk(chunk: list[schemas.Timeseries]) -> schemas.TimeseriesBatch:
             try:
-                response = self.actor.put(url, json=ts.model_dump(mode="json"))
-                response.raise_for_status()
-                ts_db = schemas.Timeseries.model_validate(response.json())
-                added.append(ts_db)
+                response = _put_with_retries(
+                    self.actor,
+                    url,
+                    json=[ts.model_dump(mode="json") for ts in chunk],
+                    retries=self.retries,
+                    backoff=self.backoff,
+                )
             except Exception as e:
-                self.logger.error(f"{type(e)} when adding {ts}, continuing")
-        return added
+                return _failed_chunk(chunk, e)
+            return schemas.TimeseriesBatch.model_validate(response.json())
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            chunks = _chunks(timeseries, self.batch_size)
+            return _merge_batches(pool.map(put_chunk, chunks))
@@ -3,10 +3,12 @@ import logging.handlers
 import sys
 from pathlib import Path
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from uvicorn.logging import ColourizedFormatter
 
 from . import __version__
+from .enums import StorageEnum
 
 
 class LoggedSettings(BaseSettings):
@@ -33,19 +35,79 @@ class AppConfig(LoggedSettings):
     }
     version: str = __version__ or "dev"
     docs_url: str = "/docs"
+    # Sync route handlers run on this many threads, so they don't block the loop
+    worker_threads: int = 40
     model_config = SettingsConfigDict(env_file=".app")
 
+    def fastapi_kwargs(self) -> dict:
+        return self.model_dump(exclude={"worker_threads"})
+
 
 class DatabaseConfig(LoggedSettings):
     source: Path = Path("csrs.db").resolve()
     echo: bool = False
     allow_download: bool = True
     allow_editing_via_forms: bool = False
+    storage: StorageEnum = StorageEnum.ledger
+    # Serve an immutable copy of the database, write routes are not registered
+    read_only: bool = False
+    replica: Path | None = None  # read instead of source when read_only
+    # SQLite performance profile, applied to every new connection
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    mmap_size: int = 256 * 1024**2  # bytes
+    cache_size: int = -64 * 1024  # negative values are KiB, positive are pages
+    temp_store: str = "memory"
+    busy_timeout: int = 5_000  # milliseconds
+    foreign_keys: bool = True  # enforce the ON DELETE rules of the models
+    # Sent with the ETag of GET responses, clients revalidate before reusing them
+    cache_control: str = "no-cache"
+    # Series of published runs are kept in memory, up to this many bytes
+    series_cache_bytes: int = 256 * 1024**2
+    # The listing routes return pages of at most this many objects
+    max_page_size: int = 1_000
     model_config = SettingsConfigDict(env_file=".database")
 
+    @model_validator(mode="after")
+    def no_editing_when_read_only(self):
+        if self.read_only and self.allow_editing_via_forms:
+            logger = logging.getLogger(__name__)
+            logger.warning("allow_editing_via_forms is ignored when read_only")
+            self.allow_editing_via_forms = False
+        return self
+
+    @property
+    def path(self) -> Path:
+        """The database file that is served."""
+        if self.read_only and (self.replica is not None):
+            return self.replica.resolve()
+        return self.source
+
     @property
     def url(self) -> str:
-        return f"sqlite:///{self.source}"
+        if self.read_only:
+            # immutable skips all locking, so workers only share the OS page cache
+            return f"sqlite:///{self.path.as_uri()}?mode=ro&immutable=1&uri=true"
+        return f"sqlite:///{self.path}"
+
+    @property
+    def pragmas(self) -> dict[str, str | int]:
+        if self.read_only:  # only the pragmas that don't write to the file
+            return dict(
+                mmap_size=self.mmap_size,
+                cache_size=self.cache_size,
+                temp_store=self.temp_store,
+            )
+        # busy_timeout is first so the journal_mode change waits for other writers
+        return dict(
+            busy_timeout=self.busy_timeout,
+            foreign_keys="ON" if self.foreign_keys else "OFF",
+            journal_mode=self.journal_mode,
+            synchronous=self.synchronous,
+            mmap_size=self.mmap_size,
+            cache_size=self.cache_size,
+            temp_store=self.temp_store,
+        )
 
 
 class LogConfig(LoggedSettings):
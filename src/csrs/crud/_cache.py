@@ -0,0 +1,183 @@
+"""In-process caches of the series read from published runs, and of the paths.
+
+Published runs don't change, so their series can be kept in memory between requests.
+The cache is bounded by the bytes of the arrays it holds, and evicts the least
+recently used series first. Entries are keyed by
+`(database url, run_id, revision, path_id)`, so engines for different databases can
+share it.
+
+Every write to the series of a run bumps its `RunRevision`, in whichever process made
+it, and readers look the revision up before using the cache. A series written by
+another process is keyed by the new revision, so the stale entry is never served and
+ages out of the cache. Writes in this process also remove the entries they replace.
+
+The `NamedPath` objects of each database are kept in a `PathIndex`, along with the
+`PathRevision` it was built from. Every write to the paths bumps the revision, and the
+index is rebuilt when a request finds that it has moved on, so paths written by other
+processes are seen too.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..path_index import PathIndex
+
+logger = logging.getLogger(__name__)
+MAX_BYTES = 256 * 1024**2
+PATH_REVISION_ID = 1  # the only row of the path_revisions table
+
+Key = tuple[str, int, int, int]
+
+
+def database_key(db: Session) -> str:
+    return str(db.get_bind().url)
+
+
+class SeriesCache:
+    """A least recently used cache of `(datetimes, values)` arrays, bounded in bytes.
+
+    The cached arrays are made read-only, since they are shared by every reader.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Key, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self.entries
+
+    def get(self, key: Key) -> tuple[np.ndarray, np.ndarray] | None:
+        with self.lock:
+            found = self.entries.get(key)
+            if found is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return found
+
+    def put(self, key: Key, datetimes: np.ndarray, values: np.ndarray) -> None:
+        size = datetimes.nbytes + values.nbytes
+        if size > self.max_bytes:
+            return
+        datetimes.flags.writeable = False
+        values.flags.writeable = False
+        with self.lock:
+            self._pop(key)
+            self.entries[key] = (datetimes, values)
+            self.n_bytes += size
+            self._evict(self.max_bytes)
+
+    def invalidate(self, database: str, run_id: int, path_id: int | None = None) -> int:
+        """Remove the series of a run, or one path of the run, returning the count.
+
+        Entries of every revision of the run are removed.
+        """
+        with self.lock:
+            keys = [
+                key
+                for key in self.entries
+                if (key[0] == database)
+                and (key[1] == run_id)
+                and ((path_id is None) or (key[3] == path_id))
+            ]
+            for key in keys:
+                self._pop(key)
+        if keys:
+            logger.debug(f"invalidated {len(keys)} cached series of {run_id=}")
+        return len(keys)
+
+    def resize(self, max_bytes: int) -> None:
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict(max_bytes)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.n_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """The counters of the cache, and its current size."""
+        with self.lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self.entries),
+                bytes=self.n_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _pop(self, key: Key) -> None:
+        found = self.entries.pop(key, None)
+        if found is not None:
+            self.n_bytes -= found[0].nbytes + found[1].nbytes
+
+    def _evict(self, max_bytes: int) -> None:
+        while self.n_bytes > max_bytes:
+            _, (datetimes, values) = self.entries.popitem(last=False)
+            self.n_bytes -= datetimes.nbytes + values.nbytes
+            self.evictions += 1
+
+
+SERIES = SeriesCache()
+
+
+def read_path_revision(db: Session) -> int:
+    revision = db.execute(
+        select(models.PathRevision.revision).where(
+            models.PathRevision.id == PATH_REVISION_ID
+        )
+    ).scalar()
+    return revision or 0
+
+
+class PathIndexes:
+    """The `PathIndex` of each database, rebuilt when the paths' revision changes."""
+
+    def __init__(self):
+        self.indexes: dict[str, tuple[int, PathIndex]] = dict()
+        self.lock = threading.Lock()
+
+    def get(self, db: Session) -> PathIndex:
+        database = database_key(db)
+        revision = read_path_revision(db)
+        with self.lock:
+            found = self.indexes.get(database)
+        if (found is not None) and (found[0] == revision):
+            return found[1]
+        paths = [
+            schemas.NamedPath.model_validate(p, from_attributes=True)
+            for p in db.query(models.NamedPath)
+        ]
+        index = PathIndex(paths)
+        logger.debug(f"indexed {len(index)} paths of {database}, {revision=}")
+        with self.lock:
+            self.indexes[database] = (revision, index)
+        return index
+
+    def invalidate(self, db: Session) -> None:
+        with self.lock:
+            self.indexes.pop(database_key(db), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.indexes.clear()
+
+
+PATHS = PathIndexes()
@@ -1,7 +1,9 @@
 from typing import TypeVar
 
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import Query, Session, contains_eager, joinedload, selectinload
 
+from .. import models
 from ..models import Base
 
 Model = TypeVar("Model", bound=Base)
@@ -43,3 +45,44 @@ def rollback_on_exception(func):
             raise e  # Raise error from decorated func
 
     return _rollback_inner
+
+
+def keyset_page(
+    query: Query,
+    column: ColumnElement[int],
+    limit: int | None = None,
+    after: int | None = None,
+) -> Query:
+    """Order the query by a unique `column`, and keep the page of `limit` rows that
+    follows the cursor `after`.
+
+    The cursor is the value of `column` on the last row of the previous page, so a
+    page is found through the index of the column, however deep it is.
+    """
+    if after is not None:
+        query = query.filter(column > after)
+    query = query.order_by(column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def run_query(db: Session) -> Query:
+    """Query `Run` objects joined to their version and scenario.
+
+    The relationships used by `crud.runs.model_to_schema` are loaded by the same
+    query, or one more for the children, instead of once per run.
+    """
+    parent_history = joinedload(models.Run.parent).joinedload(models.Run.history)
+    children_history = selectinload(models.Run.children).joinedload(models.Run.history)
+    return (
+        db.query(models.Run)
+        .join(models.Run.history)
+        .join(models.Scenario, models.Scenario.id == models.Run.scenario_id)
+        .options(
+            contains_eager(models.Run.history),
+            contains_eager(models.Run.scenario),
+            parent_history,
+            children_history,
+        )
+    )
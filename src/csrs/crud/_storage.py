@@ -0,0 +1,536 @@
+"""Storage engines for timeseries data.
+
+Two engines are supported, selected with `DatabaseConfig.storage`:
+
+- `ledger`: one `TimeseriesLedger` row per value
+- `blob`: one `TimeseriesBlob` row per series, values packed as float64 arrays
+
+Reads always check both engines, so a database can be migrated between them
+incrementally with `repack`.
+"""
+
+import heapq
+import logging
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..enums import StorageEnum
+
+logger = logging.getLogger(__name__)
+EPOCH = np.datetime64("1900-01-01T00:00:00", "us")
+DTYPE = np.dtype("<f8")
+SERIES_DTYPE = np.dtype([("datetime", DTYPE), ("value", DTYPE)])
+LEDGER_DTYPE = np.dtype([("datetime", DTYPE), ("path_id", "<i8"), ("value", DTYPE)])
+CALENDAR_UNITS = {"1MON": "M", "1YEAR": "Y"}
+ROWS_PER_FETCH = 10_000
+BLOBS_PER_FETCH = 100
+DATES_PER_BLOCK = 500
+
+
+def get_storage(db: Session) -> StorageEnum:
+    return StorageEnum(db.info.get("storage", StorageEnum.ledger))
+
+
+def pack(array: np.ndarray) -> bytes:
+    return np.ascontiguousarray(array, dtype=DTYPE).tobytes()
+
+
+def unpack(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=DTYPE)
+
+
+def regular_datetimes(start: float, length: int, interval: str) -> np.ndarray | None:
+    """Generate the datetimes of a calendar-regular series, as seconds since EPOCH.
+
+    A series is regular when `start` falls on the first or last day of a calendar
+    period (month, year) and every following step lands on the same position in the
+    next period. Returns `None` when `start` doesn't sit on a period boundary, or the
+    interval isn't a calendar interval.
+    """
+    unit = CALENDAR_UNITS.get(str(interval))
+    if unit is None:
+        return None
+    first = EPOCH + np.timedelta64(round(start * 1e6), "us")
+    day = first.astype("datetime64[D]")
+    time_of_day = first - day
+    period = day.astype(f"datetime64[{unit}]")
+    steps = np.arange(length)
+    if day == (period + 1).astype("datetime64[D]") - np.timedelta64(1, "D"):
+        days = (period + steps + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    elif day == period.astype("datetime64[D]"):
+        days = (period + steps).astype("datetime64[D]")
+    else:
+        return None
+    return (days + time_of_day - EPOCH) / np.timedelta64(1, "s")
+
+
+def _blob_datetimes(blob: models.TimeseriesBlob) -> np.ndarray:
+    if blob.datetimes is None:
+        return regular_datetimes(blob.start, blob.length, blob.interval)
+    return unpack(blob.datetimes)
+
+
+def _blob_to_arrays(blob: models.TimeseriesBlob) -> tuple[np.ndarray, np.ndarray]:
+    return _blob_datetimes(blob), unpack(blob.values)
+
+
+def _blob_columns(
+    run_id: int,
+    path_id: int,
+    interval: str,
+    datetimes: np.ndarray,
+    values: np.ndarray,
+) -> dict:
+    datetimes = np.asarray(datetimes, dtype=DTYPE)
+    length = len(datetimes)
+    start = float(datetimes[0]) if length else 0.0
+    packed_datetimes = pack(datetimes)
+    if length:
+        regular = regular_datetimes(start, length, interval)
+        if (regular is not None) and np.array_equal(regular, datetimes):
+            packed_datetimes = None  # Can be regenerated from start and interval
+    return dict(
+        run_id=run_id,
+        path_id=path_id,
+        start=start,
+        interval=str(interval),
+        length=length,
+        datetimes=packed_datetimes,
+        values=pack(values),
+    )
+
+
+def write_series(
+    db: Session,
+    *,
+    run_id: int,
+    path_id: int,
+    interval: str,
+    datetimes: np.ndarray,
+    values: np.ndarray,
+) -> None:
+    """Insert the series, using the storage engine of the session."""
+    write_many(db, [(run_id, path_id, interval, datetimes, values)])
+
+
+def write_many(
+    db: Session,
+    series: list[tuple[int, int, str, np.ndarray, np.ndarray]],
+) -> None:
+    """Insert many `(run_id, path_id, interval, datetimes, values)` series with one
+    executemany statement, using the storage engine of the session.
+    """
+    if not series:
+        return
+    if get_storage(db) == StorageEnum.blob:
+        rows = [_blob_columns(*s) for s in series]
+        db.execute(insert(models.TimeseriesBlob), rows)
+    else:
+        rows = [
+            {"run_id": run_id, "path_id": path_id, "datetime": d, "value": v}
+            for run_id, path_id, _, datetimes, values in series
+            for d, v in zip(
+                np.asarray(datetimes, dtype=DTYPE).tolist(),
+                np.asarray(values, dtype=DTYPE).tolist(),
+            )
+        ]
+        db.execute(insert(models.TimeseriesLedger), rows)
+
+
+def existing_series(
+    db: Session,
+    *,
+    run_ids: list[int],
+    path_ids: list[int] | None = None,
+) -> set[tuple[int, int]]:
+    """Find the `(run_id, path_id)` pairs that already have data, in either engine,
+    optionally only for some paths."""
+    found = set()
+    for model in (models.TimeseriesLedger, models.TimeseriesBlob):
+        rows = db.query(model.run_id, model.path_id).filter(model.run_id.in_(run_ids))
+        if path_ids is not None:
+            rows = rows.filter(model.path_id.in_(path_ids))
+        found.update((r[0], r[1]) for r in rows.distinct())
+    return found
+
+
+def read_series(
+    db: Session,
+    *,
+    run_id: int,
+    path_id: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Read one series, from whichever storage engine holds it."""
+    blob = (
+        db.query(models.TimeseriesBlob)
+        .filter(
+            models.TimeseriesBlob.run_id == run_id,
+            models.TimeseriesBlob.path_id == path_id,
+        )
+        .first()
+    )
+    if blob is not None:
+        return _blob_to_arrays(blob)
+    return _read_ledger_series(db, run_id=run_id, path_id=path_id)
+
+
+def _read_ledger_series(
+    db: Session,
+    *,
+    run_id: int,
+    path_id: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    rows = (
+        db.query(models.TimeseriesLedger.datetime, models.TimeseriesLedger.value)
+        .filter(
+            models.TimeseriesLedger.run_id == run_id,
+            models.TimeseriesLedger.path_id == path_id,
+        )
+        .order_by(models.TimeseriesLedger.datetime)
+        .all()
+    )
+    datetimes = np.fromiter((r[0] for r in rows), dtype=DTYPE, count=len(rows))
+    values = np.fromiter((r[1] for r in rows), dtype=DTYPE, count=len(rows))
+    return datetimes, values
+
+
+def iter_series_for_run(
+    db: Session,
+    *,
+    run_id: int,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """Yield `(path_id, datetimes, values)` for every series stored for a run, in
+    `path_id` order across both storage engines.
+
+    Rows are streamed from the database in chunks, so only one series is held in
+    memory at a time.
+    """
+    yield from heapq.merge(
+        _iter_blob_series(db, run_id=run_id),
+        _iter_ledger_series(db, run_id=run_id),
+        key=itemgetter(0),
+    )
+
+
+def _iter_blob_series(
+    db: Session,
+    *,
+    run_id: int,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    blobs = db.execute(
+        select(models.TimeseriesBlob)
+        .join(models.NamedPath, models.NamedPath.id == models.TimeseriesBlob.path_id)
+        .where(models.TimeseriesBlob.run_id == run_id)
+        .order_by(models.TimeseriesBlob.path_id)
+        .execution_options(yield_per=BLOBS_PER_FETCH)
+    ).scalars()
+    for blob in blobs:
+        yield (blob.path_id, *_blob_to_arrays(blob))
+
+
+def _iter_ledger_series(
+    db: Session,
+    *,
+    run_id: int,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    rows = db.execute(
+        select(
+            models.TimeseriesLedger.path_id,
+            models.TimeseriesLedger.datetime,
+            models.TimeseriesLedger.value,
+        )
+        .join(models.NamedPath, models.NamedPath.id == models.TimeseriesLedger.path_id)
+        .where(models.TimeseriesLedger.run_id == run_id)
+        .order_by(models.TimeseriesLedger.path_id, models.TimeseriesLedger.datetime)
+        .execution_options(yield_per=ROWS_PER_FETCH)
+    )
+    for path_id, group in groupby(rows, key=itemgetter(0)):
+        series = np.fromiter((row[1:] for row in group), dtype=SERIES_DTYPE)
+        yield path_id, series["datetime"], series["value"]
+
+
+def iter_series_many(
+    db: Session,
+    *,
+    run_ids: Sequence[int],
+    path_ids: Sequence[int],
+) -> Iterator[tuple[int, int, np.ndarray, np.ndarray]]:
+    """Yield `(run_id, path_id, datetimes, values)` for every stored combination of
+    the runs and paths, from both storage engines.
+    """
+    run_ids, path_ids = list(run_ids), list(path_ids)
+    blobs = db.execute(
+        select(models.TimeseriesBlob)
+        .where(
+            models.TimeseriesBlob.run_id.in_(run_ids),
+            models.TimeseriesBlob.path_id.in_(path_ids),
+        )
+        .execution_options(yield_per=BLOBS_PER_FETCH)
+    ).scalars()
+    for blob in blobs:
+        yield (blob.run_id, blob.path_id, *_blob_to_arrays(blob))
+    rows = db.execute(
+        select(
+            models.TimeseriesLedger.run_id,
+            models.TimeseriesLedger.path_id,
+            models.TimeseriesLedger.datetime,
+            models.TimeseriesLedger.value,
+        )
+        .where(
+            models.TimeseriesLedger.run_id.in_(run_ids),
+            models.TimeseriesLedger.path_id.in_(path_ids),
+        )
+        .order_by(
+            models.TimeseriesLedger.run_id,
+            models.TimeseriesLedger.path_id,
+            models.TimeseriesLedger.datetime,
+        )
+        .execution_options(yield_per=ROWS_PER_FETCH)
+    )
+    for (run_id, path_id), group in groupby(rows, key=itemgetter(0, 1)):
+        series = np.fromiter((row[2:] for row in group), dtype=SERIES_DTYPE)
+        yield run_id, path_id, series["datetime"], series["value"]
+
+
+def datetimes_for_run(db: Session, *, run_id: int) -> np.ndarray:
+    """Every distinct datetime with data in a run, sorted, from both storage engines."""
+    ledger = db.execute(
+        select(models.TimeseriesLedger.datetime)
+        .where(models.TimeseriesLedger.run_id == run_id)
+        .distinct()
+    ).scalars()
+    datetimes = [np.fromiter(ledger, dtype=DTYPE)]
+    blobs = db.execute(
+        select(
+            models.TimeseriesBlob.start,
+            models.TimeseriesBlob.interval,
+            models.TimeseriesBlob.length,
+            models.TimeseriesBlob.datetimes,
+        ).where(models.TimeseriesBlob.run_id == run_id)
+    )
+    datetimes.extend(_blob_datetimes(blob) for blob in blobs)
+    return np.unique(np.concatenate(datetimes))
+
+
+def iter_blocks_for_run(
+    db: Session,
+    *,
+    run_id: int,
+    path_ids: Sequence[int],
+    datetimes: np.ndarray,
+    dates_per_block: int = DATES_PER_BLOCK,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield a run as wide `(datetimes, values)` blocks, pivoted date-by-date.
+
+    `values` has a row for each of the `datetimes` in the block, and a column for
+    each of the `path_ids`, NaN where a series has no value. Ledger rows are
+    streamed from a cursor ordered by datetime, so memory is bounded by the block
+    size, the fetch size, and the packed blobs of the run.
+    """
+    path_ids = np.asarray(path_ids, dtype="<i8")
+    sorter = np.argsort(path_ids)
+
+    def columns_of(ids: np.ndarray) -> np.ndarray:
+        return sorter[np.searchsorted(path_ids, ids, sorter=sorter)]
+
+    blobs = db.execute(
+        select(models.TimeseriesBlob).where(
+            models.TimeseriesBlob.run_id == run_id,
+            models.TimeseriesBlob.path_id.in_(path_ids.tolist()),
+        )
+    ).scalars()
+    blobs = [(columns_of(blob.path_id), *_blob_to_arrays(blob)) for blob in blobs]
+    rows = db.execute(
+        select(
+            models.TimeseriesLedger.datetime,
+            models.TimeseriesLedger.path_id,
+            models.TimeseriesLedger.value,
+        )
+        .where(
+            models.TimeseriesLedger.run_id == run_id,
+            models.TimeseriesLedger.path_id.in_(path_ids.tolist()),
+        )
+        .order_by(models.TimeseriesLedger.datetime, models.TimeseriesLedger.path_id)
+        .execution_options(yield_per=ROWS_PER_FETCH)
+    )
+    partitions = rows.partitions()
+    pending = np.empty(0, dtype=LEDGER_DTYPE)
+    exhausted = False
+    for start in range(0, len(datetimes), dates_per_block):
+        stop = start + dates_per_block
+        block_datetimes = datetimes[start:stop]
+        first, last = block_datetimes[0], block_datetimes[-1]
+        # Rows for the last datetime of the block may continue in the next fetch
+        while not exhausted and (len(pending) == 0 or pending["datetime"][-1] <= last):
+            partition = next(partitions, None)
+            if partition is None:
+                exhausted = True
+            else:
+                fetched = np.fromiter(
+                    (tuple(row) for row in partition),
+                    dtype=LEDGER_DTYPE,
+                    count=len(partition),
+                )
+                pending = np.concatenate([pending, fetched])
+        n_taken = np.searchsorted(pending["datetime"], last, side="right")
+        taken, pending = pending[:n_taken], pending[n_taken:]
+        values = np.full((len(block_datetimes), len(path_ids)), np.nan)
+        values[
+            np.searchsorted(block_datetimes, taken["datetime"]),
+            columns_of(taken["path_id"]),
+        ] = taken["value"]
+        for column, blob_datetimes, blob_values in blobs:
+            lo = np.searchsorted(blob_datetimes, first, side="left")
+            hi = np.searchsorted(blob_datetimes, last, side="right")
+            rows_in_block = np.searchsorted(block_datetimes, blob_datetimes[lo:hi])
+            values[rows_in_block, column] = blob_values[lo:hi]
+        yield block_datetimes, values
+
+
+def diff_series(
+    stored_datetimes: np.ndarray,
+    stored_values: np.ndarray,
+    datetimes: np.ndarray,
+    values: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compare incoming values to a stored series, sorted by datetime.
+
+    Returns the position of each incoming datetime in the stored series, and the
+    masks of the incoming values that are new, and that change a stored value. NaN
+    is the same as NaN.
+    """
+    index = np.searchsorted(stored_datetimes, datetimes)
+    if len(stored_datetimes) == 0:
+        new = np.ones(len(datetimes), dtype=bool)
+        return index, new, ~new
+    clipped = np.minimum(index, len(stored_datetimes) - 1)
+    found = stored_datetimes[clipped] == datetimes
+    stored = stored_values[clipped]
+    same = (stored == values) | (np.isnan(stored) & np.isnan(values))
+    return index, ~found, found & ~same
+
+
+def upsert_series(
+    db: Session,
+    *,
+    run_id: int,
+    path_id: int,
+    interval: str,
+    datetimes: np.ndarray,
+    values: np.ndarray,
+) -> tuple[int, int]:
+    """Write the values that are new, or different from the stored series, returning
+    the number of values inserted and updated.
+
+    A series in the ledger is changed with one `INSERT ... ON CONFLICT DO UPDATE` of
+    the changed rows, a packed series is merged and packed again. A series that
+    isn't stored yet is written with the storage engine of the session. The caller
+    is responsible for committing the session.
+    """
+    datetimes = np.asarray(datetimes, dtype=DTYPE)
+    values = np.asarray(values, dtype=DTYPE)
+    blob = (
+        db.query(models.TimeseriesBlob)
+        .filter(
+            models.TimeseriesBlob.run_id == run_id,
+            models.TimeseriesBlob.path_id == path_id,
+        )
+        .first()
+    )
+    if blob is not None:
+        stored_datetimes, stored_values = _blob_to_arrays(blob)
+    else:
+        stored_datetimes, stored_values = _read_ledger_series(
+            db, run_id=run_id, path_id=path_id
+        )
+    index, new, changed = diff_series(
+        stored_datetimes, stored_values, datetimes, values
+    )
+    n_inserted, n_updated = int(new.sum()), int(changed.sum())
+    if (n_inserted + n_updated) == 0:
+        return 0, 0
+    if blob is not None:
+        merged = stored_values.copy()
+        merged[index[changed]] = values[changed]
+        merged_datetimes = np.concatenate([stored_datetimes, datetimes[new]])
+        merged = np.concatenate([merged, values[new]])
+        order = np.argsort(merged_datetimes, kind="stable")
+        columns = _blob_columns(
+            run_id, path_id, blob.interval, merged_datetimes[order], merged[order]
+        )
+        for name, value in columns.items():
+            setattr(blob, name, value)
+    elif len(stored_datetimes) == 0:
+        write_many(db, [(run_id, path_id, interval, datetimes, values)])
+    else:
+        write = new | changed
+        rows = [
+            {"run_id": run_id, "path_id": path_id, "datetime": d, "value": v}
+            for d, v in zip(datetimes[write].tolist(), values[write].tolist())
+        ]
+        statement = sqlite_insert(models.TimeseriesLedger)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    models.TimeseriesLedger.run_id,
+                    models.TimeseriesLedger.path_id,
+                    models.TimeseriesLedger.datetime,
+                ],
+                set_=dict(value=statement.excluded.value),
+            ),
+            rows,
+        )
+    return n_inserted, n_updated
+
+
+def delete_series(db: Session, *, run_id: int, path_id: int) -> int:
+    """Delete one series from both storage engines, returning the number of values."""
+    n_deleted = (
+        db.query(models.TimeseriesLedger)
+        .filter(
+            models.TimeseriesLedger.run_id == run_id,
+            models.TimeseriesLedger.path_id == path_id,
+        )
+        .delete(synchronize_session=False)
+    )
+    blobs = db.query(models.TimeseriesBlob).filter(
+        models.TimeseriesBlob.run_id == run_id,
+        models.TimeseriesBlob.path_id == path_id,
+    )
+    # count the values without loading the packed arrays
+    n_deleted += blobs.with_entities(
+        func.coalesce(func.sum(models.TimeseriesBlob.length), 0)
+    ).scalar()
+    blobs.delete(synchronize_session=False)
+    return n_deleted
+
+
+def repack(db: Session, *, run_id: int | None = None) -> int:
+    """Move series from the ledger into blobs, returning the number of series moved.
+
+    The caller is responsible for committing the session.
+    """
+    query = db.query(
+        models.TimeseriesLedger.run_id,
+        models.TimeseriesLedger.path_id,
+        models.NamedPath.interval,
+    ).join(models.NamedPath, models.NamedPath.id == models.TimeseriesLedger.path_id)
+    if run_id is not None:
+        query = query.filter(models.TimeseriesLedger.run_id == run_id)
+    series = query.distinct().all()
+    for series_run_id, path_id, interval in series:
+        logger.debug(f"repacking {series_run_id=} {path_id=}")
+        datetimes, values = read_series(db, run_id=series_run_id, path_id=path_id)
+        delete_series(db, run_id=series_run_id, path_id=path_id)
+        db.flush()  # deletes must land before the insert of the new blob
+        columns = _blob_columns(series_run_id, path_id, interval, datetimes, values)
+        db.add(models.TimeseriesBlob(**columns))
+    logger.info(f"repacked {len(series):,} series from the ledger")
+    return len(series)
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..errors import DuplicateModelError, EmptyLookupError
-from ._common import common_update, rollback_on_exception
+from ._common import common_update, keyset_page, rollback_on_exception
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +45,12 @@ def read(
     kind: str = None,
     name: str = None,
     id: int = None,
+    limit: int = None,
+    after: int = None,
 ) -> list[schemas.Assumption]:
-    logger.info(f"reading assumptions where {kind=}, {name=}, {id=}")
+    logger.info(
+        f"reading assumptions where {kind=}, {name=}, {id=}, {limit=}, {after=}"
+    )
     filters = list()
     if name:
         filters.append(models.Assumption.name == name)
@@ -54,8 +58,9 @@ def read(
         filters.append(models.Assumption.id == id)
     if kind:
         filters.append(models.Assumption.kind == kind)
-    results = db.query(models.Assumption).filter(*filters).all()
-    if len(results) == 0:
+    query = db.query(models.Assumption).filter(*filters)
+    results = keyset_page(query, models.Assumption.id, limit=limit, after=after).all()
+    if (len(results) == 0) and (after is None):  # past the last page isn't an error
         raise EmptyLookupError(models.Assumption, name=name, kind=kind, id=id)
     return [schemas.Assumption.model_validate(m, from_attributes=True) for m in results]
 
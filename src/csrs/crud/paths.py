@@ -1,13 +1,16 @@
 import logging
 
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..errors import EmptyLookupError
-from ._common import common_update, rollback_on_exception
+from ..errors import EmptyLookupError, UniqueLookupError
+from . import _cache
+from ._common import common_update, keyset_page, rollback_on_exception
 from .runs import read as read_runs
 
 logger = logging.getLogger(__name__)
+path_index = _cache.PATHS
 
 
 @rollback_on_exception
@@ -34,11 +37,27 @@ def create(
         detail=detail,
     )
     db.add(path)
+    bump_revision(db)
     db.commit()
+    path_index.invalidate(db)
     db.refresh(path)
     return schemas.NamedPath.model_validate(path, from_attributes=True)
 
 
+def bump_revision(db: Session) -> None:
+    """Increment the revision of the paths, the caller commits the session."""
+    statement = sqlite_insert(models.PathRevision).values(
+        id=_cache.PATH_REVISION_ID,
+        revision=1,
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[models.PathRevision.id],
+            set_=dict(revision=models.PathRevision.revision + 1),
+        )
+    )
+
+
 @rollback_on_exception
 def read(
     db: Session,
@@ -47,8 +66,13 @@ def read(
     path: str = None,
     category: str = None,
     id: int = None,
+    limit: int = None,
+    after: int = None,
 ) -> list[schemas.NamedPath]:
-    logger.info(f"reading named path where {name=}, {category=}, {path=}, {id=}")
+    logger.info(
+        f"reading named path where {name=}, {category=}, {path=}, {id=}"
+        + f", page {limit=} {after=}"
+    )
     filters = list()
     if name:
         filters.append(models.NamedPath.name == name)
@@ -58,8 +82,9 @@ def read(
         filters.append(models.NamedPath.category == category)
     if id:
         filters.append(models.NamedPath.id == id)
-    paths = db.query(models.NamedPath).filter(*filters).all()
-    if len(paths) == 0:
+    query = db.query(models.NamedPath).filter(*filters)
+    paths = keyset_page(query, models.NamedPath.id, limit=limit, after=after).all()
+    if (len(paths) == 0) and (after is None):  # past the last page isn't an error
         raise EmptyLookupError(
             models.NamedPath,
             name=name,
@@ -70,6 +95,43 @@ def read(
     return [schemas.NamedPath.model_validate(p, from_attributes=True) for p in paths]
 
 
+def find(db: Session, path: str) -> list[schemas.NamedPath]:
+    """Find the `NamedPath` objects for a DSS path, or a name.
+
+    Paths are looked up by their path, then by their name, and then by matching the
+    patterns of the paths against a concrete DSS path. The lookup uses the in-memory
+    index of the paths, rebuilt when the paths have changed since it was built.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    path : str
+        The DSS path, pattern or concrete, or the name of the path
+
+    Returns
+    -------
+    list[schemas.NamedPath]
+        The paths found
+    """
+    found = path_index.get(db).find(path)
+    if not found:
+        raise EmptyLookupError(models.NamedPath, path=repr(path))
+    return found
+
+
+def resolve(db: Session, path: str) -> schemas.NamedPath:
+    """Like `find`, for a path that must refer to a single `NamedPath`."""
+    found = find(db, path)
+    if len(found) > 1:
+        raise UniqueLookupError(
+            models.NamedPath,
+            [p.path for p in found],
+            path=repr(path),
+        )
+    return found[0]
+
+
 @rollback_on_exception
 def read_paths_in_run(
     db: Session,
@@ -95,7 +157,7 @@ def read_paths_in_run(
         .filter(models.CommonCatalog.run_id == run_id)
         .all()
     )
-    path_ids = [c.id for c in catalog]
+    path_ids = [c.path_id for c in catalog]
     paths = db.query(models.NamedPath).filter(models.NamedPath.id.in_(path_ids)).all()
     if len(paths) == 0:
         raise EmptyLookupError(models.NamedPath, id_in=path_ids)
@@ -111,9 +173,11 @@ def update(
 ) -> schemas.NamedPath:
     obj = db.query(models.NamedPath).filter(models.NamedPath.id == id).first()
     if obj:
+        bump_revision(db)
         updated = common_update(db, obj, **kwargs)
     else:
         raise ValueError(f"Cannot find Assumption with {id=}")
+    path_index.invalidate(db)
     return updated
 
 
@@ -127,4 +191,6 @@ def delete(
     if not obj:
         raise ValueError(f"Cannot find NamedPath with {id=}")
     db.query(models.NamedPath).filter(models.NamedPath.id == id).delete()
+    bump_revision(db)
     db.commit()
+    path_index.invalidate(db)
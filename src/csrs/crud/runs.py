@@ -1,11 +1,14 @@
 import logging
 
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import update as sql_update
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from ..errors import EmptyLookupError
+from . import _cache
 from . import timeseries as crud_timeseries
-from ._common import common_update, rollback_on_exception
+from ._common import common_update, keyset_page, rollback_on_exception, run_query
 from .scenarios import read as read_scenario
 from .scenarios import update as update_scenario
 
@@ -113,24 +116,27 @@ def read(
     code_version: str = None,
     contact: str = None,
     id: int = None,
+    limit: int = None,
+    after: int = None,
 ) -> list[schemas.Run]:
     logger.info(
         f"reading new run where {scenario=} {version=} {code_version=} {contact=} {id=}"
+        + f", page {limit=} {after=}"
     )
     filters = list()
     if scenario:
-        (scenario_obj,) = read_scenario(db, name=scenario)
-        filters.append(models.Run.scenario_id == scenario_obj.id)
+        filters.append(models.Scenario.name == scenario)
+    if version:
+        filters.append(models.RunHistory.version == version)
     if code_version:
         filters.append(models.Run.code_version == code_version)
     if id:
         filters.append(models.Run.id == id)
     if contact:
         filters.append(models.Run.contact == contact)
-    runs = db.query(models.Run).filter(*filters).all()
-    if version:
-        runs = [r for r in runs if r.version == version]
-    if len(runs) == 0:
+    query = run_query(db).filter(*filters)
+    runs = keyset_page(query, models.Run.id, limit=limit, after=after).all()
+    if (len(runs) == 0) and (after is None):  # past the last page isn't an error
         raise EmptyLookupError(
             models.Run,
             scenario=scenario,
@@ -142,6 +148,24 @@ def read(
     return [model_to_schema(r) for r in runs]
 
 
+@rollback_on_exception
+def read_versions(db: Session) -> dict[str, list[str]]:
+    """The versions of the runs of every scenario, in the order they were created.
+
+    Scenarios without runs are left out.
+    """
+    logger.info("reading the versions of every scenario")
+    rows = (
+        db.query(models.Scenario.name, models.RunHistory.version)
+        .join(models.RunHistory, models.RunHistory.scenario_id == models.Scenario.id)
+        .order_by(models.RunHistory.run_id)
+    )
+    versions: dict[str, list[str]] = dict()
+    for scenario, version in rows:
+        versions.setdefault(scenario, list()).append(version)
+    return versions
+
+
 @rollback_on_exception
 def update(
     db: Session,
@@ -175,31 +199,70 @@ def update(
     return model_to_schema(obj)
 
 
+# The tables with rows that belong to a run, deleted before the runs themselves
+RUN_TABLES = (
+    models.TimeseriesLedger,
+    models.TimeseriesBlob,
+    models.CommonCatalog,
+    models.MetricValue,
+    models.PreferredVersion,
+    models.RunHistory,
+)
+
+
+def delete_rows(db: Session, run_ids: list[int]) -> dict[str, int]:
+    """Delete the runs, and the rows of every table that belong to them, with one
+    statement per table. The caller commits the session.
+
+    The children of the runs are kept, without a parent.
+    """
+    counts = dict()
+    for model in RUN_TABLES:
+        statement = sql_delete(model).where(model.run_id.in_(run_ids))
+        counts[model.__tablename__] = db.execute(statement).rowcount
+    db.execute(
+        sql_update(models.Run)
+        .where(models.Run.parent_id.in_(run_ids))
+        .values(parent_id=None)
+    )
+    statement = sql_delete(models.Run).where(models.Run.id.in_(run_ids))
+    counts[models.Run.__tablename__] = db.execute(statement).rowcount
+    crud_timeseries.bump_revisions(db, run_ids)
+    return counts
+
+
+def invalidate_caches(db: Session, run_ids: list[int]) -> None:
+    """Drop the series of deleted runs from the in-memory cache."""
+    key = _cache.database_key(db)
+    for run_id in run_ids:
+        crud_timeseries.series_cache.invalidate(key, run_id)
+
+
 @rollback_on_exception
 def delete(
     db: Session,
     id: int,
-) -> None:
-    # When deleting a run, delete all the timeseries that belong to it
+) -> dict[str, int]:
+    """Delete a run, with its timeseries, history, catalog and metric values, in one
+    transaction.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    id : int
+        The id of the run
+
+    Returns
+    -------
+    dict[str, int]
+        The number of rows deleted from each table
+    """
     logger.info(f"deleteing run where {id=}")
-    obj = db.query(models.Run).filter(models.Run.id == id).first()
-    if not obj:
+    if db.query(models.Run.id).filter(models.Run.id == id).first() is None:
         raise ValueError(f"Cannot find Run with {id=}")
-    try:
-        tss = crud_timeseries.read_all_for_run(
-            db,
-            scenario=obj.scenario.name,
-            version=obj.version,
-        )
-    except EmptyLookupError:
-        tss = []
-    for ts in tss:
-        crud_timeseries.delete(
-            db,
-            scenario=ts.scenario,
-            version=ts.version,
-            path=ts.path,
-        )
-
-    db.query(models.Run).filter(models.Run.id == id).delete()
+    counts = delete_rows(db, [id])
     db.commit()
+    invalidate_caches(db, [id])
+    logger.info(f"deleted run {id=}, {counts=}")
+    return counts
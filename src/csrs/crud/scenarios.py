@@ -1,16 +1,31 @@
 import logging
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from .. import models, schemas
 from ..errors import DuplicateModelError, EmptyLookupError, UniqueLookupError
 from . import assumptions as crud_assumptions
 from . import runs as crud_runs
-from ._common import rollback_on_exception
+from ._common import keyset_page, rollback_on_exception
 
 logger = logging.getLogger(__name__)
 
 
+def _schema_loads() -> tuple:
+    """Load the relationships used by `model_to_schema` with the scenarios."""
+    assumptions = selectinload(models.Scenario.assumption_maps).joinedload(
+        models.ScenarioAssumptions.assumption
+    )
+    preferred = (
+        joinedload(models.Scenario.preference)
+        .joinedload(models.PreferredVersion.run)
+        .joinedload(models.Run.history)
+    )
+    return (assumptions, preferred)
+
+
 def model_to_schema(scenario: models.Scenario):
     assumptions = dict()
     for mapping in scenario.assumption_maps:
@@ -79,14 +94,17 @@ def read(
     db: Session,
     name: str = None,
     id: int = None,
+    limit: int = None,
+    after: int = None,
 ) -> list[schemas.Scenario]:
     filters = list()
     if name:
         filters.append(models.Scenario.name == name)
     if id:
         filters.append(models.Scenario.id == id)
-    result = db.query(models.Scenario).filter(*filters).all()
-    if len(result) == 0:
+    query = db.query(models.Scenario).filter(*filters).options(*_schema_loads())
+    result = keyset_page(query, models.Scenario.id, limit=limit, after=after).all()
+    if (len(result) == 0) and (after is None):  # past the last page isn't an error
         raise EmptyLookupError(models.Scenario, name=name, id=id)
     return [model_to_schema(mod) for mod in result]
 
@@ -202,17 +220,38 @@ def update(
 def delete(
     db: Session,
     id: int,
-) -> None:
-    # To delete a scenario, we also delete all the runs that belong to it
-    me = read(db, id=id)
-    if not me:
+) -> dict[str, int]:
+    """Delete a scenario, with all of its runs and their data, in one transaction.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    id : int
+        The id of the scenario
+
+    Returns
+    -------
+    dict[str, int]
+        The number of rows deleted from each table
+    """
+    logger.info(f"deleting scenario where {id=}")
+    if db.query(models.Scenario.id).filter(models.Scenario.id == id).first() is None:
         raise ValueError(f"Scenario with {id=} was not found")
-    me = me[0]
-    try:
-        runs = crud_runs.read(db, scenario=me.name)
-        for run in runs:
-            crud_runs.delete(db, id=run.id)
-    except EmptyLookupError:  # No runs associated with this scenario
-        pass
-    db.query(models.Scenario).filter(models.Scenario.id == id).delete()
+    run_ids = list(
+        db.scalars(select(models.Run.id).where(models.Run.scenario_id == id))
+    )
+    counts = crud_runs.delete_rows(db, run_ids)
+    for model in (
+        models.ScenarioAssumptions,
+        models.PreferredVersion,
+        models.RunHistory,
+        models.Scenario,
+    ):
+        column = model.id if model is models.Scenario else model.scenario_id
+        n = db.execute(sql_delete(model).where(column == id)).rowcount
+        counts[model.__tablename__] = counts.get(model.__tablename__, 0) + n
     db.commit()
+    crud_runs.invalidate_caches(db, run_ids)
+    logger.info(f"deleted scenario {id=}, {counts=}")
+    return counts
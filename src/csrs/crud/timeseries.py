@@ -1,16 +1,22 @@
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterable, Iterator, Sequence
 
+import numpy as np
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..errors import EmptyLookupError, UniqueLookupError
+from ..errors import DuplicateModelError, EmptyLookupError, UniqueLookupError
+from . import _cache, _storage
 from . import paths as crud_paths
 from ._common import rollback_on_exception
 
 logger = logging.getLogger(__name__)
 EPOCH = datetime(1900, 1, 1)
+series_cache = _cache.SERIES  # series of published runs, see `csrs.crud._cache`
 
 
 def date_to_float(date: str) -> float:
@@ -23,6 +29,58 @@ def float_to_date(date: float) -> str:
     return dt.isoformat()
 
 
+def dates_to_floats(dates: Sequence[str]) -> np.ndarray:
+    """Vectorized `date_to_float`, converts ISO formatted dates to seconds since EPOCH.
+
+    Parameters
+    ----------
+    dates : Sequence[str]
+        The ISO formatted dates
+
+    Returns
+    -------
+    np.ndarray
+        The float64 seconds since EPOCH for each date
+    """
+    parsed = np.asarray(dates, dtype="datetime64[us]")
+    return (parsed - _storage.EPOCH) / np.timedelta64(1, "s")
+
+
+def floats_to_datetime64(floats: Sequence[float] | np.ndarray) -> np.ndarray:
+    """Converts seconds since EPOCH to `datetime64[us]`, rounded to the microsecond."""
+    microseconds = np.rint(np.asarray(floats, dtype=float) * 1e6).astype("int64")
+    return _storage.EPOCH + microseconds.astype("timedelta64[us]")
+
+
+def datetime64_to_dates(parsed: np.ndarray) -> tuple[str, ...]:
+    """Converts `datetime64` values to ISO formatted dates, see `floats_to_dates`."""
+    parsed = np.asarray(parsed, dtype="datetime64[us]")
+    dates = np.datetime_as_string(parsed, unit="s").astype("<U26")
+    fractional = parsed != parsed.astype("datetime64[s]")
+    if fractional.any():
+        dates[fractional] = np.datetime_as_string(parsed[fractional], unit="us")
+    return tuple(dates.tolist())
+
+
+def floats_to_dates(floats: Sequence[float] | np.ndarray) -> tuple[str, ...]:
+    """Vectorized `float_to_date`, converts seconds since EPOCH to ISO formatted dates.
+
+    The strings are formatted like `datetime.isoformat`, microseconds are only
+    included for dates that have them.
+
+    Parameters
+    ----------
+    floats : Sequence[float] | np.ndarray
+        The seconds since EPOCH
+
+    Returns
+    -------
+    tuple[str, ...]
+        The ISO formatted dates
+    """
+    return datetime64_to_dates(floats_to_datetime64(floats))
+
+
 def get_dss_root(db: Session) -> Path:
     path = None
     if db.bind.dialect.name == "sqlite":
@@ -43,16 +101,18 @@ def get_run_model(db: Session, scenario: str, version: str) -> models.Run:
     # TODO: 2024-07-30 See if we can remove this function in favor of crud.runs.read
     if not isinstance(scenario, str):
         raise ValueError(f"{scenario=}, expected str")
-    scenario_model = (
-        db.query(models.Scenario).filter(models.Scenario.name == scenario).first()
-    )
-    runs = (
-        db.query(models.Run).filter(models.Run.scenario_id == scenario_model.id).all()
+    # Only the columns of the run are used, so its relationships aren't loaded
+    run = (
+        db.query(models.Run)
+        .join(models.Run.history)
+        .join(models.Scenario, models.Scenario.id == models.Run.scenario_id)
+        .filter(models.Scenario.name == scenario)
+        .filter(models.RunHistory.version == version)
+        .first()
     )
-    runs = [r for r in runs if r.version == version]
-    if len(runs) == 0:  # Couldn't find version
+    if run is None:  # Couldn't find version
         raise EmptyLookupError(models.Run, version=version, scenario=scenario)
-    return runs[0]
+    return run
 
 
 @rollback_on_exception
@@ -79,46 +139,37 @@ def create(
             + f"\t{len(dates)=}\n"
             + f"\t{len(values)=}"
         )
-    # Get the scenario, and the run we are adding data to
-    sceanrio_model = (
-        db.query(models.Scenario).filter(models.Scenario.name == scenario).first()
-    )
-    run_model = sceanrio_model.run
-    if run_model is None:
-        raise ValueError(f"Run {scenario} (v{version}) does not exist in the database")
-    elif run_model.version != version:
-        # Adding data to an older version
-        run_model = get_run_model(db, scenario=scenario, version=version)
+    # Get the run we are adding data to
+    run_model = get_run_model(db, scenario=scenario, version=version)
     # Get the path model
-    path_schemas = crud_paths.read(db=db, path=path)
-    if not path_schemas:
-        path_schemas = crud_paths.read(db=db, name=path)
-    if len(path_schemas) > 1:
-        raise UniqueLookupError(models.NamedPath, path_schemas, path=repr(path))
-    dss_path = path_schemas[0].path
-    path_model = (
-        db.query(models.NamedPath).filter(models.NamedPath.path == dss_path).first()
-    )
+    path_model = crud_paths.resolve(db, path)
+    # The series can't exist yet, in either storage engine
+    if _storage.existing_series(db, run_ids=[run_model.id], path_ids=[path_model.id]):
+        raise DuplicateModelError(
+            models.TimeseriesLedger,
+            scenario=scenario,
+            version=version,
+            path=path,
+        )
     # Add the timeseries to the common catalog
-    catalog_row = models.CommonCatalog(run_id=run_model.id, path_id=path_model.id)
-    db.add(catalog_row)
+    add_to_catalog(db, run_id=run_model.id, path_id=path_model.id)
     # Put the data into the database
-    dates_float = (date_to_float(d) for d in dates)
-    objects = (
-        models.TimeseriesLedger(
-            run_id=run_model.id,
-            path_id=path_model.id,
-            datetime=d,
-            value=values[i],
-        )
-        for i, d in enumerate(dates_float)
+    _storage.write_series(
+        db,
+        run_id=run_model.id,
+        path_id=path_model.id,
+        interval=path_model.interval,
+        datetimes=dates_to_floats(dates),
+        values=np.asarray(values, dtype=float),
     )
-    db.add_all(objects)
+    run_id = run_model.id
+    bump_revisions(db, [run_id])
     db.commit()
+    series_cache.invalidate(_cache.database_key(db), run_id, path_model.id)
 
     ts = schemas.Timeseries(
-        scenario=sceanrio_model.name,
-        version=run_model.version,
+        scenario=scenario,
+        version=version,
         path=path_model.path,
         values=list(values),
         dates=list(dates),
@@ -130,54 +181,409 @@ def create(
     return ts
 
 
+def add_to_catalog(db: Session, *, run_id: int, path_id: int) -> None:
+    """Add the path to the catalog of the run, unless it's already there. The caller
+    commits the session."""
+    exists = (
+        db.query(models.CommonCatalog.id)
+        .filter(
+            models.CommonCatalog.run_id == run_id,
+            models.CommonCatalog.path_id == path_id,
+        )
+        .first()
+    )
+    if exists is None:
+        db.add(models.CommonCatalog(run_id=run_id, path_id=path_id))
+
+
+def bump_revisions(db: Session, run_ids: Iterable[int]) -> None:
+    """Increment the revision of each run, the caller commits the session."""
+    rows = [dict(run_id=run_id, revision=1) for run_id in set(run_ids)]
+    if not rows:
+        return
+    statement = sqlite_insert(models.RunRevision)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[models.RunRevision.run_id],
+            set_=dict(revision=models.RunRevision.revision + 1),
+        ),
+        rows,
+    )
+
+
+def read_revision(db: Session, run_id: int) -> int:
+    revision = db.execute(
+        select(models.RunRevision.revision).where(models.RunRevision.run_id == run_id)
+    ).scalar()
+    return revision or 0
+
+
 @rollback_on_exception
-def read(
+def read_version_key(
     db: Session,
     scenario: str,
     version: str,
-    path: str,
-) -> schemas.Timeseries:
-    logger.info(f"reading timeseries where {scenario=}, {version=} {path=}")
-    # Get the scenario, and the run we are adding data to
-    sceanrio_model = (
-        db.query(models.Scenario).filter(models.Scenario.name == scenario).first()
+    path: str | None = None,
+) -> tuple:
+    """A key that changes whenever the data read for a run, or one path, could.
+
+    The key is made from the revision of the run, and the labels of the paths, so
+    it's cheap to compute compared to reading the data.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    scenario : str
+        The name of the scenario
+    version : str
+        The version of the run
+    path : str | None, optional
+        The DSS path, or the name of the path, by default every path in the run
+
+    Returns
+    -------
+    tuple
+        The key, made of simple python objects
+    """
+    run = get_run_model(db, scenario=scenario, version=version)
+    if path is None:
+        paths = list(_read_paths_with_data(db, run.id).values())
+    else:
+        paths = crud_paths.find(db, path)
+    labels = sorted(
+        (p.id, p.path, p.units, str(p.period_type), str(p.interval)) for p in paths
     )
-    run = sceanrio_model.run
-    if run.version != version:
-        # Adding data to an older version
-        run = get_run_model(db, scenario=scenario, version=version)
-    # Get the path model
-    path_schemas = crud_paths.read(db=db, path=path)
-    if not path_schemas:
-        path_schemas = crud_paths.read(db=db, name=path)
-    if len(path_schemas) == 0:
-        raise EmptyLookupError(models.NamedPath, path=repr(path))
-    path_schema = path_schemas[0]
-    # Get data from database
+    return (run.id, read_revision(db, run.id), tuple(labels))
+
+
+def _read_run_ids(
+    db: Session,
+    runs: set[tuple[str, str]],
+) -> dict[tuple[str, str], int]:
+    scenarios = {scenario for scenario, _ in runs}
     rows = (
-        db.query(models.TimeseriesLedger)
-        .filter(
-            models.TimeseriesLedger.run_id == run.id,
-            models.TimeseriesLedger.path_id == path_schema.id,
+        db.query(
+            models.Scenario.name, models.RunHistory.version, models.RunHistory.run_id
         )
+        .join(models.Scenario, models.Scenario.id == models.RunHistory.scenario_id)
+        .filter(models.Scenario.name.in_(scenarios))
         .all()
     )
-    logger.info(f"{len(rows):,} rows found matching criteria")
-    dates = tuple(float_to_date(r.datetime) for r in rows)
-    values = tuple(r.value for r in rows)
+    return {(name, version): run_id for name, version, run_id in rows}
+
+
+def _read_preferred_versions(db: Session, scenarios: set[str]) -> dict[str, str]:
+    rows = (
+        db.query(models.Scenario.name, models.RunHistory.version)
+        .join(
+            models.PreferredVersion,
+            models.PreferredVersion.scenario_id == models.Scenario.id,
+        )
+        .join(
+            models.RunHistory,
+            models.RunHistory.run_id == models.PreferredVersion.run_id,
+        )
+        .filter(models.Scenario.name.in_(scenarios))
+        .all()
+    )
+    return {name: version for name, version in rows}
+
+
+def _find_paths(
+    db: Session,
+    paths: set[str],
+) -> dict[str, list[schemas.NamedPath]]:
+    """Find the `NamedPath` objects for many paths, or names, with one index."""
+    index = crud_paths.path_index.get(db)
+    return {path: index.find(path) for path in paths}
+
+
+@rollback_on_exception
+def create_many(
+    db: Session,
+    timeseries: list[schemas.Timeseries],
+) -> schemas.TimeseriesBatch:
+    logger.info(f"creating {len(timeseries):,} new timeseries")
+    # Resolve every run and path once, instead of once per timeseries
+    run_ids = _read_run_ids(db, {(ts.scenario, ts.version) for ts in timeseries})
+    found_paths = _find_paths(db, {str(ts.path) for ts in timeseries})
+    existing = _storage.existing_series(db, run_ids=list(run_ids.values()))
+    catalog = {
+        (c.run_id, c.path_id)
+        for c in db.query(models.CommonCatalog).filter(
+            models.CommonCatalog.run_id.in_(run_ids.values())
+        )
+    }
+    # Validate each timeseries, failures don't prevent the others from being added
+    batch = schemas.TimeseriesBatch()
+    new_catalog_rows = list()
+    new_series = list()
+    for ts in timeseries:
+        path = str(ts.path)
+        try:
+            run_id = run_ids.get((ts.scenario, ts.version))
+            if run_id is None:
+                raise EmptyLookupError(
+                    models.Run,
+                    scenario=ts.scenario,
+                    version=ts.version,
+                )
+            named = found_paths[path]
+            if len(named) != 1:
+                raise UniqueLookupError(
+                    models.NamedPath,
+                    [p.path for p in named],
+                    path=repr(path),
+                )
+            (path_model,) = named
+            if len(ts.dates) != len(ts.values):
+                raise ValueError(
+                    f"dates and values must be 1:1, {len(ts.dates)=}, {len(ts.values)=}"
+                )
+            key = (run_id, path_model.id)
+            if key in existing:
+                raise DuplicateModelError(
+                    models.TimeseriesLedger,
+                    scenario=ts.scenario,
+                    version=ts.version,
+                    path=path,
+                )
+            datetimes = dates_to_floats(ts.dates)
+        except (
+            EmptyLookupError,
+            UniqueLookupError,
+            DuplicateModelError,
+            ValueError,
+        ) as e:
+            logger.error(f"{type(e).__name__} when adding {ts}, continuing")
+            batch.failed.append(
+                schemas.TimeseriesFailure(
+                    scenario=ts.scenario,
+                    version=ts.version,
+                    path=path,
+                    error=f"{type(e).__name__}: {e}",
+                )
+            )
+            continue
+        existing.add(key)
+        if key not in catalog:
+            catalog.add(key)
+            new_catalog_rows.append(dict(run_id=run_id, path_id=path_model.id))
+        new_series.append(
+            (
+                run_id,
+                path_model.id,
+                path_model.interval,
+                datetimes,
+                np.asarray(ts.values, dtype=float),
+            )
+        )
+        batch.added.append(
+            schemas.Timeseries(
+                scenario=ts.scenario,
+                version=ts.version,
+                path=path_model.path,
+                values=ts.values,
+                dates=ts.dates,
+                period_type=path_model.period_type,
+                units=path_model.units,
+                interval=path_model.interval,
+            )
+        )
+    # Put all the data into the database in one transaction
+    if new_catalog_rows:
+        db.execute(insert(models.CommonCatalog), new_catalog_rows)
+    _storage.write_many(db, new_series)
+    bump_revisions(db, {run_id for run_id, *_ in new_series})
+    db.commit()
+    database = _cache.database_key(db)
+    for run_id, path_id, *_ in new_series:
+        series_cache.invalidate(database, run_id, path_id)
+    logger.info(f"{len(batch.added):,} timeseries added, {len(batch.failed):,} failed")
+    return batch
+
+
+def _read_series(
+    db: Session,
+    run: models.Run,
+    path_id: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    if not run.published:
+        return _storage.read_series(db, run_id=run.id, path_id=path_id)
+    key = (_cache.database_key(db), run.id, read_revision(db, run.id), path_id)
+    found = series_cache.get(key)
+    if found is None:
+        found = _storage.read_series(db, run_id=run.id, path_id=path_id)
+        series_cache.put(key, *found)
+    return found
 
-    return schemas.Timeseries(
+
+def _iter_series_for_run(
+    db: Session,
+    run: models.Run,
+    path_ids: Iterable[int],
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    if not run.published:
+        yield from _storage.iter_series_for_run(db, run_id=run.id)
+        return
+    database = _cache.database_key(db)
+    revision = read_revision(db, run.id)
+    cached = list()
+    # In path_id order, the order of `_storage.iter_series_for_run` on a miss
+    for path_id in sorted(path_ids):
+        found = series_cache.get((database, run.id, revision, path_id))
+        if found is None:
+            break
+        cached.append((path_id, *found))
+    else:
+        yield from cached
+        return
+    # Read the whole run in one query, instead of the series that were missing
+    for path_id, datetimes, values in _storage.iter_series_for_run(db, run_id=run.id):
+        series_cache.put((database, run.id, revision, path_id), datetimes, values)
+        yield path_id, datetimes, values
+
+
+def _to_array_timeseries(
+    scenario: str,
+    version: str,
+    path: models.NamedPath | schemas.NamedPath,
+    datetimes: np.ndarray,
+    values: np.ndarray,
+) -> schemas.ArrayTimeseries:
+    return schemas.ArrayTimeseries(
         scenario=scenario,
         version=version,
-        path=path_schema.path,
-        units=path_schema.units,
-        period_type=path_schema.period_type,
-        interval=path_schema.interval,
-        dates=dates,
+        path=path.path,
+        units=path.units,
+        period_type=path.period_type,
+        interval=path.interval,
+        dates=floats_to_datetime64(datetimes),
         values=values,
     )
 
 
+@rollback_on_exception
+def read_arrays(
+    db: Session,
+    scenario: str,
+    version: str,
+    path: str,
+) -> schemas.ArrayTimeseries:
+    """Read one series, without converting the data to python objects.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    scenario : str
+        The name of the scenario
+    version : str
+        The version of the run
+    path : str
+        The DSS path, or the name of the path
+
+    Returns
+    -------
+    schemas.ArrayTimeseries
+        The series, backed by numpy arrays
+    """
+    logger.info(f"reading timeseries where {scenario=}, {version=} {path=}")
+    run = get_run_model(db, scenario=scenario, version=version)
+    # Get the path model
+    path_schema = crud_paths.resolve(db, path)
+    # Get data from the cache, or the database
+    datetimes, values = _read_series(db, run, path_schema.id)
+    logger.info(f"{len(values):,} values found matching criteria")
+    return _to_array_timeseries(scenario, version, path_schema, datetimes, values)
+
+
+@rollback_on_exception
+def read(
+    db: Session,
+    scenario: str,
+    version: str,
+    path: str,
+) -> schemas.Timeseries:
+    ts = read_arrays(db, scenario=scenario, version=version, path=path)
+    return ts.to_timeseries()
+
+
+def _read_paths_with_data(db: Session, run_id: int) -> dict[int, models.NamedPath]:
+    has_data = or_(
+        models.NamedPath.id.in_(
+            select(models.TimeseriesLedger.path_id).where(
+                models.TimeseriesLedger.run_id == run_id
+            )
+        ),
+        models.NamedPath.id.in_(
+            select(models.TimeseriesBlob.path_id).where(
+                models.TimeseriesBlob.run_id == run_id
+            )
+        ),
+    )
+    return {p.id: p for p in db.query(models.NamedPath).filter(has_data)}
+
+
+def read_arrays_for_run(
+    db: Session,
+    scenario: str,
+    version: str,
+) -> Iterator[schemas.ArrayTimeseries]:
+    """Read every series in a run, without converting the data to python objects.
+
+    The run is looked up eagerly, the series are streamed from the database as they
+    are iterated, so the session must stay open until the iterator is exhausted.
+    """
+    run = get_run_model(db, scenario=scenario, version=version)
+    paths_by_id = _read_paths_with_data(db, run.id)
+    logger.info(f"{len(paths_by_id):,} paths found with data for run")
+    return (
+        _to_array_timeseries(
+            scenario,
+            version,
+            paths_by_id[path_id],
+            datetimes,
+            values,
+        )
+        for path_id, datetimes, values in _iter_series_for_run(db, run, paths_by_id)
+    )
+
+
+def arrays_to_timeseries(
+    series: Iterable[schemas.ArrayTimeseries],
+) -> Iterator[schemas.Timeseries]:
+    """Convert `ArrayTimeseries` objects to `Timeseries` objects, one at a time."""
+    # Series usually share their dates, so only format each set once
+    formatted_dates: dict[bytes, tuple[str, ...]] = dict()
+    for ts in series:
+        key = ts.dates.tobytes()
+        if key not in formatted_dates:
+            formatted_dates[key] = datetime64_to_dates(ts.dates)
+        yield schemas.Timeseries(
+            scenario=ts.scenario,
+            version=ts.version,
+            path=ts.path,
+            units=ts.units,
+            period_type=ts.period_type,
+            interval=ts.interval,
+            dates=formatted_dates[key],
+            values=tuple(ts.values.tolist()),
+        )
+
+
+def iter_all_for_run(
+    db: Session,
+    scenario: str,
+    version: str,
+) -> Iterator[schemas.Timeseries]:
+    """Yield every `Timeseries` in a run, one at a time."""
+    return arrays_to_timeseries(
+        read_arrays_for_run(db, scenario=scenario, version=version)
+    )
+
+
 @rollback_on_exception
 def read_all_for_run(
     db: Session,
@@ -185,85 +591,245 @@ def read_all_for_run(
     version: str,
 ) -> list[schemas.Timeseries]:
     logger.info(f"reading all timeseries where {scenario=}, {version=}")
-    # Get the scenario, and the run we are adding data to
-    sceanrio_model = (
-        db.query(models.Scenario).filter(models.Scenario.name == scenario).first()
-    )
-    run = sceanrio_model.run
-    if (run is None) or (run.version != version):
-        # Adding data to an older version
-        run = get_run_model(db, scenario=scenario, version=version)
+    return list(iter_all_for_run(db, scenario=scenario, version=version))
 
-    # Get data from database
-    rows = (
-        db.query(models.TimeseriesLedger)
-        .filter(
-            models.TimeseriesLedger.run_id == run.id,
+
+@rollback_on_exception
+def read_many_arrays(
+    db: Session,
+    scenarios: Sequence[str],
+    paths: Sequence[str],
+    versions: Sequence[str | None] | None = None,
+) -> list[schemas.ArrayTimeseries]:
+    """Read the series of every path in every run requested, resolving the runs and
+    paths with one query each.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    scenarios : Sequence[str]
+        The names of the scenarios
+    paths : Sequence[str]
+        The DSS paths, or the names of the paths
+    versions : Sequence[str | None] | None, optional
+        The version of the run for each scenario, by default None. A missing version
+        reads the preferred run of the scenario
+
+    Returns
+    -------
+    list[schemas.ArrayTimeseries]
+        The series found, ordered by run and then path like the request. Runs or
+        paths that can't be found are skipped
+    """
+    if versions is None:
+        versions = [None] * len(scenarios)
+    if len(versions) != len(scenarios):
+        raise ValueError(
+            f"{len(versions)} versions given for {len(scenarios)} scenarios, "
+            + "expected one version per scenario"
         )
-        .order_by(models.TimeseriesLedger.path_id)
-        .all()
+    logger.info(f"reading {len(paths)} paths from {len(scenarios)} runs")
+    preferred = _read_preferred_versions(
+        db, {s for s, v in zip(scenarios, versions) if not v}
     )
-    logger.info(f"{len(rows):,} rows found matching criteria")
-    # Construct the schemas from the returned data
-    paths = crud_paths.read_paths_in_run(db, run_id=run.id)
-    paths_by_id = {p.id: p for p in paths}
-    grouped_rows: dict[int, list[models.TimeseriesLedger]] = {
-        row.path_id: list() for row in rows
-    }
-    for row in rows:
-        grouped_rows[row.path_id].append(row)
-    timeseries = list()
-    for path_id, rows in grouped_rows.items():
-        if path_id not in paths_by_id:
-            logger.warning(f"{path_id=} not found for run")
-            path_schemas = crud_paths.read(db, id=path_id)
-            if len(path_schemas) != 1:
-                raise UniqueLookupError(models.NamedPath, path_schemas, id=path_id)
-            path_schema = path_schemas[0]
-        else:
-            path_schema = paths_by_id[path_id]
-        values = tuple(r.value for r in rows)
-        dates = tuple(float_to_date(r.datetime) for r in rows)
-        timeseries.append(
-            schemas.Timeseries(
-                scenario=scenario,  # always the same
-                version=version,  # always the same
-                path=path_schema.path,
-                units=path_schema.units,
-                period_type=path_schema.period_type,
-                interval=path_schema.interval,
-                dates=dates,
-                values=values,
-            )
-        )
+    runs = [(s, v if v else preferred.get(s)) for s, v in zip(scenarios, versions)]
+    run_ids = _read_run_ids(db, set(runs))
+    found_paths = _find_paths(db, set(paths))
+    # Resolve the labels, in the order requested
+    run_order: dict[int, int] = dict()
+    for scenario, version in runs:
+        if (scenario, version) not in run_ids:
+            logger.warning(f"couldn't find run for {scenario=}, {version=}")
+            continue
+        run_order.setdefault(run_ids[(scenario, version)], len(run_order))
+    path_order: dict[int, int] = dict()
+    paths_by_id: dict[int, schemas.NamedPath] = dict()
+    for path in paths:
+        if len(found_paths[path]) != 1:
+            logger.warning(f"couldn't find unique {path=}")
+            continue
+        (path_model,) = found_paths[path]
+        path_order.setdefault(path_model.id, len(path_order))
+        paths_by_id[path_model.id] = path_model
+    labels = {run_id: run for run, run_id in run_ids.items()}
+    found = _storage.iter_series_many(
+        db,
+        run_ids=list(run_order),
+        path_ids=list(path_order),
+    )
+    series = sorted(found, key=lambda s: (run_order[s[0]], path_order[s[1]]))
+    logger.info(f"{len(series):,} timeseries found matching criteria")
+    return [
+        _to_array_timeseries(*labels[run_id], paths_by_id[path_id], datetimes, values)
+        for run_id, path_id, datetimes, values in series
+    ]
 
-    return timeseries
 
+def read_blocks_for_run(
+    db: Session,
+    scenario: str,
+    version: str,
+    dates_per_block: int = _storage.DATES_PER_BLOCK,
+) -> tuple[list[models.NamedPath], np.ndarray, Iterator[tuple[np.ndarray, np.ndarray]]]:
+    """Read a run as wide blocks of values, with one column per path.
 
-def update():
-    raise NotImplementedError()
+    The run is looked up eagerly, the blocks are streamed from the database as they
+    are iterated, so the session must stay open until the iterator is exhausted.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    scenario : str
+        The name of the scenario
+    version : str
+        The version of the run
+    dates_per_block : int, optional
+        The number of rows in each block, by default 500
+
+    Returns
+    -------
+    list[models.NamedPath]
+        The paths with data in the run, in column order
+    np.ndarray
+        Every datetime in the run, as seconds since EPOCH
+    Iterator[tuple[np.ndarray, np.ndarray]]
+        The `(datetimes, values)` blocks, `values` is NaN where a path has no data
+    """
+    logger.info(f"reading blocks of timeseries where {scenario=}, {version=}")
+    run = get_run_model(db, scenario=scenario, version=version)
+    paths = sorted(_read_paths_with_data(db, run.id).values(), key=lambda p: p.id)
+    datetimes = _storage.datetimes_for_run(db, run_id=run.id)
+    blocks = _storage.iter_blocks_for_run(
+        db,
+        run_id=run.id,
+        path_ids=[p.id for p in paths],
+        datetimes=datetimes,
+        dates_per_block=dates_per_block,
+    )
+    return paths, datetimes, blocks
 
 
 @rollback_on_exception
-def delete(db: Session, scenario: str, version: str, path: str) -> int:
-    statement = (
-        db.query(models.TimeseriesLedger)
-        .join(models.Run)
-        .join(models.Scenario)
-        .where(models.Scenario.name == scenario)
-        .where(models.Run.version == version)
-        .join(models.NamedPath)
-        .where(models.NamedPath.path == path)
+def update(
+    db: Session,
+    scenario: str,
+    version: str,
+    path: str,
+    values: tuple[float],
+    dates: tuple[str],
+    **kwargs,
+) -> schemas.TimeseriesUpdate:
+    """Add new values to a timeseries, and correct the values that changed.
+
+    The values are compared to the stored series, and only the dates that are new,
+    or have a different value, are written. Stored dates that aren't given are kept.
+    A series that doesn't exist yet is created.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    scenario : str
+        The name of the `Scenario`
+    version : str
+        The version of the `Run`
+    path : str
+        The path, or name, of the `NamedPath`
+    values : tuple[float]
+        The values of the timeseries
+    dates : tuple[str]
+        The ISO formatted dates of the values
+
+    Returns
+    -------
+    schemas.TimeseriesUpdate
+        The number of values inserted, updated and left unchanged
+    """
+    logger.info(f"updating timeseries for {scenario=}, {version=} {path=}")
+    # ignore certain kwargs
+    for k in ("period_type", "interval", "units"):
+        kwargs.pop(k, None)
+    if kwargs:
+        raise TypeError(f"update() got unexpected keyword arguments: {kwargs.keys()}")
+    if len(dates) != len(values):
+        raise ValueError(
+            "dates and values must be 1:1\n"
+            + f"\t{len(dates)=}\n"
+            + f"\t{len(values)=}"
+        )
+    datetimes = dates_to_floats(dates)
+    if len(np.unique(datetimes)) != len(datetimes):
+        raise ValueError("dates must be unique")
+    run_model = get_run_model(db, scenario=scenario, version=version)
+    path_model = crud_paths.resolve(db, path)
+    run_id = run_model.id
+    add_to_catalog(db, run_id=run_id, path_id=path_model.id)
+    inserted, updated = _storage.upsert_series(
+        db,
+        run_id=run_id,
+        path_id=path_model.id,
+        interval=path_model.interval,
+        datetimes=datetimes,
+        values=np.asarray(values, dtype=float),
+    )
+    if inserted or updated:
+        bump_revisions(db, [run_id])
+    db.commit()
+    if inserted or updated:
+        series_cache.invalidate(_cache.database_key(db), run_id, path_model.id)
+    logger.info(f"{inserted=}, {updated=} values of {path_model.path}")
+    return schemas.TimeseriesUpdate(
+        scenario=scenario,
+        version=version,
+        path=path_model.path,
+        inserted=inserted,
+        updated=updated,
+        unchanged=len(values) - inserted - updated,
     )
-    objs = statement.all()
-    if len(objs) == 0:
+
+
+@rollback_on_exception
+def delete(db: Session, scenario: str, version: str, path: str) -> int:
+    run = get_run_model(db, scenario=scenario, version=version)
+    path_schemas = crud_paths.find(db, path)
+    n_deleted = 0
+    for path_schema in path_schemas:
+        n_deleted += _storage.delete_series(db, run_id=run.id, path_id=path_schema.id)
+    if n_deleted == 0:
         raise EmptyLookupError(
             models.TimeseriesLedger,
             sceanrio=scenario,
             version=version,
             path=path,
         )
-    n_deleted = len(objs)
-    statement.delete(synchronize_session="auto")
+    bump_revisions(db, [run.id])
     db.commit()
+    # After the commit, so a read in between can't cache the rows being deleted
+    database = _cache.database_key(db)
+    for path_schema in path_schemas:
+        series_cache.invalidate(database, run.id, path_schema.id)
     return n_deleted
+
+
+@rollback_on_exception
+def repack(db: Session, run_id: int | None = None) -> int:
+    """Move timeseries from the long ledger into packed blobs.
+
+    Parameters
+    ----------
+    db : Session
+        The database session
+    run_id : int | None, optional
+        Only repack the timeseries of this run, by default all runs are repacked
+
+    Returns
+    -------
+    int
+        The number of timeseries that were repacked
+    """
+    logger.info(f"repacking timeseries ledger into blobs where {run_id=}")
+    n_repacked = _storage.repack(db, run_id=run_id)
+    db.commit()
+    return n_repacked
@@ -3,8 +3,9 @@ from pathlib import Path
 
 from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.schema import CreateTable
+from sqlalchemy.schema import CreateIndex, CreateTable
 
+from . import crud, migrations, pragmas
 from .config import DatabaseConfig
 from .models import Base
 
@@ -25,23 +26,49 @@ def create_recipe_file(
             for table in Base.metadata.tables.values():
                 sql = str(CreateTable(table).compile(engine))
                 DST.write(sql.strip() + ";\n\n")
+                for index in sorted(table.indexes, key=lambda ix: ix.name):
+                    sql = str(CreateIndex(index).compile(engine))
+                    DST.write(sql.strip() + ";\n\n")
     except PermissionError as e:
         logger.error(
             f"recipe file ({dst}) couldn't be created because of {e.__class__.__name__}"
         )
 
 
-def make_engine() -> Engine:
-    logger.info("creating database engine")
-    return create_engine(
-        url=db_cfg.url,
-        echo=db_cfg.echo,
+def check_replica(path: Path) -> None:
+    """Refuse to serve a database with an unmerged WAL journal as a replica.
+
+    The replica is opened as immutable, so SQLite never reads its `-wal` file, and the
+    changes in it would be missing from every response.
+    """
+    wal = path.with_name(path.name + "-wal")
+    if wal.exists() and (wal.stat().st_size > 0):
+        raise RuntimeError(
+            f"{path} can't be served read only while {wal.name} exists, run"
+            + " `PRAGMA wal_checkpoint(TRUNCATE)` on it first"
+        )
+
+
+def make_engine(cfg: DatabaseConfig | None = None) -> Engine:
+    if cfg is None:
+        cfg = db_cfg
+    logger.info(f"creating database engine, {cfg.read_only=}")
+    if cfg.read_only:
+        check_replica(cfg.path)
+    engine = create_engine(
+        url=cfg.url,
+        echo=cfg.echo,
     )
+    pragmas.apply_pragmas(engine, cfg.pragmas)
+    return engine
 
 
 def init_db(engine: Engine) -> None:
+    if db_cfg.read_only:
+        logger.info("database is read only, it won't be initialized")
+        return
     logger.info("initializing database")
-    Base.metadata.create_all(bind=engine)
+    migrations.upgrade(engine)
 
 
 def make_session(engine: Engine) -> Session:
@@ -50,6 +77,7 @@ def make_session(engine: Engine) -> Session:
         autocommit=False,
         autoflush=False,
         bind=engine,
+        info={"storage": db_cfg.storage},
     )
     return maker()
 
@@ -65,7 +93,9 @@ def get_db():
 
 
 ENGINE = make_engine()
+crud.timeseries.series_cache.resize(db_cfg.series_cache_bytes)
 create_recipe_file(engine=ENGINE)
-if not db_cfg.source.exists():
+if not db_cfg.path.exists():
     logger.warning("creating empty database because it wasn't found")
     init_db(ENGINE)
+# Existing databases are upgraded with scripts/upgrade_database.py, not on import
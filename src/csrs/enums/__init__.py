@@ -17,6 +17,11 @@ class IntervalEnum(enum.StrEnum):
     year_1 = "1YEAR"
 
 
+class StorageEnum(enum.StrEnum):
+    ledger = "ledger"
+    blob = "blob"
+
+
 def standard_paths_factory(src: Path | None = None) -> enum.Enum:
     """Create the StandardPathsEnum from a toml file specification.
 
@@ -0,0 +1,229 @@
+"""Columnar serialization of timeseries data, with Apache Arrow.
+
+Two layouts are supported:
+
+- `long`: one row per value, with the labels of the series in each row
+- `wide`: one row per datetime, and one column per path
+
+`pyarrow` is an optional dependency, install it with `pip install csrs[arrow]`.
+"""
+
+import io
+import logging
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+import numpy as np
+
+from . import models, schemas
+from .crud.timeseries import arrays_to_timeseries, floats_to_datetime64
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+LABELS = ("scenario", "version", "path", "units", "period_type", "interval")
+ROWS_PER_ROW_GROUP = 100_000
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for the arrow and parquet formats, "
+            + "install it with `pip install csrs[arrow]`"
+        ) from e
+    return pyarrow
+
+
+def long_schema() -> "pa.Schema":
+    pa = import_pyarrow()
+    label = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [(name, label) for name in LABELS]
+        + [("datetime", pa.timestamp("us")), ("value", pa.float64())]
+    )
+
+
+def long_batch(ts: schemas.ArrayTimeseries) -> "pa.RecordBatch":
+    """Convert one series to a `long` layout batch."""
+    pa = import_pyarrow()
+    labels = [str(getattr(ts, name)) for name in LABELS]
+    codes = np.zeros(len(ts), dtype="int32")
+    columns = [pa.DictionaryArray.from_arrays(codes, [label]) for label in labels]
+    columns.append(pa.array(ts.dates, type=pa.timestamp("us")))
+    columns.append(pa.array(ts.values, type=pa.float64()))
+    return pa.RecordBatch.from_arrays(columns, schema=long_schema())
+
+
+def wide_schema(
+    scenario: str,
+    version: str,
+    paths: list[models.NamedPath] | list[schemas.NamedPath],
+) -> "pa.Schema":
+    """A schema with a column for each path, the labels are kept in the metadata."""
+    pa = import_pyarrow()
+    fields = [pa.field("datetime", pa.timestamp("us"))]
+    for p in paths:
+        metadata = dict(
+            units=p.units,
+            period_type=str(p.period_type),
+            interval=str(p.interval),
+        )
+        fields.append(pa.field(p.path, pa.float64(), metadata=metadata))
+    return pa.schema(fields, metadata=dict(scenario=scenario, version=version))
+
+
+def wide_batch(
+    schema: "pa.Schema",
+    datetimes: np.ndarray,
+    values: np.ndarray,
+) -> "pa.RecordBatch":
+    """Convert a block of values to a `wide` layout batch, NaN values become null."""
+    pa = import_pyarrow()
+    columns = [pa.array(floats_to_datetime64(datetimes), type=pa.timestamp("us"))]
+    columns.extend(
+        pa.array(values[:, i], type=pa.float64(), from_pandas=True)
+        for i in range(values.shape[1])
+    )
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class _Sink(io.RawIOBase):
+    """A write-only stream that hands its contents back with `drain`."""
+
+    def __init__(self):
+        self.chunks = list()
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.chunks.append(bytes(b))
+        self.position += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _rebatch(
+    batches: Iterable["pa.RecordBatch"],
+    n_rows: int,
+) -> Iterator["pa.Table"]:
+    pa = import_pyarrow()
+    pending = list()
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= n_rows:
+            yield pa.Table.from_batches(pending)
+            pending, pending_rows = list(), 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def iter_ipc_stream(
+    schema: "pa.Schema",
+    batches: Iterable["pa.RecordBatch"],
+) -> Iterator[bytes]:
+    """Yield the batches as an Arrow IPC stream, one chunk of bytes per batch."""
+    pa = import_pyarrow()
+    sink = _Sink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(
+    schema: "pa.Schema",
+    batches: Iterable["pa.RecordBatch"],
+) -> Iterator[bytes]:
+    """Yield the batches as a Parquet file, one chunk of bytes per row group."""
+    import_pyarrow()
+    import pyarrow.parquet as pq
+
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for table in _rebatch(batches, ROWS_PER_ROW_GROUP):
+            writer.write_table(table)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_arrays(
+    batches: Iterable["pa.RecordBatch"],
+) -> Iterator[schemas.ArrayTimeseries]:
+    """Yield an `ArrayTimeseries` for each series in `long` layout batches.
+
+    A series held in a single batch, which is how the server writes them, is backed
+    by zero-copy views of the Arrow buffers.
+    """
+    pending = None
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        codes = batch.column("path").indices.to_numpy()
+        datetimes = batch.column("datetime").to_numpy()
+        values = batch.column("value").to_numpy()
+        bounds = [0, *(np.flatnonzero(np.diff(codes)) + 1).tolist(), batch.num_rows]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            labels = {name: batch.column(name)[lo].as_py() for name in LABELS}
+            if (pending is not None) and (pending[0] == labels):
+                # The series continues from the last batch
+                pending[1].append(datetimes[lo:hi])
+                pending[2].append(values[lo:hi])
+                continue
+            if pending is not None:
+                yield _join(*pending)
+            pending = (labels, [datetimes[lo:hi]], [values[lo:hi]])
+    if pending is not None:
+        yield _join(*pending)
+
+
+def _join(
+    labels: dict[str, str],
+    datetimes: list[np.ndarray],
+    values: list[np.ndarray],
+) -> schemas.ArrayTimeseries:
+    if len(values) > 1:
+        datetimes, values = [np.concatenate(datetimes)], [np.concatenate(values)]
+    return schemas.ArrayTimeseries(**labels, dates=datetimes[0], values=values[0])
+
+
+def table_to_timeseries(table: "pa.Table") -> list[schemas.Timeseries]:
+    """Convert a `long` layout table to `Timeseries` objects, one per path."""
+    return list(arrays_to_timeseries(iter_arrays(table.to_batches())))
+
+
+def read_ipc_stream(data: bytes) -> list[schemas.ArrayTimeseries]:
+    """Read `ArrayTimeseries` objects from a `long` layout Arrow IPC stream."""
+    pa = import_pyarrow()
+    return list(iter_arrays(pa.ipc.open_stream(data)))
+
+
+def has_pyarrow() -> bool:
+    try:
+        import_pyarrow()
+    except ImportError as e:
+        logger.warning(f"{e}, falling back to json")
+        return False
+    return True
+
+
+def accepts_arrow(accept: str | None) -> bool:
+    """Whether an Accept header asks for Arrow, and it can be provided."""
+    if (not accept) or (ARROW_MEDIA_TYPE not in accept):
+        return False
+    return has_pyarrow()
@@ -0,0 +1,173 @@
+"""Reading the data of many `NamedPath` objects from a DSS file at once.
+
+The catalog of the file is read once, and every `NamedPath` is matched against it in
+a single pass, with a `path_index.PathMatcher`.
+
+The matched records are then read in chunks, in this process or in worker processes
+when asked for, and the `Timeseries` objects are yielded chunk by chunk so they can be
+sent to the database while the rest of the file is read.
+"""
+
+import logging
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandss as pdss
+
+from . import schemas
+from .path_index import PathMatcher, split_path
+
+logger = logging.getLogger(__name__)
+CHUNK_SIZE = 100
+CHUNKS_AHEAD = 2  # chunks submitted per worker, before their results are used
+
+
+@dataclass(frozen=True)
+class Record:
+    """A dataset in the DSS file to read, for the `NamedPath` it matched."""
+
+    named_path: str
+    dataset: "str | pdss.DatasetPath"
+    exact: bool = True  # the dataset is a single entry of the catalog
+
+
+def _dataset_key(path: str) -> str:
+    """The path, without the D part, which is the date of a block of the dataset."""
+    a, b, c, _, e, f = split_path(path)
+    return f"/{a}/{b}/{c}/.*/{e}/{f}/"
+
+
+def match_catalog(
+    paths: Iterable[schemas.NamedPath],
+    catalog: Iterable["str | pdss.DatasetPath"],
+) -> list[Record]:
+    """Find the dataset in the catalog for each `NamedPath`.
+
+    Paths that match no dataset, or more than one, are logged and skipped.
+
+    Parameters
+    ----------
+    paths : Iterable[schemas.NamedPath]
+        The paths to look for
+    catalog : Iterable[str | pdss.DatasetPath]
+        The paths in the DSS file
+
+    Returns
+    -------
+    list[Record]
+        The datasets to read, in the order of `paths`
+    """
+    paths = list(paths)
+    matcher = PathMatcher(paths)
+    found: dict[str, list] = defaultdict(list)
+    for entry in catalog:
+        for named in matcher.match(entry):
+            found[named].append(entry)
+    records = list()
+    for p in paths:
+        entries = found.get(p.path, ())
+        datasets = {_dataset_key(e) for e in entries}
+        if len(datasets) == 0:
+            logger.warning(f"no datasets match {p.path}")
+        elif len(datasets) > 1:
+            logger.warning(
+                f"multiple datasets match {p.path}, skipping both to avoid conflicts"
+            )
+        elif len(entries) == 1:
+            records.append(Record(named_path=p.path, dataset=entries[0]))
+        else:
+            # the catalog lists each block of the dataset, read them together
+            records.append(Record(named_path=p.path, dataset=p.path, exact=False))
+    return records
+
+
+def read_records(
+    dss: Path,
+    scenario: str,
+    version: str,
+    records: list[Record],
+) -> list[schemas.Timeseries]:
+    """Read the datasets of the records, with the paths of their `NamedPath`."""
+    tss = list()
+    with pdss.DSS(dss) as dss_obj:
+        for record in records:
+            try:
+                if record.exact:
+                    rts = dss_obj.read_rts(record.dataset)
+                else:
+                    (rts,) = dss_obj.read_multiple_rts(record.dataset)
+            except Exception as e:
+                logger.error(
+                    f"{type(e)} when reading {record.dataset} in {dss}, skipping"
+                )
+                continue
+            ts = schemas.Timeseries.from_pandss(
+                scenario=scenario,
+                version=version,
+                rts=rts,
+            )
+            ts.path = record.named_path  # Use the path from the database
+            tss.append(ts)
+    return tss
+
+
+def iter_timeseries_from_dss(
+    dss: Path,
+    scenario: str,
+    version: str,
+    paths: list[schemas.NamedPath],
+    max_workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list[schemas.Timeseries]]:
+    """Read the `Timeseries` of the paths from a DSS file, in chunks.
+
+    Parameters
+    ----------
+    dss : Path
+        The DSS file to read
+    scenario : str
+        The name of the `Scenario` to assign the data to
+    version : str
+        The version of the `Run` to assign the data to
+    paths : list[schemas.NamedPath]
+        The paths to read
+    max_workers : int, optional
+        The number of processes reading the file, by default 1, which reads the
+        file in this process. At most `CHUNKS_AHEAD` chunks per worker are read
+        before they're used
+    chunk_size : int, optional
+        The number of datasets read by a worker at a time, by default 100
+
+    Yields
+    ------
+    list[schemas.Timeseries]
+        The `Timeseries` of a chunk of the paths, in the order they're read
+    """
+    dss = Path(dss)
+    records = match_catalog(paths, pdss.read_catalog(dss).paths)
+    logger.info(f"{len(records)} datasets match {len(paths)} paths in {dss}")
+    chunks = list()
+    for start in range(0, len(records), chunk_size):
+        stop = start + chunk_size
+        chunks.append(records[start:stop])
+    max_workers = min(max_workers, max(len(chunks), 1))
+    if max_workers <= 1:
+        for chunk in chunks:
+            yield read_records(dss, scenario, version, chunk)
+        return
+    remaining = iter(chunks)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque(
+            pool.submit(read_records, dss, scenario, version, chunk)
+            for chunk in islice(remaining, CHUNKS_AHEAD * max_workers)
+        )
+        while pending:
+            tss = pending.popleft().result()
+            # Keep the workers busy while the chunk is used
+            for chunk in islice(remaining, 1):
+                pending.append(pool.submit(read_records, dss, scenario, version, chunk))
+            yield tss
@@ -1,29 +1,61 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Request
+import anyio.to_thread
+from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.routing import APIRoute
 
 from . import config, routes
+from .database import db_cfg
 from .pages import errors
 
 logger = config.get_csrs_logger()
 config.configure_logging(logger)
+WRITE_METHODS = {"PUT", "POST", "PATCH", "DELETE"}
 
 
-def create_app() -> FastAPI:
+def read_only_router(router: APIRouter) -> APIRouter:
+    """A copy of the router without the routes that could change the database."""
+    filtered = APIRouter()
+    for route in router.routes:
+        if isinstance(route, APIRoute) and (route.methods & WRITE_METHODS):
+            logger.debug(f"read only, dropping {route.methods} {route.path}")
+            continue
+        filtered.routes.append(route)
+    return filtered
+
+
+def create_app(read_only: bool | None = None) -> FastAPI:
+    if read_only is None:
+        read_only = db_cfg.read_only
     logger.info("creating csrs fastapi app")
     logger.debug(f"in csrs.main module, {__name__=}")
     app_cfg = config.AppConfig()
-    app = FastAPI(**app_cfg.model_dump())
-    app.include_router(routes.page_routes.home.router)
-    app.include_router(routes.timeseries.router)
-    app.include_router(routes.runs.router)
-    app.include_router(routes.scenarios.router)
-    app.include_router(routes.assumptions.router)
-    app.include_router(routes.paths.router)
-    app.include_router(routes.page_routes.edit.router)
-    app.include_router(routes.page_routes.download.router)
-    app.include_router(routes.page_routes.database.router)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        # Bound the threads used by sync handlers, and their database connections
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = app_cfg.worker_threads
+        logger.info(f"route handlers limited to {app_cfg.worker_threads} threads")
+        yield
+
+    app = FastAPI(lifespan=lifespan, **app_cfg.fastapi_kwargs())
+    for router in (
+        routes.page_routes.home.router,
+        routes.timeseries.router,
+        routes.runs.router,
+        routes.scenarios.router,
+        routes.assumptions.router,
+        routes.paths.router,
+        routes.page_routes.edit.router,
+        routes.page_routes.download.router,
+        routes.page_routes.database.router,
+    ):
+        if read_only:
+            router = read_only_router(router)
+        app.include_router(router)
     return app
 
 
@@ -0,0 +1,91 @@
+"""Upgrades for databases created by older versions of csrs.
+
+`Base.metadata.create_all` only creates missing tables, so additions to the tables
+that already exist in a database are applied here. Upgrades are run explicitly, with
+scripts/upgrade_database.py, instead of when the package is imported.
+"""
+
+import logging
+
+from sqlalchemy import Engine, inspect
+
+from .models import Base
+
+logger = logging.getLogger(__name__)
+# Indexes created by older versions, that are no longer declared by the models
+OBSOLETE_INDEXES = {
+    # Duplicated the unique_datapoint index with the values, too large for its use
+    "timeseries_ledger": ("ix_timeseries_ledger_series",),
+}
+
+
+def create_missing_indexes(engine: Engine) -> list[str]:
+    """Create the indexes declared by the models that are missing from the database.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the database to upgrade
+
+    Returns
+    -------
+    list[str]
+        The names of the indexes created
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = list()
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            logger.info(f"creating index {index.name} on {table.name}")
+            index.create(bind=engine)
+            created.append(index.name)
+    if created and (engine.dialect.name == "sqlite"):
+        # Refresh the statistics the query planner uses to choose indexes
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+    return created
+
+
+def drop_obsolete_indexes(engine: Engine) -> list[str]:
+    """Drop the indexes in `OBSOLETE_INDEXES` that exist in the database.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the database to upgrade
+
+    Returns
+    -------
+    list[str]
+        The names of the indexes dropped
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    dropped = list()
+    with engine.begin() as connection:
+        for table, names in OBSOLETE_INDEXES.items():
+            if table not in existing_tables:
+                continue
+            existing = {ix["name"] for ix in inspector.get_indexes(table)}
+            for name in names:
+                if name not in existing:
+                    continue
+                logger.info(f"dropping index {name} on {table}")
+                connection.exec_driver_sql(f"DROP INDEX {name}")
+                dropped.append(name)
+    return dropped
+
+
+def upgrade(engine: Engine) -> None:
+    """Create any missing tables and indexes in the database, and drop the indexes
+    that are no longer used."""
+    Base.metadata.create_all(bind=engine)
+    created = create_missing_indexes(engine)
+    dropped = drop_obsolete_indexes(engine)
+    logger.info(f"upgraded {engine.url}, {created=}, {dropped=}")
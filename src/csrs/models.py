@@ -4,7 +4,7 @@ from typing import Optional
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.schema import UniqueConstraint
+from sqlalchemy.schema import Index, UniqueConstraint
 
 from .enums import IntervalEnum, PeriodTypeEnum
 
@@ -48,10 +48,12 @@ class ScenarioAssumptions(Base):
     __tablename__ = "scenario_assumptions"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"), nullable=False)
+    scenario_id: Mapped[int] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     assumption_kind: Mapped[str] = mapped_column(nullable=False)
     assumption_id: Mapped[int] = mapped_column(
-        ForeignKey("assumptions.id"), nullable=False
+        ForeignKey("assumptions.id"), nullable=False, index=True
     )
     # ORM relationships
     scenario: Mapped["Scenario"] = relationship(back_populates="assumption_maps")
@@ -95,10 +97,13 @@ class Run(Base):
     __tablename__ = "runs"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"))
+    scenario_id: Mapped[int] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="CASCADE"), index=True
+    )
     parent_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("runs.id"),
+        ForeignKey("runs.id", ondelete="SET NULL"),
         nullable=True,
+        index=True,
     )
     # metadata
     contact: Mapped[str] = mapped_column(nullable=False)
@@ -128,13 +133,14 @@ class PreferredVersion(Base):
     __tablename__ = "preferred_versions"
 
     scenario_id: Mapped[int] = mapped_column(
-        ForeignKey("scenarios.id"),
+        ForeignKey("scenarios.id", ondelete="CASCADE"),
         primary_key=True,
         nullable=False,
     )
     run_id: Mapped[int] = mapped_column(
-        ForeignKey("runs.id"),
+        ForeignKey("runs.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     # ORM relationships
     scenario: Mapped["Scenario"] = relationship(back_populates="preference")
@@ -163,8 +169,12 @@ class RunHistory(Base):
     __tablename__ = "run_history"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    run_id = mapped_column(ForeignKey("runs.id"), nullable=False)
-    scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"))
+    run_id = mapped_column(
+        ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    scenario_id: Mapped[int] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="CASCADE")
+    )
     version: Mapped[str] = mapped_column(nullable=False)
     # ORM relationships
     scenario: Mapped["Scenario"] = relationship(viewonly=True)
@@ -190,11 +200,18 @@ class CommonCatalog(Base):
     __tablename__ = "common_catalog"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("runs.id", ondelete="CASCADE"), nullable=False
+    )
     path_id: Mapped[int] = mapped_column(ForeignKey("named_paths.id"), nullable=False)
     # ORM relationships
     path: Mapped["NamedPath"] = relationship()
     run: Mapped["Run"] = relationship(back_populates="catalog")
+    # Indexes for the lookups by run, and by path
+    __table_args__ = (
+        Index("ix_common_catalog_run_path", "run_id", "path_id"),
+        Index("ix_common_catalog_path_id", "path_id"),
+    )
 
 
 class NamedPath(Base):
@@ -204,7 +221,7 @@ class NamedPath(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
     name: Mapped[str] = mapped_column()
-    path: Mapped[str] = mapped_column()
+    path: Mapped[str] = mapped_column(index=True)
     category: Mapped[str] = mapped_column(nullable=False)
     period_type: Mapped[PeriodTypeEnum] = mapped_column(nullable=False)
     interval: Mapped[IntervalEnum] = mapped_column(nullable=False)
@@ -220,7 +237,9 @@ class TimeseriesLedger(Base):
     __tablename__ = "timeseries_ledger"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("runs.id", ondelete="CASCADE"), nullable=False
+    )
     path_id: Mapped[int] = mapped_column(ForeignKey("named_paths.id"), nullable=False)
     datetime: Mapped[float] = mapped_column(nullable=False)
     value: Mapped[float] = mapped_column(nullable=False)
@@ -232,9 +251,56 @@ class TimeseriesLedger(Base):
             "datetime",
             name="unique_datapoint",
         ),
+        Index("ix_timeseries_ledger_path_id", "path_id"),
+    )
+
+
+class TimeseriesBlob(Base):
+    """Packed arrays of timeseries data, one row per series."""
+
+    __tablename__ = "timeseries_blobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("runs.id", ondelete="CASCADE"), nullable=False
+    )
+    path_id: Mapped[int] = mapped_column(ForeignKey("named_paths.id"), nullable=False)
+    start: Mapped[float] = mapped_column(nullable=False)
+    interval: Mapped[str] = mapped_column(nullable=False)
+    length: Mapped[int] = mapped_column(nullable=False)
+    # float64 arrays, datetimes is NULL when the dates are regular
+    datetimes: Mapped[Optional[bytes]] = mapped_column(nullable=True)
+    values: Mapped[bytes] = mapped_column(nullable=False)
+    # Multi-column unique rules
+    __table_args__ = (
+        UniqueConstraint(
+            "run_id",
+            "path_id",
+            name="unique_series",
+        ),
+        Index("ix_timeseries_blobs_path_id", "path_id"),
     )
 
 
+class RunRevision(Base):
+    """A counter bumped by every write to the timeseries of a run."""
+
+    __tablename__ = "run_revisions"
+
+    # Not a foreign key, the revision outlives the run so a reused id gets a new one
+    run_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    revision: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
+class PathRevision(Base):
+    """A counter bumped by every write to the named paths, kept in a single row."""
+
+    __tablename__ = "path_revisions"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    revision: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
 class Metric(Base):
     """Data about the meaning of metrics."""
 
@@ -252,7 +318,9 @@ class MetricValue(Base):
     __tablename__ = "metric_values"
 
     path_id: Mapped[int] = mapped_column(ForeignKey("named_paths.id"), primary_key=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), primary_key=True)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("runs.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
     metric_id: Mapped[int] = mapped_column(ForeignKey("metrics.id"), primary_key=True)
     x: Mapped[int] = mapped_column(nullable=False)
     units: Mapped[str] = mapped_column(nullable=False)
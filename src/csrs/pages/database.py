@@ -10,6 +10,7 @@ def render(
         request=request
     )
     return loader.jinja_loader.TemplateResponse(
+        request,
         "templates/database.jinja",
         context=dict(
             page_title="Database Download",
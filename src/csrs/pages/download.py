@@ -13,6 +13,7 @@ def render(
         request=request
     )
     return loader.jinja_loader.TemplateResponse(
+        request,
         "templates/download.jinja",
         context=dict(
             page_title="Download",
@@ -1,7 +1,7 @@
 from fastapi import Request
 from sqlalchemy.orm import Session
 
-from .. import crud, errors
+from .. import crud
 from ..database import db_cfg
 from . import loader, templates
 
@@ -12,6 +12,7 @@ def render_assumptions(request: Request, db: Session):
     objects = [templates.EditableAssumption(obj, all_kinds) for obj in all_objs]
     metadata = loader.ENV.get_template("static/metadata/assumption.jinja").render()
     return loader.jinja_loader.TemplateResponse(
+        request,
         "templates/edit.jinja",
         {
             "request": request,
@@ -27,16 +28,15 @@ def render_assumptions(request: Request, db: Session):
 def render_scenarios(request: Request, db: Session):
     all_objs = crud.scenarios.read(db=db)
     all_assumptions = crud.assumptions.read(db=db)
+    all_versions = crud.runs.read_versions(db=db)  # one query, not one per scenario
     objects = list()
     for obj in all_objs:
-        try:
-            versions = [r.version for r in crud.runs.read(db=db, scenario=obj.name)]
-        except errors.EmptyLookupError:
-            versions = ["No Runs for Scenario"]
+        versions = all_versions.get(obj.name, ["No Runs for Scenario"])
         t = templates.EditableScenario(obj, versions, all_assumptions)
         objects.append(t)
     metadata = loader.ENV.get_template("static/metadata/scenario.jinja").render()
     return loader.jinja_loader.TemplateResponse(
+        request,
         "templates/edit.jinja",
         {
             "request": request,
@@ -58,6 +58,7 @@ def render_runs(request: Request, db: Session):
         objects.append(t)
     metadata = loader.ENV.get_template("static/metadata/run.jinja").render()
     return loader.jinja_loader.TemplateResponse(
+        request,
         "templates/edit.jinja",
         {
             "request": request,
@@ -78,6 +79,7 @@ def render_paths(request: Request, db: Session):
         objects.append(t)
     metadata = loader.ENV.get_template("static/metadata/path.jinja").render()
     return loader.jinja_loader.TemplateResponse(
+        request,
         "templates/edit.jinja",
         {
             "request": request,
@@ -5,6 +5,7 @@ from .loader import jinja_loader
 
 def error_404(request: Request):
     return jinja_loader.TemplateResponse(
+        request,
         "/static/errors/404.jinja",
         dict(request=request),
         status_code=404,
@@ -9,6 +9,7 @@ def render(request: Request):
         context=dict(request=request)
     )
     return jinja_loader.TemplateResponse(
+        request,
         "templates/home.jinja",
         context=dict(
             page_title="CalSim Scenario Results Server",
@@ -0,0 +1,84 @@
+"""Resolving DSS paths and names to the `NamedPath` objects they refer to.
+
+The path of a `NamedPath` is a pattern, where each part of the DSS path is a regular
+expression (`/.*/C_CAA087/CHANNEL/.*/.*/.*/`). The patterns are compiled once, and
+indexed by their B part (the location), so a concrete path is only compared to the
+few patterns for the same location, and to the patterns with a regular expression in
+their B part.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import Iterable
+
+from . import schemas
+
+logger = logging.getLogger(__name__)
+# Characters that make a B part a pattern, instead of a single location
+REGEX_CHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+
+def split_path(path: str) -> list[str]:
+    """The parts of a DSS path, A through F."""
+    return str(path).strip("/").split("/")
+
+
+class PathMatcher:
+    """The patterns of many `NamedPath` objects, indexed by their B part."""
+
+    def __init__(self, paths: Iterable[schemas.NamedPath]):
+        self.by_location: dict[str, list[tuple[str, re.Pattern]]] = defaultdict(list)
+        self.wildcards: list[tuple[str, re.Pattern]] = list()
+        for p in paths:
+            parts = split_path(p.path)
+            if len(parts) != 6:
+                logger.warning(f"{p.path} isn't a DSS path, it can't be matched")
+                continue
+            pattern = re.compile(
+                "/" + "/".join(f"(?:{part})" for part in parts) + "/",
+                flags=re.IGNORECASE,
+            )
+            location = parts[1]
+            if REGEX_CHARACTERS.isdisjoint(location):
+                self.by_location[location.upper()].append((p.path, pattern))
+            else:
+                self.wildcards.append((p.path, pattern))
+
+    def match(self, path: str) -> list[str]:
+        """The patterns that match a concrete DSS path."""
+        path = str(path)
+        parts = split_path(path)
+        if len(parts) != 6:
+            return list()
+        candidates = self.by_location.get(parts[1].upper(), ())
+        matched = list()
+        for named, pattern in (*candidates, *self.wildcards):
+            if (named not in matched) and pattern.fullmatch(path):
+                matched.append(named)
+        return matched
+
+
+class PathIndex:
+    """Every `NamedPath` of a database, by path, by name, and by pattern."""
+
+    def __init__(self, paths: Iterable[schemas.NamedPath]):
+        self.by_path: dict[str, list[schemas.NamedPath]] = defaultdict(list)
+        self.by_name: dict[str, list[schemas.NamedPath]] = defaultdict(list)
+        for p in paths:
+            self.by_path[p.path].append(p)
+            self.by_name[p.name].append(p)
+        self.matcher = PathMatcher(ps[0] for ps in self.by_path.values())
+
+    def __len__(self) -> int:
+        return sum(len(ps) for ps in self.by_path.values())
+
+    def find(self, path: str) -> list[schemas.NamedPath]:
+        """The `NamedPath` objects with this path, or else this name, or else a
+        pattern matching this concrete DSS path."""
+        path = str(path)
+        if path in self.by_path:
+            return list(self.by_path[path])
+        if path in self.by_name:
+            return list(self.by_name[path])
+        return [p for named in self.matcher.match(path) for p in self.by_path[named]]
@@ -0,0 +1,59 @@
+"""SQLite connection tuning, shared by the server and `LocalClient` engines.
+
+The `PRAGMA` statements are run on every new connection by a `connect` event
+listener, because most of them only last as long as the connection. That includes
+`foreign_keys`, without which the `ondelete` rules of the models aren't enforced.
+"""
+
+import logging
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+
+def apply_pragmas(engine: Engine, pragmas: dict[str, str | int]) -> None:
+    """Run the `PRAGMA` statements on each connection the engine opens.
+
+    Parameters
+    ----------
+    engine : Engine
+        A SQLite engine, engines for other dialects are left unchanged
+    pragmas : dict[str, str | int]
+        The pragma names and values, run in order
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    logger.debug(f"applying pragmas to {engine.url}: {pragmas}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def read_pragmas(engine: Engine, names: list[str]) -> dict[str, str | int]:
+    """Read the current values of the pragmas from a connection of the engine."""
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in names
+        }
+
+
+def checkpoint(engine: Engine) -> None:
+    """Copy the WAL journal into the database file and truncate it, so the file can
+    be copied, or served as an immutable replica, on its own."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as connection:
+        mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+        if mode != "wal":
+            return
+        busy, *_ = connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+    if busy:
+        logger.warning(f"checkpoint of {engine.url} was blocked by another connection")
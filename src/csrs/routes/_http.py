@@ -0,0 +1,64 @@
+"""Validators for conditional GET requests.
+
+Responses get a strong `ETag`, and a request with a matching `If-None-Match` header
+is answered with `304 Not Modified` instead of the body. The tag of a timeseries
+response is derived from the revision of its run, so it can be checked before the
+data is read; smaller responses are tagged by hashing their body.
+"""
+
+import hashlib
+from functools import cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from ..database import db_cfg
+
+
+def make_etag(*parts: Any) -> str:
+    """A strong ETag, from the bytes or the `repr` of the parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return ("*" in tags) or (etag in tags)
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    # Arrow and JSON are negotiated on the same URL
+    return {"ETag": etag, "Cache-Control": db_cfg.cache_control, "Vary": "Accept"}
+
+
+def not_modified(if_none_match: str | None, etag: str) -> Response | None:
+    """A `304 Not Modified` response, if the client already has this `etag`."""
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+
+@cache
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def conditional_json(
+    content: Any,
+    annotation: Any,
+    if_none_match: str | None,
+) -> Response:
+    """Serialize the content like its response model, and tag it with the hash of
+    the body."""
+    body = _adapter(annotation).dump_json(content)
+    etag = make_etag(body)
+    response = not_modified(if_none_match, etag)
+    if response is not None:
+        return response
+    return Response(body, media_type="application/json", headers=cache_headers(etag))
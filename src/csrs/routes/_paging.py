@@ -0,0 +1,20 @@
+"""Query parameters for keyset pagination of the listing routes.
+
+A page is requested with `limit`, and the next one with `after`, the `id` of the last
+object of the previous page. Without `limit`, every object is returned.
+"""
+
+from fastapi import Query
+
+from ..database import db_cfg
+
+LIMIT = Query(
+    default=None,
+    ge=1,
+    le=db_cfg.max_page_size,
+    description="The most objects to return, by default all of them",
+)
+AFTER = Query(
+    default=None,
+    description="The id of the last object of the previous page",
+)
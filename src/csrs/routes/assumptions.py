@@ -1,38 +1,50 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
 from ..database import get_db
+from ._http import conditional_json
+from ._paging import AFTER, LIMIT
 
 router = APIRouter(prefix="/assumptions", tags=["Assumptions"])
 logger = logging.getLogger(__name__)
 
 
 @router.get("/names", response_model=tuple[str, ...])
-async def get_assumption_table_names(db: Session = Depends(get_db)):
+def get_assumption_table_names(db: Session = Depends(get_db)):
     logger.info("getting assumption categories")
     return crud.assumptions.read_kinds(db=db)
 
 
 @router.get("", response_model=list[schemas.Assumption])
-async def get_assumption(
+def get_assumption(
     id: int = None,
     name: str = None,
     kind: str = None,
+    limit: int | None = LIMIT,
+    after: int | None = AFTER,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
-    logger.info(f"{id=}, {name=}, {kind=}")
-    models = crud.assumptions.read(db=db, id=id, name=name, kind=kind)
+    logger.info(f"{id=}, {name=}, {kind=}, {limit=}, {after=}")
+    models = crud.assumptions.read(
+        db=db,
+        id=id,
+        name=name,
+        kind=kind,
+        limit=limit,
+        after=after,
+    )
     logger.debug(f"{len(models)} assumptions found")
     for m in models:
         logger.debug(f"{m.name=}, {m.detail=}")
-    return models
+    return conditional_json(models, list[schemas.Assumption], if_none_match)
 
 
 @router.put("", response_model=schemas.Assumption)
-async def put_assumption(
+def put_assumption(
     _in: schemas.Assumption,
     db: Session = Depends(get_db),
 ):
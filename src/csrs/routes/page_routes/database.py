@@ -11,12 +11,12 @@ router = APIRouter(prefix="/database", include_in_schema=False)
 logger = logging.getLogger(__name__)
 
 
-async def page_database(request: Request, db: Session = Depends(get_db)):
+def page_database(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
     return database_page.render(request)
 
 
-async def database_download(request: Request, db: Session = Depends(get_db)):
+def database_download(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
 
     def stream(f):
@@ -24,11 +24,11 @@ async def database_download(request: Request, db: Session = Depends(get_db)):
             yield from file_like
 
     return StreamingResponse(
-        stream(db_cfg.source),
+        stream(db_cfg.path),
         media_type="application/vnd.sqlite3",
         headers={
-            "Content-Disposition": f"attachment; filename={db_cfg.source.name}",
-            "Content-Length": str(db_cfg.source.stat().st_size),
+            "Content-Disposition": f"attachment; filename={db_cfg.path.name}",
+            "Content-Length": str(db_cfg.path.stat().st_size),
         },
     )
 
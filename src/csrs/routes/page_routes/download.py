@@ -1,96 +1,191 @@
 import io
 import json
 import logging
+from typing import Iterator
 
+import numpy as np
 import pandas as pd
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from ... import crud, errors, models, schemas
+from ... import crud, errors, formats, models, schemas
 from ...database import get_db
 from ...pages import download
+from .. import _http
 
 router = APIRouter(prefix="/download", include_in_schema=False)
 logger = logging.getLogger(__name__)
+LAYOUTS = ("long", "wide")
 
 
 @router.get("/", response_class=HTMLResponse)
-async def page_download(request: Request, db: Session = Depends(get_db)):
+def page_download(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
     runs = crud.runs.read(db)
     return download.render(request, runs=runs)
 
 
-def slow_lossy_concat(frames: list[pd.DataFrame]) -> pd.DataFrame:
-    df = frames.pop()
-    for _df in frames:
+def header_frame(
+    scenario: str,
+    version: str,
+    paths: list[models.NamedPath],
+) -> pd.DataFrame:
+    """An empty DataFrame with the multi-row header of a run export."""
+    if not paths:  # return an empty dataset
+        paths = [
+            models.NamedPath(
+                path="/.*/.*/.*/.*/.*/.*/",
+                period_type="PER-AVER",
+                units="NONE",
+                interval="1MON",
+            )
+        ]
+    frames = [
+        schemas.Timeseries(
+            scenario=scenario,
+            version=version,
+            path=p.path,
+            values=(0.0,),
+            dates=("1921-10-31",),
+            period_type=p.period_type,
+            units=p.units,
+            interval=p.interval,
+        ).to_frame()
+        for p in paths
+    ]
+    df = pd.concat(frames, axis=1)
+    return df.drop(df.index)
+
+
+def iter_csv(
+    header: pd.DataFrame,
+    datetimes: np.ndarray,
+    blocks: Iterator[tuple[np.ndarray, np.ndarray]],
+) -> Iterator[str]:
+    """Yield a run as CSV text, the header first and then one chunk per block."""
+    yield header.to_csv()
+    # Match the pandas default, dates only when no value has a time of day
+    dates_only = bool(np.all(np.mod(datetimes, 86_400) == 0))
+    date_format = "%Y-%m-%d" if dates_only else "%Y-%m-%d %H:%M:%S"
+    for block_datetimes, values in blocks:
+        df = pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(
+                crud.timeseries.floats_to_datetime64(block_datetimes)
+            ),
+            columns=header.columns,
+        )
+        yield df.to_csv(header=False, date_format=date_format)
+
+
+def iter_columnar(
+    db: Session,
+    scenario: str,
+    version: str,
+    file_type: str,
+    layout: str,
+) -> Iterator[bytes]:
+    """Yield a run as an Arrow IPC stream or a Parquet file, in either layout."""
+    if layout == "long":
         try:
-            df = pd.concat([df, _df], axis=1)
-        except pd.errors.InvalidIndexError as e:
-            logger.error(
-                f"{type(e).__name__} when concatenating dataframes, "
-                + f"L columns len: {len(df.columns)}, "
-                + f"R columns len: {len(_df.columns)}, "
-                + f"L index len: {len(df)} ({len(df.index.unique(0))} unique idx), "
-                + f"R index len: {len(_df)} ({len(_df.index.unique(0))} unique idx)"
+            series = crud.timeseries.read_arrays_for_run(
+                db,
+                scenario=scenario,
+                version=version,
+            )
+        except errors.EmptyLookupError:
+            series = iter(())
+        schema = formats.long_schema()
+        batches = (formats.long_batch(ts) for ts in series)
+    elif layout == "wide":
+        try:
+            paths, _, blocks = crud.timeseries.read_blocks_for_run(
+                db,
+                scenario=scenario,
+                version=version,
             )
-        except Exception as e:
-            logger.error(f"{type(e).__name__} when concatenating dataframes.")
-    return df
+        except errors.EmptyLookupError:
+            paths, blocks = list(), iter(())
+        schema = formats.wide_schema(scenario, version, paths)
+        batches = (
+            formats.wide_batch(schema, datetimes, values)
+            for datetimes, values in blocks
+        )
+    else:
+        raise NotImplementedError(f"{layout=}")
+    if file_type == "arrow":
+        return formats.iter_ipc_stream(schema, batches)
+    return formats.iter_parquet(schema, batches)
 
 
 @router.get("/run", response_class=StreamingResponse)
-async def download_run(
+def download_run(
     scenario: str,
     version: str,
     request: Request,
     file_type: str = "csv",
+    layout: str = "long",
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
     logger.info(f"{request.method} {request.url}")
+    # Check before streaming, an error after the response has started can't be sent
+    layout = layout.lower()
+    if layout not in LAYOUTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{layout=}, expected one of: {', '.join(LAYOUTS)}",
+        )
 
-    file_content = io.StringIO()
+    filename = f"{scenario}-{version}.{file_type}"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if file_type.lower() in ("csv", "arrow", "parquet"):
+        try:
+            key = crud.timeseries.read_version_key(
+                db, scenario=scenario, version=version
+            )
+        except errors.EmptyLookupError:
+            key = None
+        if key is not None:
+            etag = _http.make_etag("download/run", key, file_type.lower(), layout)
+            cached = _http.not_modified(if_none_match, etag)
+            if cached is not None:
+                return cached
+            headers.update(_http.cache_headers(etag))
     if file_type.lower() == "csv":
         try:
-            timeseries = crud.timeseries.read_all_for_run(
+            paths, datetimes, blocks = crud.timeseries.read_blocks_for_run(
                 db,
                 scenario=scenario,
                 version=version,
             )
-            frames = [ts.to_frame() for ts in timeseries]
-            if len(frames) == 0:
-                raise errors.EmptyLookupError(models.TimeseriesLedger)
-            try:
-                df = pd.concat(frames, axis=1)
-            except Exception as e:
-                logger.error(
-                    f"{type(e).__name__} occurred when concatenating all the data,"
-                    + " trying again with a slower method"
-                )
-                df = slow_lossy_concat(frames)
         except errors.EmptyLookupError as e:
-            # return an empty dataset
             logger.error(
                 f"{type(e).__name__} occurred when reading timeseries data for:"
                 + f"{scenario=}, {version=}, returning empty csv"
             )
-            ts = schemas.Timeseries(
-                scenario=scenario,
-                version=version,
-                path="/.*/.*/.*/.*/.*/.*/",
-                values=(0.0,),
-                dates=("1921-10-31",),
-                period_type="PER-AVER",
-                units="NONE",
-                interval="1MON",
-            )
-            df = ts.to_frame()
-            df = df.drop(df.index[0])
+            paths, datetimes, blocks = list(), np.empty(0), iter(())
+        header = header_frame(scenario, version, paths)
+        return StreamingResponse(
+            iter_csv(header, datetimes, blocks),
+            media_type="text/csv",
+            headers=headers,
+        )
 
-        df.to_csv(file_content)
-        media_type = "text/csv"
-    elif file_type.lower() == "json":
+    elif file_type.lower() in ("arrow", "parquet"):
+        media_types = dict(
+            arrow=formats.ARROW_MEDIA_TYPE,
+            parquet=formats.PARQUET_MEDIA_TYPE,
+        )
+        return StreamingResponse(
+            iter_columnar(db, scenario, version, file_type.lower(), layout),
+            media_type=media_types[file_type.lower()],
+            headers=headers,
+        )
+
+    file_content = io.StringIO()
+    if file_type.lower() == "json":
         (run,) = crud.runs.read(db, scenario=scenario, version=version)
         (scen,) = crud.scenarios.read(db, name=scenario)
         assumptions = crud.assumptions.read_for_scenario(db, scenario=scenario)
@@ -109,11 +204,4 @@ async def download_run(
     else:
         raise NotImplementedError(f"{file_type=}")
     file_content.seek(0)
-    filename = f"{scenario}-{version}.{file_type}"
-    return StreamingResponse(
-        file_content,
-        media_type=media_type,
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}",
-        },
-    )
+    return StreamingResponse(file_content, media_type=media_type, headers=headers)
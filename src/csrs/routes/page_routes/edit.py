@@ -3,6 +3,7 @@ import logging
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
+from starlette.datastructures import FormData
 
 from ... import crud, errors
 from ...database import db_cfg, get_db
@@ -11,31 +12,37 @@ from ...pages import edit
 router = APIRouter(prefix="/edit", include_in_schema=False)
 logger = logging.getLogger(__name__)
 
+
+async def form_data(request: Request) -> FormData:
+    """The submitted form, read in a dependency so the handlers can be sync."""
+    return await request.form()
+
+
 ###############################################################################
 # EDIT
 # Below are the routes for read, update, delete actions via forms
 
 
 @router.get("/assumptions", response_class=HTMLResponse)
-async def page_assumptions(request: Request, db: Session = Depends(get_db)):
+def page_assumptions(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
     return edit.render_assumptions(request, db)
 
 
 @router.get("/scenarios", response_class=HTMLResponse)
-async def page_scenarios(request: Request, db: Session = Depends(get_db)):
+def page_scenarios(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
     return edit.render_scenarios(request, db)
 
 
 @router.get("/runs", response_class=HTMLResponse)
-async def page_runs(request: Request, db: Session = Depends(get_db)):
+def page_runs(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
     return edit.render_runs(request, db)
 
 
 @router.get("/paths", response_class=HTMLResponse)
-async def page_paths(request: Request, db: Session = Depends(get_db)):
+def page_paths(request: Request, db: Session = Depends(get_db)):
     logger.info(f"{request.method} {request.url}")
     return edit.render_paths(request, db)
 
@@ -45,7 +52,7 @@ async def page_paths(request: Request, db: Session = Depends(get_db)):
 # Below are the create for read actions via forms
 
 
-async def page_assumptions_create(
+def page_assumptions_create(
     request: Request,
     name: str = Form(...),
     kind: str = Form(...),
@@ -66,15 +73,15 @@ async def page_assumptions_create(
         return RedirectResponse(request.url_for("page_assumptions"), status_code=302)
 
 
-async def page_scearios_create(
+def page_scearios_create(
     request: Request,
+    form: FormData = Depends(form_data),
     db: Session = Depends(get_db),
 ):
     logger.info(f"{request.method} {request.url}")
     # unpack to form data
     regular_attrs = {"name": str, "id": int}
     kwargs = dict(assumptions=dict())
-    form = await request.form()
     for attr, value in form.items():
         if attr in regular_attrs:
             factory = regular_attrs[attr]  # Get type/constructor
@@ -95,7 +102,7 @@ async def page_scearios_create(
         return RedirectResponse(request.url_for("page_scenarios"), status_code=302)
 
 
-async def page_runs_create(
+def page_runs_create(
     request: Request,
     scenario: str = Form(...),
     version: str = Form(...),
@@ -134,7 +141,7 @@ async def page_runs_create(
         return RedirectResponse(request.url_for("page_runs"), status_code=302)
 
 
-async def page_paths_create(
+def page_paths_create(
     request: Request,
     name: str = Form(...),
     path: str = Form(...),
@@ -175,7 +182,7 @@ async def page_paths_create(
 # Below are the create for read actions via forms
 
 
-async def page_assumptions_update(
+def page_assumptions_update(
     request: Request,
     id: int = Form(...),
     name: str = Form(...),
@@ -195,15 +202,15 @@ async def page_assumptions_update(
         return RedirectResponse(request.url_for("page_assumptions"), status_code=302)
 
 
-async def page_scenarios_update(
+def page_scenarios_update(
     request: Request,
+    form: FormData = Depends(form_data),
     db: Session = Depends(get_db),
 ):
     logger.info(f"{request.method} {request.url}")
     # unpack to form data
     regular_attrs = {"name": str, "preferred_run": str, "id": int}
     kwargs = dict(assumptions=dict())
-    form = await request.form()
     for attr, value in form.items():
         if attr in regular_attrs:
             factory = regular_attrs[attr]  # Get type/constructor
@@ -221,7 +228,7 @@ async def page_scenarios_update(
         return RedirectResponse(request.url_for("page_scenarios"), status_code=302)
 
 
-async def page_runs_update(
+def page_runs_update(
     request: Request,
     scenario: str = Form(...),
     version: str = Form(...),
@@ -254,7 +261,7 @@ async def page_runs_update(
         return RedirectResponse(request.url_for("page_runs"), status_code=302)
 
 
-async def page_paths_update(
+def page_paths_update(
     request: Request,
     name: str = Form(...),
     path: str = Form(...),
@@ -293,7 +300,7 @@ async def page_paths_update(
 # Below are the create for read actions via forms
 
 
-async def page_assumptions_delete(
+def page_assumptions_delete(
     request: Request,
     id: int = Form(...),
     db: Session = Depends(get_db),
@@ -307,7 +314,7 @@ async def page_assumptions_delete(
     return RedirectResponse(request.url_for("page_assumptions"), status_code=302)
 
 
-async def page_scenarios_delete(
+def page_scenarios_delete(
     request: Request,
     id: int = Form(...),
     db: Session = Depends(get_db),
@@ -321,7 +328,7 @@ async def page_scenarios_delete(
     return RedirectResponse(request.url_for("page_scenarios"), status_code=302)
 
 
-async def page_runs_delete(
+def page_runs_delete(
     request: Request,
     id: int = Form(...),
     db: Session = Depends(get_db),
@@ -335,7 +342,7 @@ async def page_runs_delete(
     return RedirectResponse(request.url_for("page_runs"), status_code=302)
 
 
-async def page_paths_delete(
+def page_paths_delete(
     request: Request,
     id: int = Form(...),
     db: Session = Depends(get_db),
@@ -1,36 +1,46 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
 from ..database import get_db
+from ._http import conditional_json
+from ._paging import AFTER, LIMIT
 
 router = APIRouter(prefix="/paths", tags=["Paths"])
 logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=list[schemas.NamedPath])
-async def get_paths(
+def get_paths(
     name: str = None,
     path: str = None,
     category: str = None,
+    limit: int | None = LIMIT,
+    after: int | None = AFTER,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
-    logger.info(f"getting all runs, filters, {name=}, {path=}, {category=}")
+    logger.info(
+        f"getting all paths, filters, {name=}, {path=}, {category=}, "
+        + f"page {limit=} {after=}"
+    )
     paths = crud.paths.read(
         db=db,
         name=name,
         path=path,
         category=category,
+        limit=limit,
+        after=after,
     )
     logger.info(f"paths: {[(p.name, p.path) for p in paths]}")
 
-    return paths
+    return conditional_json(paths, list[schemas.NamedPath], if_none_match)
 
 
 @router.put("", response_model=schemas.NamedPath)
-async def put_path(
+def put_path(
     _in: schemas.NamedPath,
     db: Session = Depends(get_db),
 ):
@@ -1,36 +1,48 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
 from ..database import get_db
+from ._http import conditional_json
+from ._paging import AFTER, LIMIT
 
 router = APIRouter(prefix="/runs", tags=["Model Runs"])
 logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=list[schemas.Run])
-async def get_runs(
+def get_runs(
     scenario: str = None,
     version: str = None,
     code_version: str = None,
+    contact: str = None,
+    limit: int | None = LIMIT,
+    after: int | None = AFTER,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
-    logger.info(f"getting all runs, filters, {scenario=}, {version=}, {code_version=}")
+    logger.info(
+        f"getting all runs, filters, {scenario=}, {version=}, {code_version=}, "
+        + f"{contact=}, page {limit=} {after=}"
+    )
     runs = crud.runs.read(
         db=db,
         scenario=scenario,
         version=version,
         code_version=code_version,
+        contact=contact,
+        limit=limit,
+        after=after,
     )
     logger.info(f"runs: {[(r.scenario, r.version) for r in runs]}")
 
-    return runs
+    return conditional_json(runs, list[schemas.Run], if_none_match)
 
 
 @router.put("", response_model=schemas.Run)
-async def put_run(
+def put_run(
     _in: schemas.Run,
     db: Session = Depends(get_db),
 ):
@@ -45,7 +57,7 @@ async def put_run(
 
 
 @router.put("/legacy", response_model=schemas.Run)
-async def put_legacy_run(
+def put_legacy_run(
     _in: schemas.Run,
     db: Session = Depends(get_db),
 ):
@@ -1,31 +1,36 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
 from ..database import get_db
+from ._http import conditional_json
+from ._paging import AFTER, LIMIT
 
 router = APIRouter(prefix="/scenarios", tags=["Scenarios"])
 logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=list[schemas.Scenario])
-async def get_scenario(
+def get_scenario(
     name: str = None,
     id: int = None,
+    limit: int | None = LIMIT,
+    after: int | None = AFTER,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
-    logger.info(f"getting scenarios, filtered where {name=}, {id=}")
-    scenarios = crud.scenarios.read(db, name=name, id=id)
+    logger.info(f"getting scenarios, filtered where {name=}, {id=}, {limit=}, {after=}")
+    scenarios = crud.scenarios.read(db, name=name, id=id, limit=limit, after=after)
     logger.debug(f"{len(scenarios)} scenarios found")
     for s in scenarios:
         logger.debug(f"{s.name=}")
-    return scenarios
+    return conditional_json(scenarios, list[schemas.Scenario], if_none_match)
 
 
 @router.put("", response_model=schemas.Scenario)
-async def put_scenario(
+def put_scenario(
     _in: schemas.Scenario,
     db: Session = Depends(get_db),
 ):
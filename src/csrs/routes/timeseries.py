@@ -1,26 +1,44 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas
+from .. import crud, formats, schemas
 from ..database import get_db
 from ..errors import EmptyLookupError, UniqueLookupError
+from . import _http
 
 router = APIRouter(prefix="/timeseries", tags=["Timeseries"])
 logger = logging.getLogger(__name__)
+# Timeseries can be returned as Arrow when requested with the Accept header
+ARROW_RESPONSE = {200: {"content": {formats.ARROW_MEDIA_TYPE: {}}}}
 
 
-@router.get("", response_model=schemas.Timeseries)
-async def get_timeseries(
+@router.get("", response_model=schemas.Timeseries, responses=ARROW_RESPONSE)
+def get_timeseries(
+    response: Response,
     scenario: str = None,
     version: str = None,
     path: str = None,
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
     logger.info(f"getting all timeseries, filters {scenario=}, {version=}, {path=}")
+    arrow = formats.accepts_arrow(accept)
     try:
-        ts = crud.timeseries.read(
+        key = crud.timeseries.read_version_key(
+            db=db,
+            scenario=scenario,
+            version=version,
+            path=path,
+        )
+        etag = _http.make_etag("timeseries", key, arrow)
+        cached = _http.not_modified(if_none_match, etag)
+        if cached is not None:
+            return cached
+        ts = crud.timeseries.read_arrays(
             db=db,
             scenario=scenario,
             version=version,
@@ -32,30 +50,113 @@ async def get_timeseries(
             detail=f"couldn't find unique {path=} in database",
         )
     logger.info(f"timeseries: {ts.scenario}, {ts.version}, {ts.path}")
-    return ts
+    if arrow:
+        batch = formats.long_batch(ts)
+        return Response(
+            b"".join(formats.iter_ipc_stream(batch.schema, [batch])),
+            media_type=formats.ARROW_MEDIA_TYPE,
+            headers=_http.cache_headers(etag),
+        )
+    response.headers.update(_http.cache_headers(etag))
+    return ts.to_timeseries()
 
 
-@router.get("/all", response_model=list[schemas.Timeseries])
-async def get_all_timeseries_for_run(
+@router.get(
+    "/all",
+    response_model=list[schemas.Timeseries],
+    responses=ARROW_RESPONSE,
+)
+def get_all_timeseries_for_run(
+    response: Response,
     scenario: str = None,
     version: str = None,
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
     logger.info(f"getting all timeseries for run, filters {scenario=}, {version=}")
+    arrow = formats.accepts_arrow(accept)
+    headers = dict()
     try:
-        tss = crud.timeseries.read_all_for_run(
+        key = crud.timeseries.read_version_key(
+            db=db, scenario=scenario, version=version
+        )
+        etag = _http.make_etag("timeseries/all", key, arrow)
+        cached = _http.not_modified(if_none_match, etag)
+        if cached is not None:
+            return cached
+        headers = _http.cache_headers(etag)
+        series = crud.timeseries.read_arrays_for_run(
             db=db,
             scenario=scenario,
             version=version,
         )
     except EmptyLookupError:
-        tss = []
+        series = iter(())
+    if arrow:
+        batches = (formats.long_batch(ts) for ts in series)
+        return StreamingResponse(
+            formats.iter_ipc_stream(formats.long_schema(), batches),
+            media_type=formats.ARROW_MEDIA_TYPE,
+            headers=headers,
+        )
+    tss = list(crud.timeseries.arrays_to_timeseries(series))
     logger.info(f"{len(tss)} timeseries found")
+    response.headers.update(headers)
     return tss
 
 
+@router.get(
+    "/batch",
+    response_model=list[schemas.Timeseries],
+    responses=ARROW_RESPONSE,
+)
+def get_timeseries_batch(
+    scenario: list[str] = Query(),
+    path: list[str] = Query(),
+    version: list[str] | None = Query(default=None),
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    logger.info(
+        f"getting timeseries in batch, filters {scenario=}, {version=}, {path=}"
+    )
+    try:
+        series = crud.timeseries.read_many_arrays(
+            db=db,
+            scenarios=scenario,
+            paths=path,
+            versions=version,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if formats.accepts_arrow(accept):
+        batches = [formats.long_batch(ts) for ts in series]
+        body = b"".join(formats.iter_ipc_stream(formats.long_schema(), batches))
+        etag = _http.make_etag(body)
+        cached = _http.not_modified(if_none_match, etag)
+        if cached is not None:
+            return cached
+        return Response(
+            body,
+            media_type=formats.ARROW_MEDIA_TYPE,
+            headers=_http.cache_headers(etag),
+        )
+    return _http.conditional_json(
+        list(crud.timeseries.arrays_to_timeseries(series)),
+        list[schemas.Timeseries],
+        if_none_match,
+    )
+
+
+@router.get("/cache", response_model=dict[str, int], include_in_schema=False)
+def get_cache_stats():
+    return crud.timeseries.series_cache.stats()
+
+
 @router.put("", response_model=schemas.Timeseries)
-async def put_timeseries(
+def put_timeseries(
     _in: schemas.Timeseries,
     db: Session = Depends(get_db),
 ):
@@ -66,3 +167,28 @@ async def put_timeseries(
     )
     logger.debug(f"new timeseries {_out.scenario}, {_out.version}, {_out.path}")
     return _out
+
+
+@router.patch("", response_model=schemas.TimeseriesUpdate)
+def patch_timeseries(
+    _in: schemas.Timeseries,
+    db: Session = Depends(get_db),
+):
+    logger.info(_in)
+    _out = crud.timeseries.update(
+        db=db,
+        **_in.model_dump(exclude=("id")),
+    )
+    logger.debug(f"updated timeseries {_out}, {_out.inserted=}, {_out.updated=}")
+    return _out
+
+
+@router.put("/many", response_model=schemas.TimeseriesBatch)
+def put_many_timeseries(
+    _in: list[schemas.Timeseries],
+    db: Session = Depends(get_db),
+):
+    logger.info(f"adding {len(_in)} timeseries")
+    _out = crud.timeseries.create_many(db=db, timeseries=_in)
+    logger.debug(f"{len(_out.added)} timeseries added, {len(_out.failed)} failed")
+    return _out
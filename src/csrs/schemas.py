@@ -1,9 +1,10 @@
 """Pydantic Models for the CalSim Scenario Server"""
 
-from typing import TYPE_CHECKING, Self
+from typing import TYPE_CHECKING, Iterable, Self
 
-from pandas import DataFrame, MultiIndex
-from pydantic import BaseModel, Field
+import numpy as np
+from pandas import DataFrame, MultiIndex, concat
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 if TYPE_CHECKING:
     # Optional dependency
@@ -106,13 +107,118 @@ class Timeseries(CSRS_Model):
         return cls(scenario=scenario, version=version, **kwargs)
 
     def to_frame(self) -> DataFrame:
-        df = self.to_pandss().to_frame()
-        columns: MultiIndex = df.columns
-        df.columns = MultiIndex.from_product(
-            columns.levels + [[self.scenario], [self.version]],
-            names=tuple(tuple(columns.names) + (("SCENARIO"), ("VERSION"))),
+        return _add_run_levels(self.to_pandss().to_frame(), self.scenario, self.version)
+
+
+class ArrayTimeseries(CSRS_Model):
+    """The timeseries data belonging to one model Run, backed by numpy arrays.
+
+    A compact alternative to `Timeseries` for analysis. The `values` are float64, and
+    the `dates` are `datetime64[us]`. Convert to and from `Timeseries` losslessly with
+    `to_timeseries` and `from_timeseries`.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    scenario: str
+    version: str
+    # shadow pandss RegularTimeseries attributes
+    path: str
+    values: np.ndarray = Field(repr=False)
+    dates: np.ndarray = Field(repr=False)
+    period_type: str = Field(repr=False)
+    units: str = Field(repr=False)
+    interval: str = Field(repr=False)
+
+    @field_validator("values", mode="before")
+    @classmethod
+    def values_as_float64(cls, values) -> np.ndarray:
+        return np.asarray(values, dtype="float64")
+
+    @field_validator("dates", mode="before")
+    @classmethod
+    def dates_as_datetime64(cls, dates) -> np.ndarray:
+        return np.asarray(dates, dtype="datetime64[us]")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def to_timeseries(self) -> Timeseries:
+        from .crud.timeseries import datetime64_to_dates
+
+        return Timeseries(
+            scenario=self.scenario,
+            version=self.version,
+            path=self.path,
+            values=tuple(self.values.tolist()),
+            dates=datetime64_to_dates(self.dates),
+            period_type=self.period_type,
+            units=self.units,
+            interval=self.interval,
         )
-        return df
+
+    @classmethod
+    def from_timeseries(cls, ts: Timeseries) -> Self:
+        return cls(**ts.model_dump())
+
+    def to_pandss(self) -> "pdss.RegularTimeseries":
+        import pandss as pdss
+
+        return pdss.RegularTimeseries(
+            path=self.path,
+            values=self.values,
+            dates=self.dates,
+            period_type=self.period_type,
+            units=self.units,
+            interval=self.interval,
+        )
+
+    def to_frame(self) -> DataFrame:
+        return _add_run_levels(self.to_pandss().to_frame(), self.scenario, self.version)
+
+
+def concat_frames(series: Iterable[Timeseries | ArrayTimeseries]) -> DataFrame:
+    """Join many timeseries into one wide frame, with a column for each series."""
+    frames = [ts.to_frame() for ts in series]
+    if not frames:
+        return DataFrame()
+    return concat(frames, axis=1)
+
+
+def _add_run_levels(df: DataFrame, scenario: str, version: str) -> DataFrame:
+    columns: MultiIndex = df.columns
+    df.columns = MultiIndex.from_product(
+        columns.levels + [[scenario], [version]],
+        names=tuple(tuple(columns.names) + (("SCENARIO"), ("VERSION"))),
+    )
+    return df
+
+
+class TimeseriesFailure(CSRS_Model):
+    """A Timeseries that couldn't be added to the database, and why."""
+
+    scenario: str
+    version: str
+    path: str
+    error: str = Field(repr=False)
+
+
+class TimeseriesBatch(CSRS_Model):
+    """The result of adding many Timeseries at once."""
+
+    added: list[Timeseries] = Field(default_factory=list, repr=False)
+    failed: list[TimeseriesFailure] = Field(default_factory=list, repr=False)
+
+
+class TimeseriesUpdate(CSRS_Model):
+    """The result of updating a Timeseries, the number of values that were written."""
+
+    scenario: str
+    version: str
+    path: str
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
 
 
 class NamedPath(CSRS_Model):
@@ -1,11 +1,14 @@
+import asyncio
 import logging
 from pathlib import Path
 from shutil import copy2
-from typing import Generator
+from typing import Callable, Generator
+from uuid import uuid4
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -61,15 +64,19 @@ def dss(assets_dir: Path) -> Generator[Path, None, None]:
 def database_file(assets_dir: Path) -> Generator[Path, None, None]:
     starting = assets_dir / "_testing.db"
     active = starting.with_name("testing_used.db")
-    if active.exists():
-        active.unlink()
+    # WAL journal files left behind would be applied to the new copy
+    used = [active.with_name(active.name + suffix) for suffix in ("-wal", "-shm")]
+    used.append(active)
+    for f in used:
+        f.unlink(missing_ok=True)
     if starting.exists():  # active will be made automatically if not there
         copy2(starting, active)
     yield active
-    try:
-        active.unlink()
-    except PermissionError:
-        logging.warning(f"couldn't remove testing asset {active}")
+    for f in used:
+        try:
+            f.unlink(missing_ok=True)
+        except PermissionError:
+            logging.warning(f"couldn't remove testing asset {f}")
 
 
 @pytest.fixture(scope="session")
@@ -99,6 +106,38 @@ def client_local(database_file: Path):
     client.close()
 
 
+class StatementCounter:
+    """Records the SQL statements sent by an engine."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: list[str] = list()
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self) -> "StatementCounter":
+        event.listen(self.engine, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def count_statements(database: Session) -> Callable[[], StatementCounter]:
+    """Count the statements of the block, with nothing loaded in the session yet."""
+
+    def counter() -> StatementCounter:
+        database.expire_all()
+        return StatementCounter(database.get_bind())
+
+    return counter
+
+
 @pytest.fixture(scope="session", autouse=False)
 def client_remote(database_url: str):
     # Keep the import here so the app isn't initialized unless this test runs
@@ -132,6 +171,17 @@ def client_remote(database_url: str):
     client.actor.close()
 
 
+@pytest.fixture
+def client_async(client_remote: clients.RemoteClient):
+    # client_remote sets up the app and its testing database
+    from csrs.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    client = clients.AsyncRemoteClient(base_url="http://localhost", transport=transport)
+    yield client
+    asyncio.run(client.aclose())
+
+
 @pytest.fixture(scope="module")
 def kwargs_assumption():
     return dict(
@@ -186,7 +236,7 @@ def kwargs_path():
 
 @pytest.fixture(scope="function")
 def kwargs_all_unique():
-    uuid = id(object())
+    uuid = uuid4().hex
     return dict(
         assumption=dict(
             name=f"testing-assumption-new-{uuid}",
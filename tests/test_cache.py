@@ -0,0 +1,162 @@
+import numpy as np
+import pytest
+
+from csrs import crud
+from csrs.crud._cache import SeriesCache
+
+
+def arrays(n: int) -> tuple[np.ndarray, np.ndarray]:
+    return np.arange(n, dtype=float), np.ones(n, dtype=float)
+
+
+def test_series_cache_evicts_by_bytes():
+    cache = SeriesCache(max_bytes=3 * 2 * 8 * 10)  # three series of 10 values
+    for path_id in range(3):
+        cache.put(("db", 1, 0, path_id), *arrays(10))
+    assert cache.get(("db", 1, 0, 0)) is not None  # 0 is now the most recent
+    cache.put(("db", 1, 0, 3), *arrays(10))
+    assert ("db", 1, 0, 1) not in cache
+    assert ("db", 1, 0, 0) in cache
+    cache.put(("db", 1, 0, 4), *arrays(1_000))  # larger than the cache, not kept
+    assert ("db", 1, 0, 4) not in cache
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= stats["max_bytes"]
+
+
+def test_series_cache_invalidate():
+    cache = SeriesCache()
+    for run_id in (1, 2):
+        for path_id in range(3):
+            cache.put(("db", run_id, 0, path_id), *arrays(10))
+    cache.put(("db", 1, 1, 2), *arrays(10))  # a later revision of the run
+    cache.put(("other-db", 1, 0, 0), *arrays(10))
+    assert cache.invalidate("db", 1, 0) == 1
+    assert cache.invalidate("db", 1) == 3
+    assert len(cache) == 4
+    assert cache.get(("db", 1, 0, 1)) is None
+    datetimes, values = cache.get(("db", 2, 0, 1))
+    assert not values.flags.writeable
+
+
+def test_read_published_run_from_cache(database, kwargs_all_unique):
+    run = crud.runs.create(
+        db=database,
+        **kwargs_all_unique["run"] | dict(published=True),
+    )
+    crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    labels = dict(
+        scenario=run.scenario,
+        version=run.version,
+        path=kwargs_all_unique["timeseries"]["path"],
+    )
+    cache = crud.timeseries.series_cache
+    before = cache.stats()
+    first = crud.timeseries.read(db=database, **labels)
+    second = crud.timeseries.read(db=database, **labels)
+    after = cache.stats()
+    assert first.values == second.values
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+    # reading the whole run is served from the cache too
+    (ts,) = crud.timeseries.read_all_for_run(
+        db=database,
+        scenario=run.scenario,
+        version=run.version,
+    )
+    assert ts.values == first.values
+    assert cache.stats()["hits"] == after["hits"] + 1
+    # deleting the series removes it from the cache
+    crud.timeseries.delete(db=database, **labels)
+    assert cache.invalidate(str(database.get_bind().url), run.id) == 0
+
+
+def test_cache_misses_after_revision_bump(database, kwargs_all_unique):
+    run = crud.runs.create(
+        db=database,
+        **kwargs_all_unique["run"] | dict(published=True),
+    )
+    crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    labels = dict(
+        scenario=run.scenario,
+        version=run.version,
+        path=kwargs_all_unique["timeseries"]["path"],
+    )
+    cache = crud.timeseries.series_cache
+    crud.timeseries.read(db=database, **labels)
+    # another process rewrites the run: the revision moves on, but nothing in this
+    # process is invalidated
+    crud.timeseries.bump_revisions(database, [run.id])
+    database.commit()
+    before = cache.stats()
+    crud.timeseries.read(db=database, **labels)
+    after = cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"]
+
+
+def test_delete_invalidates_after_commit(database, kwargs_all_unique, monkeypatch):
+    run = crud.runs.create(
+        db=database,
+        **kwargs_all_unique["run"] | dict(published=True),
+    )
+    crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    labels = dict(
+        scenario=run.scenario,
+        version=run.version,
+        path=kwargs_all_unique["timeseries"]["path"],
+    )
+    crud.timeseries.read(db=database, **labels)
+    database_key = str(database.get_bind().url)
+    cache = crud.timeseries.series_cache
+
+    def failed_commit():
+        raise RuntimeError("the commit failed")
+
+    # the delete is rolled back, so the cached series is still the stored one
+    with monkeypatch.context() as patch:
+        patch.setattr(database, "commit", failed_commit)
+        with pytest.raises(RuntimeError):
+            crud.timeseries.delete(db=database, **labels)
+    assert any(key[:2] == (database_key, run.id) for key in cache.entries)
+    crud.timeseries.delete(db=database, **labels)
+    assert not any(key[:2] == (database_key, run.id) for key in cache.entries)
+
+
+def test_mixed_storage_run_order_is_the_same_cold_and_warm(
+    database,
+    kwargs_all_unique,
+):
+    run = crud.runs.create(
+        db=database,
+        **kwargs_all_unique["run"] | dict(published=True),
+    )
+    kwargs_path = kwargs_all_unique["path"]
+    first, second = (
+        crud.paths.create(
+            db=database,
+            **kwargs_path
+            | dict(
+                name=f"{kwargs_path['name']}-{i}",
+                path=kwargs_path["path"].replace("/TESTING/", f"/TESTING_{i}/"),
+            ),
+        )
+        for i in range(2)
+    )
+    # the later path is packed into a blob, the earlier one stays in the ledger
+    for path in (second, first):
+        crud.timeseries.create(
+            db=database,
+            **kwargs_all_unique["timeseries"] | dict(path=path.path),
+        )
+        if path == second:
+            crud.timeseries.repack(database, run_id=run.id)
+    labels = dict(scenario=run.scenario, version=run.version)
+    before = crud.timeseries.series_cache.stats()
+    cold = [ts.path for ts in crud.timeseries.read_all_for_run(db=database, **labels)]
+    warm = [ts.path for ts in crud.timeseries.read_all_for_run(db=database, **labels)]
+    after = crud.timeseries.series_cache.stats()
+    assert after["hits"] == before["hits"] + 2  # the second read was warm
+    assert cold == warm == [first.path, second.path]
@@ -48,3 +48,22 @@ def test_remote_vs_local_api():
             left_sig = inspect.signature(left_method)
             right_sig = inspect.signature(right_method)
             assert left_sig == right_sig
+
+
+def test_async_remote_api():
+    for name, method in inspect.getmembers(clients.Client, inspect.isfunction):
+        if name.startswith("__"):
+            continue
+        async_method = getattr(clients.AsyncRemoteClient, name)
+        if inspect.isgeneratorfunction(method):
+            assert inspect.isasyncgenfunction(async_method), f"{name} isn't async"
+        else:
+            assert inspect.iscoroutinefunction(async_method), f"{name} isn't async"
+        remote_method = getattr(clients.RemoteClient, name)
+        async_sig = inspect.signature(async_method)
+        remote_sig = inspect.signature(remote_method)
+        if inspect.isgeneratorfunction(method):  # Iterator becomes AsyncIterator
+            async_sig = async_sig.replace(
+                return_annotation=remote_sig.return_annotation
+            )
+        assert async_sig == remote_sig
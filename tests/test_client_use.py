@@ -1,13 +1,31 @@
+import asyncio
+import io
+import json
 import logging
+import os
+import threading
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+import httpx
+import pandas as pd
 import pandss as pdss
+import pytest
 
 from csrs import clients, schemas
 from csrs.clients import Client
 
 logger = logging.getLogger(__name__)
+TIMESERIES = dict(
+    scenario="testing-scenario",
+    version="1.0",
+    path="/CSRS/TESTING/TESTING/.*/1MON/2024/",
+    values=(0.0, 1.0),
+    dates=("2024-01-31", "2024-02-29"),
+    period_type="PER-AVER",
+    units="NONE",
+    interval="1MON",
+)
 
 
 def do_assumptions(
@@ -303,3 +321,614 @@ def test_to_and_from_json(client_local: clients.LocalClient, assets_dir: Path):
                 )
             )
         new_local.close()
+
+
+def test_remote_download_run_csv(client_remote: clients.RemoteClient):
+    scenario, version = "testing-scenario-existing", "0.0"
+    response = client_remote.actor.get(
+        "/download/run",
+        params=dict(scenario=scenario, version=version, file_type="csv"),
+    )
+    assert response.status_code == 200
+    timeseries = client_remote.get_all_timeseries_for_run(
+        scenario=scenario,
+        version=version,
+    )
+    frames = [ts.to_frame() for ts in timeseries]
+    df = pd.concat(frames, axis=1)
+    assert response.text == df.to_csv()
+
+
+def test_remote_download_empty_run_csv(client_remote: clients.RemoteClient):
+    response = client_remote.actor.get(
+        "/download/run",
+        params=dict(scenario="testing-scenario-existing", version="not-a-version"),
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[-1] == "DATETIME,"
+
+
+def test_remote_read_all_timeseries_arrow(client_remote: clients.RemoteClient):
+    pytest.importorskip("pyarrow")
+    kwargs = dict(scenario="testing-scenario-existing", version="0.0")
+    from_json = client_remote.get_all_timeseries_for_run(**kwargs)
+    from_arrow = client_remote.get_all_timeseries_for_run(**kwargs, format="arrow")
+    assert len(from_json) == len(from_arrow)
+    by_path = {ts.path: ts for ts in from_arrow}
+    for ts in from_json:
+        assert by_path[ts.path].model_dump() == ts.model_dump()
+
+
+def test_remote_timeseries_arrow(client_remote: clients.RemoteClient):
+    pytest.importorskip("pyarrow")
+    kwargs = dict(
+        scenario="testing-scenario-existing",
+        version="0.0",
+        path="/CSRS/TESTING_EXISTING_DB/TESTING/.*/1MON/2024/",
+    )
+    from_json = client_remote.get_timeseries(**kwargs)
+    from_arrow = client_remote.get_timeseries(**kwargs, format="arrow")
+    assert from_arrow.model_dump() == from_json.model_dump()
+
+
+def do_array_timeseries(client: Client):
+    kwargs = dict(scenario="testing-scenario-existing", version="0.0")
+    path = "/CSRS/TESTING_EXISTING_DB/TESTING/.*/1MON/2024/"
+    arrays = client.get_array_timeseries(**kwargs, path=path)
+    assert isinstance(arrays, schemas.ArrayTimeseries)
+    ts = client.get_timeseries(**kwargs, path=path)
+    assert arrays.to_timeseries().model_dump() == ts.model_dump()
+    all_arrays = client.get_all_array_timeseries_for_run(**kwargs)
+    assert len(all_arrays) == len(client.get_all_timeseries_for_run(**kwargs))
+
+
+def test_local_array_timeseries(client_local: clients.LocalClient):
+    do_array_timeseries(client_local)
+
+
+def test_remote_array_timeseries(client_remote: clients.RemoteClient):
+    do_array_timeseries(client_remote)
+
+
+def do_timeseries_many(client: Client):
+    path = "/CSRS/TESTING_EXISTING_DB/TESTING/.*/1MON/2024/"
+    series = client.get_timeseries_many(
+        scenarios=["testing-scenario-existing", "testing-scenario-missing"],
+        versions=["0.0", None],
+        paths=[path, "/CSRS/INVALID/LOOKUP/.*/.*/.*/"],
+    )
+    assert len(series) == 1
+    assert isinstance(series[0], schemas.ArrayTimeseries)
+    assert series[0].path == path
+    df = client.get_timeseries_many(
+        scenarios=["testing-scenario-existing"],
+        versions=["0.0"],
+        paths=[path],
+        as_frame=True,
+    )
+    assert isinstance(df, pd.DataFrame)
+    assert len(df.columns) == 1
+
+
+def test_local_timeseries_many(client_local: clients.LocalClient):
+    do_timeseries_many(client_local)
+
+
+def test_remote_timeseries_many(client_remote: clients.RemoteClient):
+    do_timeseries_many(client_remote)
+
+
+def test_remote_download_run_parquet(client_remote: clients.RemoteClient):
+    pq = pytest.importorskip("pyarrow.parquet")
+    for layout in ("long", "wide"):
+        response = client_remote.actor.get(
+            "/download/run",
+            params=dict(
+                scenario="testing-scenario-existing",
+                version="0.0",
+                file_type="parquet",
+                layout=layout,
+            ),
+        )
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.num_rows > 0
+        assert "datetime" in table.column_names
+
+
+def test_remote_download_run_unknown_layout(client_remote: clients.RemoteClient):
+    for file_type in ("csv", "parquet"):
+        response = client_remote.actor.get(
+            "/download/run",
+            params=dict(
+                scenario="testing-scenario-existing",
+                version="0.0",
+                file_type=file_type,
+                layout="tall",
+            ),
+        )
+        assert response.status_code == 422
+
+
+def test_remote_conditional_get(client_remote: clients.RemoteClient):
+    for url, params in (
+        ("/runs", dict()),
+        ("/timeseries/all", dict(scenario="testing-scenario-existing", version="0.0")),
+        (
+            "/download/run",
+            dict(scenario="testing-scenario-existing", version="0.0", file_type="csv"),
+        ),
+    ):
+        response = client_remote.actor.get(url, params=params)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert "cache-control" in response.headers
+        response = client_remote.actor.get(
+            url,
+            params=params,
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+
+def test_remote_etag_changes_on_write(
+    client_remote: clients.RemoteClient,
+    kwargs_all_unique: dict,
+):
+    run = client_remote.put_run(**kwargs_all_unique["run"])
+    params = dict(scenario=run.scenario, version=run.version)
+    before = client_remote.actor.get("/timeseries/all", params=params)
+    client_remote.put_timeseries(**kwargs_all_unique["timeseries"])
+    after = client_remote.actor.get("/timeseries/all", params=params)
+    assert before.headers["etag"] != after.headers["etag"]
+    assert len(after.json()) == len(before.json()) + 1
+
+
+def test_remote_response_cache(client_remote: clients.RemoteClient):
+    cache = clients.ResponseCache()
+    client = clients.RemoteClient(base_url="http://localhost", response_cache=cache)
+    client.actor = client_remote.actor
+    first = client.get_all_timeseries_for_run(
+        scenario="testing-scenario-existing",
+        version="0.0",
+    )
+    assert len(cache) == 1
+    (cached,) = cache.entries.values()
+    second = client.get_all_timeseries_for_run(
+        scenario="testing-scenario-existing",
+        version="0.0",
+    )
+    assert second == first
+    assert cache.entries[next(iter(cache.entries))] is cached
+
+
+def test_remote_disk_response_cache(
+    client_remote: clients.RemoteClient,
+    tmp_path: Path,
+):
+    kwargs = dict(scenario="testing-scenario-existing", version="0.0")
+    cache = clients.DiskResponseCache(tmp_path / "responses.db")
+    client = clients.RemoteClient(base_url="http://localhost", response_cache=cache)
+    client.actor = client_remote.actor
+    first = client.get_all_timeseries_for_run(**kwargs)
+    assert len(cache) == 1
+    cache.close()
+    # a new cache on the same file, like in the next process
+    cache = clients.DiskResponseCache(tmp_path / "responses.db")
+    client = clients.RemoteClient(base_url="http://localhost", response_cache=cache)
+    client.actor = client_remote.actor
+    sent = list()
+    client.actor.event_hooks["response"].append(lambda r: sent.append(r.status_code))
+    try:
+        second = client.get_all_timeseries_for_run(**kwargs)
+    finally:
+        client.actor.event_hooks["response"].pop()
+    assert second == first
+    assert sent == [304]
+    cache.close()
+
+
+def test_async_send_uses_cache_off_the_event_loop(tmp_path: Path):
+    class ThreadRecordingCache(clients.ResponseCache):
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+        def put(self, key, response):
+            self.threads.add(threading.get_ident())
+            return super().put(key, response)
+
+    cache = ThreadRecordingCache()
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json=[], headers={"etag": '"0"'})
+    )
+
+    async def get() -> int:
+        async with httpx.AsyncClient(
+            base_url="http://localhost", transport=transport
+        ) as actor:
+            request = actor.build_request("GET", "/paths")
+            await clients._cache.asend(actor, cache, request)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(get())
+    assert len(cache) == 1
+    assert cache.threads and (loop_thread not in cache.threads)
+
+
+@pytest.mark.parametrize("kind", ("memory", "disk"))
+def test_response_cache_compresses_json(tmp_path: Path, kind: str):
+    body = json.dumps([dict(date="2024-01-31", value=1.5)] * 1_000).encode()
+    response = clients._cache.CachedResponse(
+        status_code=200,
+        headers=(("etag", '"0"'), ("content-type", "application/json")),
+        content=body,
+    )
+    if kind == "memory":
+        cache = clients.ResponseCache()
+    else:
+        cache = clients.DiskResponseCache(tmp_path / "responses.db")
+    cache.put("a", response)
+    assert cache.n_bytes < len(body) / 10
+    assert cache.get("a") == response
+    if kind == "disk":
+        cache.close()
+
+
+def test_disk_response_cache_evicts_least_recently_used(tmp_path: Path):
+    def response(n: int) -> clients._cache.CachedResponse:
+        return clients._cache.CachedResponse(
+            status_code=200,
+            headers=(("etag", f'"{n}"'),),
+            content=os.urandom(1_200),  # random bytes don't compress
+        )
+
+    cache = clients.DiskResponseCache(tmp_path / "responses.db", max_bytes=2_000)
+    cache.put("a", response(0))
+    cache.put("b", response(1))
+    assert len(cache) == 1  # "a" was evicted to make room
+    assert cache.get("a") is None
+    assert cache.get("b").validators == {"If-None-Match": '"1"'}
+    assert cache.n_bytes <= 2_000
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_remote_put_timeseries_batch_concurrently(
+    client_remote: clients.RemoteClient,
+    kwargs_all_unique: dict[str, dict[str, str]],
+):
+    client_remote.put_run(**kwargs_all_unique["run"])
+    kwargs_path = kwargs_all_unique["path"]
+    kwargs_ts = kwargs_all_unique["timeseries"]
+    timeseries = list()
+    for i in range(6):
+        path = client_remote.put_path(
+            **kwargs_path
+            | dict(
+                name=f"{kwargs_path['name']}-{i}",
+                path=kwargs_path["path"].replace("/TESTING/", f"/TESTING_{i}/"),
+            )
+        )
+        timeseries.append(schemas.Timeseries(**kwargs_ts | dict(path=path.path)))
+    unknown = kwargs_path["path"].replace("/TESTING/", "/UNKNOWN/")
+    timeseries.append(schemas.Timeseries(**kwargs_ts | dict(path=unknown)))
+    batch_size, max_concurrency = (
+        client_remote.batch_size,
+        client_remote.max_concurrency,
+    )
+    client_remote.batch_size, client_remote.max_concurrency = 2, 4
+    try:
+        batch = client_remote.put_timeseries_batch(timeseries)
+    finally:
+        client_remote.batch_size = batch_size
+        client_remote.max_concurrency = max_concurrency
+    assert len(batch.added) == 6
+    (failure,) = batch.failed
+    assert failure.path == unknown
+
+
+def test_remote_put_retries_transient_errors():
+    statuses = [503, 429]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if statuses:
+            return httpx.Response(statuses.pop(0))
+        return httpx.Response(200, json=dict(added=[], failed=[]))
+
+    client = clients.RemoteClient(
+        base_url="http://localhost",
+        transport=httpx.MockTransport(handler),
+        backoff=0,
+    )
+    batch = client.put_timeseries_batch([schemas.Timeseries(**TIMESERIES)])
+    assert not statuses
+    assert batch.failed == []
+
+
+def test_remote_put_does_not_retry_after_handling():
+    requests = list()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(502)
+        raise httpx.ReadTimeout("the response was lost", request=request)
+
+    client = clients.RemoteClient(
+        base_url="http://localhost",
+        batch_size=1,
+        max_concurrency=1,
+        transport=httpx.MockTransport(handler),
+        backoff=0,
+    )
+    timeseries = [
+        schemas.Timeseries(**TIMESERIES | dict(version=str(v))) for v in (1, 2)
+    ]
+    batch = client.put_timeseries_batch(timeseries)
+    # the server may have added the data, so neither request is sent again
+    assert len(requests) == 2
+    assert len(batch.failed) == 2
+
+
+def test_remote_put_reports_failed_uploads():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("the server is down", request=request)
+
+    client = clients.RemoteClient(
+        base_url="http://localhost",
+        batch_size=1,
+        transport=httpx.MockTransport(handler),
+        retries=2,
+        backoff=0,
+    )
+    timeseries = [
+        schemas.Timeseries(**TIMESERIES | dict(version=str(v))) for v in (1, 2)
+    ]
+    batch = client.put_timeseries_batch(timeseries)
+    assert batch.added == []
+    assert sorted(f.version for f in batch.failed) == ["1", "2"]
+    assert all("ConnectError" in f.error for f in batch.failed)
+
+
+def test_async_remote_matches_remote(
+    client_remote: clients.RemoteClient,
+    client_async: clients.AsyncRemoteClient,
+):
+    kwargs = dict(scenario="testing-scenario-existing", version="0.0")
+
+    async def read():
+        return await asyncio.gather(
+            client_async.get_run(**kwargs),
+            client_async.get_all_timeseries_for_run(**kwargs),
+            client_async.get_path(),
+        )
+
+    runs, tss, paths = asyncio.run(read())
+    assert runs == client_remote.get_run(**kwargs)
+    assert tss == client_remote.get_all_timeseries_for_run(**kwargs)
+    assert paths == client_remote.get_path()
+
+
+def test_async_remote_gather(
+    client_remote: clients.RemoteClient,
+    client_async: clients.AsyncRemoteClient,
+):
+    runs = [(r.scenario, r.version) for r in client_remote.get_run()]
+    keys = [
+        (ts.scenario, ts.version, ts.path)
+        for scenario, version in runs
+        for ts in client_remote.get_all_timeseries_for_run(
+            scenario=scenario,
+            version=version,
+        )
+    ]
+    assert keys, "the testing database should have timeseries"
+
+    async def gather():
+        return await asyncio.gather(
+            client_async.gather_runs(runs),
+            client_async.gather_timeseries(keys),
+        )
+
+    by_run, tss = asyncio.run(gather())
+    assert len(by_run) == len(runs)
+    assert sum(len(series) for series in by_run) == len(keys)
+    assert [(ts.scenario, ts.version, ts.path) for ts in tss] == keys
+
+
+def test_async_remote_put_retries_transient_errors():
+    statuses = [503]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if statuses:
+            return httpx.Response(statuses.pop(0))
+        return httpx.Response(200, json=dict(added=[], failed=[]))
+
+    async def put():
+        async with clients.AsyncRemoteClient(
+            base_url="http://localhost",
+            transport=httpx.MockTransport(handler),
+            backoff=0,
+        ) as client:
+            return await client.put_timeseries_batch([schemas.Timeseries(**TIMESERIES)])
+
+    batch = asyncio.run(put())
+    assert not statuses
+    assert batch.failed == []
+
+
+def do_pages(client: Client, kwargs_path: dict[str, str]):
+    for i in range(5):
+        client.put_path(
+            **kwargs_path
+            | dict(
+                name=f"{kwargs_path['name']}-{i}",
+                path=kwargs_path["path"].replace("/TESTING/", f"/TESTING_{i}/"),
+            )
+        )
+    paths = client.get_path()
+    first = client.get_path(limit=3)
+    assert first == paths[:3]
+    assert client.get_path(limit=3, after=first[-1].id) == paths[3:6]
+    assert client.get_path(after=paths[-1].id) == []
+    assert list(client.iter_paths(page_size=3)) == paths
+    category = paths[0].category
+    in_category = [p for p in paths if p.category == category]
+    assert list(client.iter_paths(category=category, page_size=2)) == in_category
+    assert list(client.iter_runs(page_size=1)) == client.get_run()
+    assert list(client.iter_scenarios(page_size=1)) == client.get_scenario()
+    assert list(client.iter_assumptions(page_size=2)) == client.get_assumption()
+    run = client.get_run()[0]
+    assert all(r.contact == run.contact for r in client.iter_runs(contact=run.contact))
+
+
+def test_local_pages(
+    client_local: clients.LocalClient,
+    kwargs_all_unique: dict[str, dict[str, str]],
+):
+    do_pages(client_local, kwargs_all_unique["path"])
+
+
+def test_remote_pages(
+    client_remote: clients.RemoteClient,
+    kwargs_all_unique: dict[str, dict[str, str]],
+):
+    do_pages(client_remote, kwargs_all_unique["path"])
+    with pytest.raises(httpx.HTTPStatusError):
+        client_remote.get_path(limit=1_000_000)  # larger than max_page_size
+
+
+def test_async_remote_pages(
+    client_remote: clients.RemoteClient,
+    client_async: clients.AsyncRemoteClient,
+):
+    async def collect():
+        return [p async for p in client_async.iter_paths(page_size=3)]
+
+    assert asyncio.run(collect()) == client_remote.get_path()
+
+
+def paths_for_paging(n_paths: int) -> list[dict]:
+    return [
+        schemas.NamedPath(
+            id=i,
+            name=f"path-{i}",
+            path=f"/CALSIM/PATH_{i}/CHANNEL/.*/1MON/L2020A/",
+            category="testing",
+            detail="testing",
+            period_type="PER-AVER",
+            interval="1MON",
+            units="CFS",
+        ).model_dump(mode="json")
+        for i in range(1, n_paths + 1)
+    ]
+
+
+def ignores_paging(n_paths: int) -> httpx.MockTransport:
+    """A server that returns the same paths, whatever the limit and cursor."""
+    paths = paths_for_paging(n_paths)
+    return httpx.MockTransport(lambda request: httpx.Response(200, json=paths))
+
+
+@pytest.mark.parametrize("n_paths", (2, 3))  # the cursor doesn't move, too long
+def test_remote_pages_stop_when_paging_is_ignored(n_paths: int):
+    client = clients.RemoteClient(
+        base_url="http://localhost",
+        transport=ignores_paging(n_paths),
+    )
+    with pytest.raises(ValueError):
+        list(client.iter_paths(page_size=2))
+
+    async def collect():
+        async with clients.AsyncRemoteClient(
+            base_url="http://localhost",
+            transport=ignores_paging(n_paths),
+        ) as client_async:
+            return [p async for p in client_async.iter_paths(page_size=2)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect())
+
+
+def caps_pages(n_paths: int, max_page_size: int) -> httpx.MockTransport:
+    """A server that returns at most `max_page_size` paths, even without a limit."""
+    paths = paths_for_paging(n_paths)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/paths":
+            return httpx.Response(200, json=[])
+        limit = int(request.url.params.get("limit", max_page_size))
+        if limit > max_page_size:
+            return httpx.Response(422, json={"detail": "limit too large"})
+        after = int(request.url.params.get("after", 0))
+        page = [p for p in paths if p["id"] > after][:limit]
+        return httpx.Response(200, json=page)
+
+    return httpx.MockTransport(handler)
+
+
+def test_async_remote_dump_pages():
+    max_page_size = clients.base.PAGE_SIZE
+    n_paths = 2 * max_page_size + 1
+
+    async def dump() -> dict:
+        async with clients.AsyncRemoteClient(
+            base_url="http://localhost",
+            transport=caps_pages(n_paths, max_page_size),
+        ) as client_async:
+            dst = io.StringIO()
+            await client_async.dump(dst)
+        return json.loads(dst.getvalue())
+
+    database = asyncio.run(dump())
+    assert len(database["paths"]) == n_paths
+
+
+def do_patch_timeseries(
+    client: Client,
+    kwargs_timeseries: dict[str, str],
+    kwargs_run: dict[str, str],
+):
+    client.put_run(**kwargs_run)
+    result = client.patch_timeseries(**kwargs_timeseries)  # creates the series
+    assert result.inserted == len(kwargs_timeseries["values"])
+    values = (*kwargs_timeseries["values"][:-1], -1.0)
+    result = client.patch_timeseries(**kwargs_timeseries | dict(values=values))
+    assert isinstance(result, schemas.TimeseriesUpdate)
+    assert (result.inserted, result.updated) == (0, 1)
+    ts = client.get_timeseries(
+        scenario=kwargs_timeseries["scenario"],
+        version=kwargs_timeseries["version"],
+        path=kwargs_timeseries["path"],
+    )
+    assert ts.values == values
+
+
+def test_local_patch_timeseries(
+    client_local: clients.LocalClient,
+    kwargs_all_unique: dict[str, dict[str, str]],
+):
+    do_patch_timeseries(
+        client_local,
+        kwargs_all_unique["timeseries"],
+        kwargs_all_unique["run"],
+    )
+
+
+def test_remote_patch_timeseries(
+    client_remote: clients.RemoteClient,
+    kwargs_all_unique: dict[str, dict[str, str]],
+):
+    do_patch_timeseries(
+        client_remote,
+        kwargs_all_unique["timeseries"],
+        kwargs_all_unique["run"],
+    )
@@ -1,7 +1,15 @@
+import numpy as np
 import pandss as pdss
 import pytest
 
-from csrs import crud, errors, schemas
+from csrs import crud, errors, models, schemas
+
+
+def same_dates(left: tuple[str, ...], right: tuple[str, ...]) -> bool:
+    """Compare dates that may be written with or without a time."""
+    left = np.asarray(left, dtype="datetime64[us]")
+    right = np.asarray(right, dtype="datetime64[us]")
+    return np.array_equal(left, right)
 
 
 def test_create_assumpitons(database, kwargs_assumption):
@@ -91,6 +99,29 @@ def test_read_all_timeseries(database):
     assert len(obj[0].values) == 1_200
 
 
+def test_iter_all_timeseries_mixed_storage(database, kwargs_all_unique):
+    run = crud.runs.create(db=database, **kwargs_all_unique["run"])
+    packed = crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    crud.timeseries.repack(database, run_id=run.id)
+    ledger = crud.timeseries.create(
+        db=database,
+        **kwargs_all_unique["timeseries"]
+        | dict(path="/CSRS/TESTING_EXISTING_DB/TESTING/.*/1MON/2024/"),
+    )
+    obj = list(
+        crud.timeseries.iter_all_for_run(
+            db=database,
+            scenario=run.scenario,
+            version=run.version,
+        )
+    )
+    assert len(obj) == 2
+    by_path = {ts.path: ts for ts in obj}
+    for timeseries in (packed, ledger):
+        assert by_path[timeseries.path].values == timeseries.values
+        assert same_dates(by_path[timeseries.path].dates, timeseries.dates)
+
+
 def test_create_timeseries_from_dss(database, dss):
     # timeseries
     catalog = pdss.read_catalog(dss)
@@ -121,6 +152,89 @@ def test_create_timeseries_from_dss(database, dss):
             assert L == R
 
 
+def test_create_timeseries_blob_storage(database, kwargs_all_unique):
+    crud.runs.create(db=database, **kwargs_all_unique["run"])
+    database.info["storage"] = "blob"
+    try:
+        timeseries = crud.timeseries.create(
+            db=database, **kwargs_all_unique["timeseries"]
+        )
+    finally:
+        database.info.pop("storage")
+    blob = (
+        database.query(models.TimeseriesBlob)
+        .join(models.NamedPath)
+        .where(models.NamedPath.path == timeseries.path)
+        .first()
+    )
+    assert blob is not None
+    assert blob.length == len(timeseries.values)
+    timeseries_read = crud.timeseries.read(
+        db=database,
+        scenario=timeseries.scenario,
+        version=timeseries.version,
+        path=timeseries.path,
+    )
+    assert timeseries_read.values == kwargs_all_unique["timeseries"]["values"]
+    assert same_dates(timeseries_read.dates, timeseries.dates)
+
+
+def test_create_timeseries_duplicate_across_storage(database, kwargs_all_unique):
+    crud.runs.create(db=database, **kwargs_all_unique["run"])
+    crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    n_blobs = database.query(models.TimeseriesBlob).count()
+    database.info["storage"] = "blob"
+    try:
+        with pytest.raises(errors.DuplicateModelError):
+            crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    finally:
+        database.info.pop("storage")
+    assert database.query(models.TimeseriesBlob).count() == n_blobs
+
+
+def test_repack_timeseries(database, kwargs_all_unique):
+    run = crud.runs.create(db=database, **kwargs_all_unique["run"])
+    timeseries = crud.timeseries.create(db=database, **kwargs_all_unique["timeseries"])
+    n_repacked = crud.timeseries.repack(database, run_id=run.id)
+    assert n_repacked == 1
+    remaining = (
+        database.query(models.TimeseriesLedger)
+        .where(models.TimeseriesLedger.run_id == run.id)
+        .count()
+    )
+    assert remaining == 0
+    timeseries_read = crud.timeseries.read(
+        db=database,
+        scenario=timeseries.scenario,
+        version=timeseries.version,
+        path=timeseries.path,
+    )
+    assert timeseries_read.values == timeseries.values
+    assert same_dates(timeseries_read.dates, timeseries.dates)
+
+
+def test_create_many_timeseries(database, kwargs_all_unique):
+    crud.runs.create(db=database, **kwargs_all_unique["run"])
+    good = schemas.Timeseries(**kwargs_all_unique["timeseries"])
+    missing_path = good.model_copy(update=dict(path="/CSRS/INVALID/LOOKUP/.*/.*/.*/"))
+    duplicate = good.model_copy()
+    batch = crud.timeseries.create_many(
+        db=database,
+        timeseries=[good, missing_path, duplicate],
+    )
+    assert isinstance(batch, schemas.TimeseriesBatch)
+    assert len(batch.added) == 1
+    assert len(batch.failed) == 2
+    assert batch.failed[0].path == missing_path.path
+    timeseries_read = crud.timeseries.read(
+        db=database,
+        scenario=good.scenario,
+        version=good.version,
+        path=good.path,
+    )
+    assert timeseries_read.values == good.values
+
+
 def test_error_on_bad_read_assumption(database):
     with pytest.raises(errors.EmptyLookupError):
         crud.assumptions.read(db=database, name="invalid-lookup")
@@ -197,3 +311,83 @@ def test_delete_path(database, kwargs_path):
 
 # TODO: add tests for different length timeseries
 # TODO: add tests for adding two runs in a scenario, updating the preferred run
+
+
+def test_read_path_pages(database):
+    paths = crud.paths.read(db=database)
+    pages = list()
+    after = None
+    while page := crud.paths.read(db=database, limit=2, after=after):
+        pages.append(page)
+        after = page[-1].id
+    assert all(len(page) <= 2 for page in pages)
+    assert [p for page in pages for p in page] == sorted(paths, key=lambda p: p.id)
+    with pytest.raises(errors.EmptyLookupError):  # still an error without a cursor
+        crud.paths.read(db=database, name="not-a-path", limit=2)
+
+
+def test_delete_cascades(database, kwargs_all_unique):
+    scenario = crud.scenarios.create(db=database, **kwargs_all_unique["scenario"])
+    run_kwargs = kwargs_all_unique["run"] | dict(scenario=scenario.name)
+    first = crud.runs.create(db=database, **run_kwargs | dict(version="1.0"))
+    second = crud.runs.create(
+        db=database,
+        **run_kwargs | dict(version="2.0", parent="1.0"),
+    )
+    for run in (first, second):
+        crud.timeseries.create(
+            db=database,
+            **kwargs_all_unique["timeseries"]
+            | dict(scenario=scenario.name, version=run.version),
+        )
+    n_values = len(kwargs_all_unique["timeseries"]["values"])
+    counts = crud.runs.delete(database, first.id)
+    assert counts["runs"] == 1
+    assert counts["run_history"] == 1
+    assert counts["timeseries_ledger"] == n_values
+    assert counts["preferred_versions"] == 0  # the second run is preferred
+    (kept,) = crud.runs.read(database, scenario=scenario.name)
+    assert kept.parent is None
+    counts = crud.scenarios.delete(database, scenario.id)
+    assert counts["scenarios"] == 1
+    assert counts["runs"] == 1
+    assert counts["preferred_versions"] == 1
+    assert counts["scenario_assumptions"] == len(scenario.assumptions)
+    assert counts["timeseries_ledger"] == n_values
+    for model in crud.runs.RUN_TABLES:
+        run_ids = (first.id, second.id)
+        assert database.query(model).filter(model.run_id.in_(run_ids)).count() == 0
+
+
+@pytest.mark.parametrize("storage", ["ledger", "blob"])
+def test_update_timeseries(database, kwargs_all_unique, storage):
+    run = crud.runs.create(db=database, **kwargs_all_unique["run"])
+    kwargs = kwargs_all_unique["timeseries"]
+    database.info["storage"] = storage
+    try:
+        crud.timeseries.create(db=database, **kwargs)
+    finally:
+        database.info.pop("storage")
+    # correct the second value, keep the third, and add a fourth
+    patch = kwargs | dict(
+        values=(20.0, 3.0, 4.0),
+        dates=(*kwargs["dates"][1:], "1922-01-31"),
+    )
+    result = crud.timeseries.update(db=database, **patch)
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 1)
+    ts = crud.timeseries.read(
+        db=database,
+        scenario=kwargs["scenario"],
+        version=kwargs["version"],
+        path=kwargs["path"],
+    )
+    assert ts.values == (1.0, 20.0, 3.0, 4.0)
+    assert same_dates(ts.dates, (*kwargs["dates"], "1922-01-31"))
+    result = crud.timeseries.update(db=database, **patch)
+    assert (result.inserted, result.updated, result.unchanged) == (0, 0, 3)
+    n_catalog = (
+        database.query(models.CommonCatalog)
+        .filter(models.CommonCatalog.run_id == run.id)
+        .count()
+    )
+    assert n_catalog == 1
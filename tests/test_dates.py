@@ -0,0 +1,72 @@
+import logging
+from time import perf_counter
+
+import numpy as np
+import pytest
+
+from csrs.crud.timeseries import (
+    date_to_float,
+    dates_to_floats,
+    float_to_date,
+    floats_to_dates,
+)
+
+logger = logging.getLogger(__name__)
+
+DATES = (
+    "1921-10-31T00:00:00",
+    "1921-11-30T00:00:00",
+    "1900-01-01T00:00:00",
+    "1899-12-31T00:00:00",
+    "2021-09-30T23:59:59",
+    "2021-09-30T12:30:00.250000",
+)
+
+
+def test_dates_to_floats_matches_scalar():
+    vectorized = dates_to_floats(DATES)
+    scalar = [date_to_float(d) for d in DATES]
+    assert isinstance(vectorized, np.ndarray)
+    assert vectorized.tolist() == scalar
+
+
+def test_floats_to_dates_matches_scalar():
+    floats = [date_to_float(d) for d in DATES]
+    vectorized = floats_to_dates(floats)
+    scalar = tuple(float_to_date(f) for f in floats)
+    assert vectorized == scalar
+    assert vectorized == DATES
+
+
+def test_date_only_strings():
+    floats = dates_to_floats(("1921-10-31", "1921-11-30"))
+    assert floats_to_dates(floats) == ("1921-10-31T00:00:00", "1921-11-30T00:00:00")
+
+
+@pytest.mark.slow
+def test_date_conversion_throughput():
+    n = 1_000_000
+    floats = np.arange(n, dtype=float) * 86_400.0
+    # vectorized
+    start = perf_counter()
+    dates = floats_to_dates(floats)
+    decode_vectorized = n / (perf_counter() - start)
+    start = perf_counter()
+    dates_to_floats(dates)
+    encode_vectorized = n / (perf_counter() - start)
+    # scalar
+    start = perf_counter()
+    for f in floats:
+        float_to_date(f)
+    decode_scalar = n / (perf_counter() - start)
+    start = perf_counter()
+    for d in dates:
+        date_to_float(d)
+    encode_scalar = n / (perf_counter() - start)
+    logger.info(
+        f"dates per second for {n:,} dates, "
+        + f"decode: {decode_vectorized:,.0f} (scalar {decode_scalar:,.0f}), "
+        + f"encode: {encode_vectorized:,.0f} (scalar {encode_scalar:,.0f})"
+    )
+    assert decode_vectorized > decode_scalar
+    assert encode_vectorized > encode_scalar
@@ -0,0 +1,69 @@
+from typing import Callable
+
+import pytest
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from csrs import crud
+from csrs.pages import edit
+
+from .test_query_count import add_runs
+
+# Statements per page, the same no matter how many scenarios and runs there are
+MAX_STATEMENTS = 6
+PAGES = {
+    "assumptions": edit.render_assumptions,
+    "scenarios": edit.render_scenarios,
+    "runs": edit.render_runs,
+    "paths": edit.render_paths,
+}
+
+
+def make_request(page: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": f"/edit/{page}",
+            "headers": [],
+            "query_string": b"",
+        }
+    )
+
+
+def add_scenarios(database: Session, kwargs: dict, n: int, start: int = 0) -> None:
+    for i in range(start, start + n):
+        scenario = crud.scenarios.create(
+            db=database,
+            **kwargs | dict(name=f"{kwargs['name']}-{i}"),
+        )
+        add_runs(database, scenario.name, 2)
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_edit_page_statements_are_bounded(
+    page: str,
+    database: Session,
+    kwargs_all_unique: dict,
+    count_statements: Callable,
+):
+    render = PAGES[page]
+    counts = list()
+    for start, n in ((0, 1), (1, 4)):
+        add_scenarios(database, kwargs_all_unique["scenario"], n, start=start)
+        with count_statements() as counter:
+            response = render(make_request(page), database)
+        assert response.status_code == 200
+        counts.append(len(counter))
+    small, large = counts
+    assert small == large, f"the {page} page sent more statements with more data"
+    assert large <= MAX_STATEMENTS, f"the {page} page sent {large} statements"
+
+
+def test_edit_scenarios_lists_versions(database: Session, kwargs_all_unique: dict):
+    add_scenarios(database, kwargs_all_unique["scenario"], 1)
+    scenario = f"{kwargs_all_unique['scenario']['name']}-0"
+    versions = crud.runs.read_versions(database)
+    assert versions[scenario] == ["0.0", "1.0"]
+    response = edit.render_scenarios(make_request("scenarios"), database)
+    assert "1.0" in response.body.decode()
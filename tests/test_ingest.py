@@ -0,0 +1,121 @@
+from concurrent.futures import Future
+from pathlib import Path
+from types import SimpleNamespace
+
+from csrs import ingest, schemas
+
+
+def named(name: str, path: str) -> schemas.NamedPath:
+    return schemas.NamedPath(
+        name=name,
+        path=path,
+        category="testing",
+        detail="testing",
+        period_type="PER-AVER",
+        interval="1MON",
+        units="CFS",
+    )
+
+
+CATALOG = (
+    "/CALSIM/C_KSWCK/CHANNEL/01JAN1920/1MON/L2020A/",
+    "/CALSIM/C_KSWCK/CHANNEL/01JAN1930/1MON/L2020A/",
+    "/CALSIM/S_SHSTA/STORAGE/01JAN1920 - 01JAN2020/1MON/L2020A/",
+    "/CALSIM/S_OROVL/STORAGE/01JAN1920 - 01JAN2020/1MON/L2020A/",
+    "/CALSIM/DEL_SWP_TOTAL/DELIVERY-SWP/01JAN1920 - 01JAN2020/1MON/L2020A/",
+)
+
+
+def test_match_catalog():
+    paths = [
+        named("shasta", "/CALSIM/S_SHSTA/STORAGE/.*/1MON/L2020A/"),
+        named("keswick", "/CALSIM/C_KSWCK/CHANNEL/.*/1MON/L2020A/"),
+        named("storage", "/CALSIM/S_.*/STORAGE/.*/1MON/L2020A/"),
+        named("swp", "/CALSIM/DEL_SWP_TOTAL/DELIVERY-SWP/.*/.*/.*/"),
+        named("missing", "/CALSIM/X_MISSING/CHANNEL/.*/1MON/L2020A/"),
+    ]
+    records = ingest.match_catalog(paths, CATALOG)
+    by_path = {r.named_path: r for r in records}
+    assert list(by_path) == [paths[0].path, paths[1].path, paths[3].path]
+    assert by_path[paths[0].path].dataset == CATALOG[2]
+    assert by_path[paths[0].path].exact
+    # the catalog lists two blocks of keswick, they're read together
+    assert by_path[paths[1].path].dataset == paths[1].path
+    assert not by_path[paths[1].path].exact
+    assert by_path[paths[3].path].dataset == CATALOG[4]
+
+
+def test_iter_timeseries_from_dss(dss: Path):
+    import pandss as pdss
+
+    paths = [
+        named(f"path-{i}", str(p)) for i, p in enumerate(pdss.read_catalog(dss).paths)
+    ]
+    serial = [
+        ts
+        for chunk in ingest.iter_timeseries_from_dss(
+            dss, "testing", "0.0", paths, max_workers=1, chunk_size=2
+        )
+        for ts in chunk
+    ]
+    parallel = [
+        ts
+        for chunk in ingest.iter_timeseries_from_dss(
+            dss, "testing", "0.0", paths, max_workers=2, chunk_size=2
+        )
+        for ts in chunk
+    ]
+    assert len(serial) == len(paths)
+    assert serial == parallel
+
+
+class InlinePool:
+    """Runs the submitted work right away, and counts the results not yet used."""
+
+    def __init__(self, max_workers: int):
+        self.futures: list[Future] = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        future.set_result(fn(*args))
+        self.futures.append(future)
+        return future
+
+    def in_flight(self, used: int) -> int:
+        return len(self.futures) - used
+
+
+def test_iter_timeseries_from_dss_bounds_futures(monkeypatch):
+    pools = list()
+
+    def make_pool(max_workers: int) -> InlinePool:
+        pools.append(InlinePool(max_workers))
+        return pools[-1]
+
+    monkeypatch.setattr(ingest, "ProcessPoolExecutor", make_pool)
+    monkeypatch.setattr(
+        ingest.pdss,
+        "read_catalog",
+        lambda dss: SimpleNamespace(paths=[]),
+        raising=False,
+    )
+    monkeypatch.setattr(ingest, "match_catalog", lambda paths, catalog: list(range(20)))
+    monkeypatch.setattr(ingest, "read_records", lambda dss, s, v, chunk: list(chunk))
+    chunks = ingest.iter_timeseries_from_dss(
+        "file.dss", "testing", "0.0", [], max_workers=2, chunk_size=1
+    )
+    found = list()
+    for used, chunk in enumerate(chunks, start=1):
+        found.extend(chunk)
+        assert pools[0].in_flight(used) <= ingest.CHUNKS_AHEAD * 2
+    assert found == list(range(20))
+    # the default reads the file in this process
+    monkeypatch.setattr(ingest, "ProcessPoolExecutor", None)
+    chunks = ingest.iter_timeseries_from_dss("file.dss", "testing", "0.0", [])
+    assert [r for chunk in chunks for r in chunk] == list(range(20))
@@ -0,0 +1,123 @@
+import logging
+import threading
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from csrs import clients, schemas
+from csrs.config import DatabaseConfig
+from csrs.database import get_db, make_engine
+
+logger = logging.getLogger(__name__)
+
+
+def make_database(tmp_path: Path, n_paths: int, n_values: int) -> Path:
+    dates = tuple(f"{1922 + (i // 12)}-{(i % 12) + 1:02}-01" for i in range(n_values))
+    client = clients.LocalClient(tmp_path / "load.db")
+    client.put_assumption(name="load", kind="testing", detail="load")
+    client.put_scenario(name="load", assumptions=dict(testing="load"))
+    client.put_run(
+        scenario="load",
+        version="1.0",
+        contact="test@testing.gov",
+        code_version="0.1",
+        detail="load testing",
+    )
+    timeseries = list()
+    for i in range(n_paths):
+        path = client.put_path(
+            name=f"load-{i}",
+            path=f"/CSRS/LOAD_{i}/TESTING/.*/1MON/2024/",
+            category="testing",
+            period_type="PER-AVER",
+            interval="1MON",
+            units="NONE",
+            detail="load testing",
+        )
+        timeseries.append(
+            schemas.Timeseries(
+                scenario="load",
+                version="1.0",
+                path=path.path,
+                values=tuple(float(v) for v in range(n_values)),
+                dates=dates,
+                period_type="PER-AVER",
+                units="NONE",
+                interval="1MON",
+            )
+        )
+    client.put_many_timeseries(timeseries)
+    client.close()
+    return tmp_path / "load.db"
+
+
+@pytest.fixture
+def small_database(tmp_path: Path) -> Path:
+    return make_database(tmp_path, n_paths=20, n_values=120)
+
+
+@pytest.fixture
+def large_database(tmp_path: Path) -> Path:
+    return make_database(tmp_path, n_paths=100, n_values=1_200)
+
+
+def requests_during_downloads(database: Path) -> tuple[list[float], float]:
+    """The latencies of small requests while 4 threads download a whole run, and the
+    time taken by one download on its own."""
+    from csrs.main import create_app
+
+    engine = make_engine(DatabaseConfig(source=database))
+    maker = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_load_db():
+        db = maker()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = get_load_db
+    all_params = dict(scenario="load", version="1.0")
+    with TestClient(app) as client:
+        start = perf_counter()
+        client.get("/timeseries/all", params=all_params).raise_for_status()
+        large = perf_counter() - start
+        stop = threading.Event()
+
+        def download():
+            while not stop.is_set():
+                client.get("/timeseries/all", params=all_params).raise_for_status()
+
+        threads = [threading.Thread(target=download) for _ in range(4)]
+        for t in threads:
+            t.start()
+        latencies = list()
+        for i in range(20):
+            start = perf_counter()
+            client.get("/paths", params=dict(name=f"load-{i}")).raise_for_status()
+            latencies.append(perf_counter() - start)
+        stop.set()
+        for t in threads:
+            t.join()
+    engine.dispose()
+    return latencies, large
+
+
+def test_small_requests_during_downloads(small_database: Path):
+    latencies, _ = requests_during_downloads(small_database)
+    assert len(latencies) == 20
+
+
+@pytest.mark.slow
+def test_small_requests_during_large_downloads(large_database: Path):
+    latencies, large = requests_during_downloads(large_database)
+    logger.info(
+        f"/paths latency while downloading runs, median: {median(latencies):.3f}s, "
+        + f"max: {max(latencies):.3f}s, one /timeseries/all alone: {large:.3f}s"
+    )
+    assert median(latencies) < large
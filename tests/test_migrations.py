@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from csrs import migrations
+from csrs.models import Base
+
+
+@pytest.fixture
+def engine(tmp_path: Path):
+    engine = create_engine("sqlite:///" + str(tmp_path / "migrations.db"))
+    migrations.upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, sql: str) -> str:
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_create_missing_indexes(engine):
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(bind=connection)
+    created = migrations.create_missing_indexes(engine)
+    expected = {ix.name for t in Base.metadata.sorted_tables for ix in t.indexes}
+    assert set(created) == expected
+    inspector = inspect(engine)
+    existing = {
+        ix["name"]
+        for t in inspector.get_table_names()
+        for ix in inspector.get_indexes(t)
+    }
+    assert expected <= existing
+    assert migrations.create_missing_indexes(engine) == list()
+
+
+@pytest.mark.parametrize(
+    "sql",
+    (
+        "SELECT datetime, value FROM timeseries_ledger "
+        + "WHERE run_id = 1 AND path_id = 1 ORDER BY datetime",
+        "SELECT path_id FROM common_catalog WHERE run_id = 1",
+        "SELECT id FROM named_paths WHERE path = '/A/B/C/.*/E/F/'",
+        "SELECT id FROM run_history WHERE run_id = 1",
+        "SELECT id FROM runs WHERE scenario_id = 1",
+        "SELECT assumption_id FROM scenario_assumptions WHERE scenario_id = 1",
+    ),
+)
+def test_lookups_use_indexes(engine, sql: str):
+    plan = query_plan(engine, sql)
+    assert "USING" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_ledger_series_read_uses_unique_index(engine):
+    plan = query_plan(
+        engine,
+        "SELECT datetime, value FROM timeseries_ledger "
+        + "WHERE run_id = 1 AND path_id = 1 ORDER BY datetime",
+    )
+    assert "USING INDEX sqlite_autoindex_timeseries_ledger" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_drop_obsolete_indexes(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE INDEX ix_timeseries_ledger_series "
+            + "ON timeseries_ledger (run_id, path_id, datetime, value)"
+        )
+    assert migrations.drop_obsolete_indexes(engine) == ["ix_timeseries_ledger_series"]
+    names = {ix["name"] for ix in inspect(engine).get_indexes("timeseries_ledger")}
+    assert "ix_timeseries_ledger_series" not in names
+    assert migrations.drop_obsolete_indexes(engine) == list()
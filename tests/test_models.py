@@ -34,6 +34,22 @@ EXPECTED_TIMESERIES_LEDGER = {
     "value": float,
 }
 
+EXPECTED_RUN_REVISION = {
+    "run_id": int,
+    "revision": int,
+}
+
+EXPECTED_TIMESERIES_BLOB = {
+    "id": int,
+    "run_id": int,
+    "path_id": int,
+    "start": float,
+    "interval": str,
+    "length": int,
+    "datetimes": bytes,
+    "values": bytes,
+}
+
 EXPECTED_PATH = {
     "id": int,
     "name": str,
@@ -136,6 +152,22 @@ def test_model_column_types_timeseries_ledger():
     check_model_column_types(m.TimeseriesLedger, EXPECTED_TIMESERIES_LEDGER)
 
 
+def test_model_columns_timeseries_blob():
+    check_model_columns(m.TimeseriesBlob, EXPECTED_TIMESERIES_BLOB)
+
+
+def test_model_column_types_timeseries_blob():
+    check_model_column_types(m.TimeseriesBlob, EXPECTED_TIMESERIES_BLOB)
+
+
+def test_model_columns_run_revision():
+    check_model_columns(m.RunRevision, EXPECTED_RUN_REVISION)
+
+
+def test_model_column_types_run_revision():
+    check_model_column_types(m.RunRevision, EXPECTED_RUN_REVISION)
+
+
 def test_model_columns_path():
     check_model_columns(m.NamedPath, EXPECTED_PATH)
 
@@ -0,0 +1,74 @@
+from csrs import crud, models, schemas
+from csrs.path_index import PathIndex, PathMatcher
+
+
+def named(name: str, path: str, id: int | None = None) -> schemas.NamedPath:
+    return schemas.NamedPath(
+        id=id,
+        name=name,
+        path=path,
+        category="testing",
+        detail="testing",
+        period_type="PER-AVER",
+        interval="1MON",
+        units="CFS",
+    )
+
+
+SHASTA = "/CALSIM/S_SHSTA/STORAGE/01JAN1920 - 01JAN2020/1MON/L2020A/"
+OROVILLE = "/CALSIM/S_OROVL/STORAGE/01JAN1920 - 01JAN2020/1MON/L2020A/"
+
+
+def test_path_matcher_indexes_locations():
+    matcher = PathMatcher(
+        [
+            named("shasta", "/CALSIM/S_SHSTA/STORAGE/.*/1MON/L2020A/"),
+            named("storage", "/CALSIM/S_.*/STORAGE/.*/1MON/L2020A/"),
+        ]
+    )
+    assert list(matcher.by_location) == ["S_SHSTA"]
+    assert len(matcher.wildcards) == 1
+    assert len(matcher.match(SHASTA)) == 2
+    assert len(matcher.match(OROVILLE)) == 1
+    assert matcher.match("/CALSIM/C_KSWCK/CHANNEL/.*/1MON/L2020A/") == []
+    assert matcher.match("not a path") == []
+
+
+def test_path_index_find():
+    shasta = named("shasta", "/.*/S_SHSTA/STORAGE/.*/.*/.*/", id=1)
+    oroville = named("oroville", "/.*/S_OROVL/STORAGE/.*/.*/.*/", id=2)
+    index = PathIndex([shasta, oroville])
+    assert index.find(shasta.path) == [shasta]
+    assert index.find("oroville") == [oroville]
+    assert index.find(SHASTA) == [shasta]
+    assert index.find(SHASTA.lower()) == [shasta]
+    assert index.find("/CALSIM/C_KSWCK/CHANNEL/.*/1MON/L2020A/") == []
+
+
+def test_crud_paths_find_is_refreshed(database, kwargs_all_unique):
+    kwargs_path = kwargs_all_unique["path"]
+    index = crud.paths.path_index.get(database)
+    assert not index.find(kwargs_path["path"])
+    path = crud.paths.create(db=database, **kwargs_path)
+    # creating a path rebuilds the index
+    assert crud.paths.path_index.get(database) is not index
+    assert crud.paths.resolve(database, kwargs_path["name"]) == path
+    # the B part of the path is a literal, so it's matched from the index
+    concrete = kwargs_path["path"].replace("/.*/", "/01JAN2024/")
+    assert crud.paths.resolve(database, concrete) == path
+    crud.paths.delete(db=database, id=path.id)
+    assert not crud.paths.path_index.get(database).find(kwargs_path["name"])
+
+
+def test_crud_paths_index_follows_revision(database, kwargs_all_unique):
+    kwargs_path = kwargs_all_unique["path"]
+    index = crud.paths.path_index.get(database)
+    assert crud.paths.path_index.get(database) is index
+    # another process adds a path: the revision moves on, but nothing in this process
+    # is invalidated
+    database.add(models.NamedPath(**kwargs_path))
+    crud.paths.bump_revision(database)
+    database.commit()
+    assert crud.paths.path_index.get(database) is not index
+    (path,) = crud.paths.find(database, kwargs_path["name"])
+    assert path.path == kwargs_path["path"]
@@ -0,0 +1,186 @@
+import logging
+import threading
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.pool import NullPool
+
+from csrs import clients, migrations, models, pragmas
+from csrs.config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+
+def test_local_client_pragmas(tmp_path: Path):
+    client = clients.LocalClient(tmp_path / "pragmas.db")
+    expected = DatabaseConfig().pragmas
+    try:
+        found = pragmas.read_pragmas(client.engine, list(expected))
+    finally:
+        client.close()
+    assert found["journal_mode"] == expected["journal_mode"]
+    assert found["mmap_size"] == expected["mmap_size"]
+    assert found["cache_size"] == expected["cache_size"]
+    assert found["busy_timeout"] == expected["busy_timeout"]
+    assert found["foreign_keys"] == 1
+
+
+def test_local_client_custom_pragmas(tmp_path: Path):
+    client = clients.LocalClient(
+        tmp_path / "pragmas.db",
+        sqlite_pragmas=dict(journal_mode="delete", cache_size=-1024),
+    )
+    try:
+        found = pragmas.read_pragmas(client.engine, ["journal_mode", "cache_size"])
+    finally:
+        client.close()
+    assert found == dict(journal_mode="delete", cache_size=-1024)
+
+
+def test_checkpoint_truncates_wal(tmp_path: Path, kwargs_path: dict):
+    db = tmp_path / "pragmas.db"
+    wal = tmp_path / "pragmas.db-wal"
+    client = clients.LocalClient(db)
+    reader = create_engine(f"sqlite:///{db}")
+    try:
+        with reader.connect() as connection:  # keeps the journal from being removed
+            connection.exec_driver_sql("SELECT count(*) FROM named_paths").scalar()
+            client.put_path(**kwargs_path)
+            assert wal.stat().st_size > 0
+            client.close()
+            assert wal.stat().st_size == 0
+    finally:
+        reader.dispose()
+
+
+def test_deleting_a_run_cascades(tmp_path: Path):
+    db = tmp_path / "cascade.db"
+    client = clients.LocalClient(db)
+    client.put_assumption(name="cascade", kind="testing", detail="cascade")
+    client.put_scenario(name="cascade", assumptions=dict(testing="cascade"))
+    run = client.put_run(
+        scenario="cascade",
+        version="1.0",
+        contact="test@testing.gov",
+        code_version="0.1",
+        detail="cascade testing",
+    )
+    for storage in ("ledger", "blob"):
+        client.session.info["storage"] = storage
+        path = client.put_path(
+            name=f"cascade-{storage}",
+            path=f"/CSRS/CASCADE_{storage.upper()}/TESTING/.*/1MON/2024/",
+            category="testing",
+            period_type="PER-AVER",
+            interval="1MON",
+            units="NONE",
+            detail="cascade testing",
+        )
+        client.put_timeseries(
+            scenario="cascade",
+            version="1.0",
+            path=path.path,
+            values=(1.0, 2.0),
+            dates=("1921-10-31", "1921-11-30"),
+            period_type="PER-AVER",
+            units="NONE",
+            interval="1MON",
+        )
+    client.close()
+    engine = create_engine(f"sqlite:///{db}")
+    pragmas.apply_pragmas(engine, DatabaseConfig().pragmas)
+    tables = ("timeseries_ledger", "timeseries_blobs", "run_history")
+    count = "SELECT count(*) FROM {} WHERE run_id = ?"
+    try:
+        with engine.begin() as connection:
+            before = {
+                t: connection.exec_driver_sql(count.format(t), (run.id,)).scalar()
+                for t in tables
+            }
+            connection.exec_driver_sql("DELETE FROM runs WHERE id = ?", (run.id,))
+            after = {
+                t: connection.exec_driver_sql(count.format(t), (run.id,)).scalar()
+                for t in tables
+            }
+    finally:
+        engine.dispose()
+    assert all(before.values()), before
+    assert not any(after.values()), after
+
+
+def read_throughput(db: Path, sqlite_pragmas: dict, seconds: float = 2.0) -> float:
+    """Series read per second by 4 readers, while a writer commits new values."""
+    n_paths, n_values = 20, 1_200
+    engine = create_engine(f"sqlite:///{db}", poolclass=NullPool)
+    # the ledger rows below don't belong to any run or path
+    pragmas.apply_pragmas(engine, sqlite_pragmas | dict(foreign_keys="OFF"))
+    migrations.upgrade(engine)
+    ledger = models.TimeseriesLedger.__table__
+    with engine.begin() as connection:
+        connection.execute(
+            insert(ledger),
+            [
+                dict(run_id=1, path_id=p, datetime=float(d), value=float(d))
+                for p in range(n_paths)
+                for d in range(n_values)
+            ],
+        )
+    stop = threading.Event()
+    reads = list()
+
+    def writer():
+        d = 0
+        with engine.connect() as connection:
+            while not stop.is_set():
+                rows = [
+                    dict(run_id=2, path_id=p, datetime=float(d), value=1.0)
+                    for p in range(n_paths)
+                ]
+                connection.execute(insert(ledger), rows)
+                connection.commit()
+                d += 1
+
+    def reader():
+        n = 0
+        with engine.connect() as connection:
+            while not stop.is_set():
+                query = select(ledger.c.datetime, ledger.c.value).where(
+                    ledger.c.run_id == 1,
+                    ledger.c.path_id == (n % n_paths),
+                )
+                connection.execute(query).all()
+                n += 1
+        reads.append(n)
+
+    threads = [threading.Thread(target=writer)]
+    threads.extend(threading.Thread(target=reader) for _ in range(4))
+    start = perf_counter()
+    for t in threads:
+        t.start()
+    stop.wait(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = perf_counter() - start
+    engine.dispose()
+    return sum(reads) / elapsed
+
+
+def test_concurrent_reads_with_writer(tmp_path: Path):
+    profile = DatabaseConfig().pragmas
+    assert read_throughput(tmp_path / "tuned.db", profile, seconds=0.2) > 0
+
+
+@pytest.mark.slow
+def test_concurrent_read_throughput(tmp_path: Path):
+    profile = DatabaseConfig().pragmas
+    baseline = dict(busy_timeout=profile["busy_timeout"], journal_mode="delete")
+    tuned = read_throughput(tmp_path / "tuned.db", profile)
+    default = read_throughput(tmp_path / "default.db", baseline)
+    logger.info(
+        "series read per second with a concurrent writer, "
+        + f"tuned: {tuned:,.0f}, default: {default:,.0f}"
+    )
+    assert tuned > default
@@ -0,0 +1,106 @@
+from typing import Callable
+
+import pytest
+from sqlalchemy.orm import Session
+
+from csrs import crud, errors
+
+# Statements per crud call, the same no matter how many runs are in the database
+MAX_STATEMENTS = 3
+
+
+def add_runs(database: Session, scenario: str, n: int, start: int = 0) -> None:
+    for i in range(start, start + n):
+        crud.runs.create(
+            db=database,
+            scenario=scenario,
+            version=f"{i}.0",
+            contact="test@testing.gov",
+            code_version="0.1",
+            detail="query counting",
+            parent=f"{i - 1}.0" if i else None,
+        )
+
+
+@pytest.fixture
+def scenario(database: Session, kwargs_all_unique: dict) -> str:
+    scenario = crud.scenarios.create(
+        db=database,
+        **kwargs_all_unique["scenario"],
+    )
+    return scenario.name
+
+
+def test_statements_per_lookup_are_bounded(
+    database: Session,
+    scenario: str,
+    count_statements: Callable,
+):
+    lookups = {
+        "runs.read(scenario)": lambda: crud.runs.read(database, scenario=scenario),
+        "runs.read(scenario, version)": lambda: crud.runs.read(
+            database,
+            scenario=scenario,
+            version="1.0",
+        ),
+        "runs.read()": lambda: crud.runs.read(database),
+        "scenarios.read()": lambda: crud.scenarios.read(database),
+        "timeseries.get_run_model": lambda: crud.timeseries.get_run_model(
+            database,
+            scenario=scenario,
+            version="1.0",
+        ),
+    }
+    counts = dict()
+    for start, n in ((0, 2), (2, 8)):
+        add_runs(database, scenario, n, start=start)
+        for name, lookup in lookups.items():
+            with count_statements() as counter:
+                lookup()
+            counts.setdefault(name, list()).append(len(counter))
+    for name, (small, large) in counts.items():
+        assert small == large, f"{name} sent more statements with more runs"
+        assert large <= MAX_STATEMENTS, f"{name} sent {large} statements"
+
+
+def test_delete_statements_are_bounded(
+    database: Session,
+    kwargs_all_unique: dict,
+    count_statements: Callable,
+):
+    counts = list()
+    for n in (1, 5):
+        scenario = crud.scenarios.create(
+            db=database,
+            **kwargs_all_unique["scenario"] | dict(name=f"to-be-deleted-{n}"),
+        )
+        add_runs(database, scenario.name, n)
+        with count_statements() as counter:
+            crud.scenarios.delete(database, scenario.id)
+        counts.append(len(counter))
+    small, large = counts
+    assert small == large, "deleting a scenario sent more statements with more runs"
+
+
+def test_joined_run_lookup(database: Session, scenario: str):
+    add_runs(database, scenario, 3)
+    (run,) = crud.runs.read(database, scenario=scenario, version="1.0")
+    assert run.scenario == scenario
+    assert run.parent == "0.0"
+    assert run.children == ("2.0",)
+    (preferred,) = crud.scenarios.read(database, name=scenario)
+    assert preferred.preferred_run == "2.0"
+    with pytest.raises(errors.EmptyLookupError):
+        crud.runs.read(database, scenario=scenario, version="9.0")
+
+
+def test_run_model_lookup_is_one_statement(
+    database: Session,
+    scenario: str,
+    count_statements: Callable,
+):
+    add_runs(database, scenario, 3)
+    with count_statements() as counter:
+        run = crud.timeseries.get_run_model(database, scenario=scenario, version="1.0")
+        assert run.id and (run.published is not None)
+    assert len(counter) == 1
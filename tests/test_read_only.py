@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from csrs import clients, crud
+from csrs.config import DatabaseConfig
+from csrs.database import get_db, make_engine
+
+
+@pytest.fixture
+def read_only_cfg(tmp_path: Path, kwargs_path: dict) -> DatabaseConfig:
+    client = clients.LocalClient(tmp_path / "replica.db")
+    client.put_path(**kwargs_path)
+    client.close()
+    return DatabaseConfig(
+        source=tmp_path / "missing.db",
+        replica=tmp_path / "replica.db",
+        read_only=True,
+        allow_editing_via_forms=True,
+    )
+
+
+def test_read_only_config(read_only_cfg: DatabaseConfig):
+    assert read_only_cfg.path.name == "replica.db"
+    assert "mode=ro" in read_only_cfg.url
+    assert "immutable=1" in read_only_cfg.url
+    assert "journal_mode" not in read_only_cfg.pragmas
+    assert read_only_cfg.allow_editing_via_forms is False
+
+
+def test_read_only_engine(read_only_cfg: DatabaseConfig, kwargs_path: dict):
+    engine = make_engine(read_only_cfg)
+    session = sessionmaker(bind=engine)()
+    try:
+        paths = crud.paths.read(db=session, name=kwargs_path["name"])
+        assert len(paths) == 1
+        with pytest.raises(OperationalError):
+            crud.paths.create(db=session, **kwargs_path | dict(name="new"))
+    finally:
+        session.close()
+        engine.dispose()
+    assert not read_only_cfg.source.exists()
+
+
+def test_read_only_app(read_only_cfg: DatabaseConfig, kwargs_path: dict):
+    from csrs.main import create_app
+
+    engine = make_engine(read_only_cfg)
+    maker = sessionmaker(bind=engine)
+
+    def get_read_only_db():
+        db = maker()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app(read_only=True)
+    app.dependency_overrides[get_db] = get_read_only_db
+    with TestClient(app) as client:
+        response = client.get("/paths", params=dict(name=kwargs_path["name"]))
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        response = client.put("/paths", json=kwargs_path)
+        assert response.status_code == 405
+        response = client.post("/edit/paths/delete", data=dict(id=1))
+        assert response.status_code in (404, 405)
+    engine.dispose()
+
+
+def test_read_only_refuses_wal(read_only_cfg: DatabaseConfig):
+    wal = read_only_cfg.path.with_name(read_only_cfg.path.name + "-wal")
+    assert not wal.exists()  # the client checkpoints the journal when it closes
+    wal.write_bytes(b"unmerged")
+    with pytest.raises(RuntimeError):
+        make_engine(read_only_cfg)
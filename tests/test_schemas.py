@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pandss as pdss
 
@@ -41,6 +42,17 @@ EXPECTED_TIMESERIES = {
     "interval": str,
 }
 
+EXPECTED_ARRAY_TIMESERIES = {
+    "scenario": str,
+    "version": str,
+    "path": str,
+    "values": np.ndarray,
+    "dates": np.ndarray,
+    "period_type": str,
+    "units": str,
+    "interval": str,
+}
+
 EXPECTED_PATH = {
     "id": int | None,
     "name": str,
@@ -148,6 +160,14 @@ def test_schema_column_types_timeseries():
     check_schema_column_types(schemas.Timeseries, EXPECTED_TIMESERIES)
 
 
+def test_schema_columns_array_timeseries():
+    check_schema_columns(schemas.ArrayTimeseries, EXPECTED_ARRAY_TIMESERIES)
+
+
+def test_schema_column_types_array_timeseries():
+    check_schema_column_types(schemas.ArrayTimeseries, EXPECTED_ARRAY_TIMESERIES)
+
+
 def test_schema_conversion_timeseries():
     ts = schemas.Timeseries(
         scenario="test-schema-conversion-timeseries",
@@ -191,3 +211,28 @@ def test_schema_conversion_dataframe():
     assert isinstance(df, pd.DataFrame)
     assert "SCENARIO" in df.columns.names
     assert ts.version == df.columns.to_frame()["VERSION"].iat[0]
+
+
+def test_schema_conversion_array_timeseries():
+    ts = schemas.Timeseries(
+        scenario="test-schema-conversion-timeseries",
+        version="0.1",
+        path=str(pdss.DatasetPath(b="TEST", c="TESTING")),
+        values=(1.0, 2.0, 0.1),
+        dates=(
+            "2024-01-31T00:00:00",
+            "2024-02-29T12:00:00",
+            "2024-03-31T00:00:00.500000",
+        ),
+        period_type="PER-CUM",
+        units="TAF",
+        interval="1MON",
+    )
+    arrays = schemas.ArrayTimeseries.from_timeseries(ts)
+    assert arrays.values.dtype == np.float64
+    assert arrays.dates.dtype == np.dtype("datetime64[us]")
+    assert len(arrays) == 3
+    assert arrays.to_timeseries().model_dump() == ts.model_dump()
+    df = arrays.to_frame()
+    assert isinstance(df, pd.DataFrame)
+    assert ts.version == df.columns.to_frame()["VERSION"].iat[0]